@@ -0,0 +1,258 @@
+"""
+Performance matrix of the backend templates.
+
+Builds the project with :func:`~mljet.contrib.project_builder.full_build`
+for every backend and model type, launches it locally, loads it with
+:func:`~mljet.contrib.benchmark.benchmark` and stores results as JSON.
+
+Usage::
+
+    python benchmarks/matrix.py -o results.json
+    python benchmarks/matrix.py -b flask -b fastapi -m sklearn -o new.json \\
+        --compare results.json
+
+Model types, whose libraries are not installed, are skipped.
+Requirements of the backends must be installed into the current
+environment, because services are launched with the current interpreter.
+"""
+
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from sklearn.datasets import make_classification
+
+import mljet
+from mljet.cli.helpers import (
+    format_info,
+    parse_env,
+)
+from mljet.contrib.benchmark import (
+    benchmark,
+    compare_runs,
+    launch_project,
+)
+from mljet.contrib.project_builder import full_build
+from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
+from mljet.utils.conn import find_free_port
+from mljet.utils.logging_ import init
+
+log = logging.getLogger("benchmarks.matrix")
+
+N_FEATURES = 20
+
+
+def _sklearn():
+    from sklearn.linear_model import LogisticRegression
+
+    return LogisticRegression(max_iter=500)
+
+
+def _xgboost():
+    from xgboost import XGBClassifier
+
+    return XGBClassifier(n_estimators=50, max_depth=4)
+
+
+def _lightgbm():
+    from lightgbm import LGBMClassifier
+
+    return LGBMClassifier(n_estimators=50, verbose=-1)
+
+
+def _catboost():
+    from catboost import CatBoostClassifier
+
+    return CatBoostClassifier(iterations=50, verbose=0)
+
+
+MODELS = {
+    "sklearn": _sklearn,
+    "xgboost": _xgboost,
+    "lightgbm": _lightgbm,
+    "catboost": _catboost,
+}
+
+
+def fit_model(name):
+    """Fits the model of passed type, returns None if it is not installed."""
+    try:
+        model = MODELS[name]()
+    except ImportError:
+        log.warning("Model type `%s` is not installed, skipping", name)
+        return None
+    X, y = make_classification(
+        n_samples=500, n_features=N_FEATURES, random_state=0
+    )
+    return model.fit(X, y)
+
+
+def run_matrix(
+    backends, models, concurrency, batch_sizes, n_requests, warmup, env
+):
+    """Runs the matrix, returns list of results."""
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        # nothing to scan, requirements are not used locally
+        scan_path = workdir.joinpath("scan")
+        scan_path.mkdir()
+
+        for model_name in models:
+            model = fit_model(model_name)
+            if model is None:
+                continue
+
+            for backend in backends:
+                backend_path = SUPPORTED_BACKENDS[backend]
+                project_path = workdir.joinpath(f"{backend}-{model_name}")
+
+                started = time.perf_counter()
+                full_build(
+                    project_path,
+                    backend_path,
+                    backend_path.joinpath("server.py"),
+                    scan_path,
+                    [model],
+                    ["model"],
+                ).unwrap()
+                build_time = round(time.perf_counter() - started, 3)
+
+                with launch_project(project_path, find_free_port(), env) as url:
+                    for result in benchmark(
+                        url,
+                        N_FEATURES,
+                        concurrency=concurrency,
+                        batch_sizes=batch_sizes,
+                        n_requests=n_requests,
+                        warmup=warmup,
+                    ):
+                        results.append(
+                            {
+                                "backend": backend,
+                                "model": model_name,
+                                **result,
+                                "build_s": build_time,
+                            }
+                        )
+
+    return results
+
+
+@click.command()
+@click.option(
+    "--backend",
+    "-b",
+    "backends",
+    multiple=True,
+    type=click.Choice(sorted(SUPPORTED_BACKENDS)),
+    default=sorted(SUPPORTED_BACKENDS),
+    help="Backends to benchmark (all by default).",
+)
+@click.option(
+    "--model",
+    "-m",
+    "models",
+    multiple=True,
+    type=click.Choice(list(MODELS)),
+    default=list(MODELS),
+    help="Model types to benchmark (all by default).",
+)
+@click.option("--concurrency", "-c", type=int, multiple=True, default=(1, 8))
+@click.option(
+    "--batch-size", "batch_sizes", type=int, multiple=True, default=(1, 32)
+)
+@click.option("--requests", "n_requests", "-n", type=int, default=300)
+@click.option("--warmup", type=int, default=20)
+@click.option(
+    "--env",
+    "-e",
+    multiple=True,
+    callback=parse_env,
+    help="Environment variable of the services, e.g. MLJET_N_WORKERS=2.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    default="benchmark-matrix.json",
+    help="Path to the JSON artifact.",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Path to the baseline JSON artifact.",
+)
+@click.option("--threshold", type=float, default=0.1)
+def main(
+    backends,
+    models,
+    concurrency,
+    batch_sizes,
+    n_requests,
+    warmup,
+    env,
+    output,
+    compare,
+    threshold,
+):
+    """Benchmarks backend templates with different model types."""
+
+    init(verbose=False)
+
+    results = run_matrix(
+        backends,
+        models,
+        concurrency,
+        batch_sizes,
+        n_requests,
+        warmup,
+        env,
+    )
+
+    artifact = {
+        "meta": {
+            "mljet": mljet.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "env": [f"{key}={value}" for key, value in env.items()],
+            "requests": n_requests,
+        },
+        "results": results,
+    }
+
+    with open(output, "w", encoding="utf-8") as fout:
+        json.dump(artifact, fout, indent=4)
+
+    click.echo(format_info("results", results, "plain"))
+
+    if compare is None:
+        return
+
+    with open(compare, encoding="utf-8") as fin:
+        baseline = json.load(fin)["results"]
+
+    changes = compare_runs(
+        baseline,
+        results,
+        keys=("backend", "model", "concurrency", "batch_size"),
+        threshold=threshold,
+    )
+    click.echo(format_info("changes", changes, "plain"))
+
+    if any(change["regressed"] for change in changes):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
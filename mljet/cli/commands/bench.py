@@ -0,0 +1,200 @@
+"""CLI bench command module."""
+
+import logging
+from contextlib import nullcontext
+from pathlib import Path
+
+import click
+
+from mljet.cli.helpers import (
+    appearance,
+    format_info,
+    parse_env,
+)
+from mljet.contrib.analyzer import get_n_features
+from mljet.contrib.benchmark import (
+    PAYLOADS,
+    benchmark,
+    launch_project,
+    launch_replicas,
+)
+from mljet.utils.conn import find_free_port
+from mljet.utils.logging_ import init
+from mljet.utils.serializers import load_model
+
+log = logging.getLogger(__name__)
+
+
+@click.command("bench")
+@click.option(
+    "--project",
+    "project_path",
+    "-p",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Path to the built project to launch (defaults to ./build).",
+)
+@click.option(
+    "--url",
+    "-u",
+    default=None,
+    help="URL of the running service, the project is not launched.",
+)
+@click.option(
+    "--model",
+    "model_path",
+    "-m",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Path to the model file, used to detect count of features.",
+)
+@click.option(
+    "--n-features",
+    type=int,
+    default=None,
+    help="Count of the model features.",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=int,
+    multiple=True,
+    default=(1, 8),
+    show_default=True,
+    help="Count of the concurrent clients.",
+)
+@click.option(
+    "--batch-size",
+    "batch_sizes",
+    "-b",
+    type=int,
+    multiple=True,
+    default=(1, 32),
+    show_default=True,
+    help="Count of rows per request.",
+)
+@click.option(
+    "--requests",
+    "n_requests",
+    "-n",
+    type=int,
+    default=200,
+    show_default=True,
+    help="Count of the measured requests per combination.",
+)
+@click.option(
+    "--warmup",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Count of the warmup requests per combination.",
+)
+@click.option(
+    "--payload",
+    type=click.Choice(list(PAYLOADS)),
+    default="json",
+    show_default=True,
+    help="Payload format.",
+)
+@click.option(
+    "--method",
+    type=click.Choice(["predict", "predict_proba"]),
+    default="predict",
+    show_default=True,
+    help="Endpoint to load.",
+)
+@click.option(
+    "--env",
+    "-e",
+    multiple=True,
+    callback=parse_env,
+    help="Environment variable of the launched service, e.g. MLJET_N_WORKERS=4.",
+)
+@click.option(
+    "--startup-timeout",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="Max time in seconds to wait for the launched service.",
+)
+@click.option(
+    "--replicas",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Count of the launched services behind the load balancer.",
+)
+@click.option(
+    "--verbose",
+    "-v",
+    is_flag=True,
+    default=False,
+    help="Verbose mode.",
+)
+@appearance(dest_printer="echo", dest_formatting="formatting")
+def bench(
+    project_path,
+    url,
+    model_path,
+    n_features,
+    concurrency,
+    batch_sizes,
+    n_requests,
+    warmup,
+    payload,
+    method,
+    env,
+    startup_timeout,
+    replicas,
+    verbose,
+    echo,
+    formatting,
+):
+    """Benchmarks the built project or the running service."""
+
+    # logs are printed to stdout, so they would break
+    # the formatted report, if they are always enabled
+    if verbose:
+        init(verbose)
+
+    if project_path is None and url is None:
+        project_path = Path.cwd().joinpath("build")
+
+    if n_features is None:
+        if model_path is None and project_path is not None:
+            model_path = Path(project_path).joinpath("models", "model.pkl")
+        if model_path is None or not Path(model_path).exists():
+            raise click.BadParameter(
+                "Count of features can't be detected, "
+                "pass --n-features or --model."
+            )
+        n_features = get_n_features(load_model(model_path))
+        if n_features is None:
+            raise click.BadParameter(
+                "Model has no `n_features_in_`, pass --n-features."
+            )
+
+    if url is not None:
+        service = nullcontext(url)
+    elif replicas > 1:
+        service = launch_replicas(
+            project_path, find_free_port(), replicas, env, startup_timeout
+        )
+    else:
+        service = launch_project(
+            project_path, find_free_port(), env, startup_timeout
+        )
+
+    with service as service_url:
+        results = benchmark(
+            service_url,
+            n_features,
+            concurrency=concurrency,
+            batch_sizes=batch_sizes,
+            n_requests=n_requests,
+            warmup=warmup,
+            payload=payload,
+            method=method,
+        )
+
+    echo(format_info("bench", results, formatting))
@@ -1,15 +1,22 @@
 """CLI build command module."""
 
 import logging
-import pickle
 from pathlib import Path
 
 import click
 
+from mljet.cli.helpers import (
+    profile_option,
+    profile_to,
+)
 from mljet.contrib.actions.project_build import project_build
 from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
 from mljet.utils.logging_ import init
-from mljet.utils.serializers import detect_model_serializer
+from mljet.utils.profiling import span
+from mljet.utils.serializers import (
+    detect_model_serializer,
+    load_model,
+)
 
 log = logging.getLogger(__name__)
 
@@ -59,32 +66,139 @@ log = logging.getLogger(__name__)
     default=False,
     help="Verbose mode.",
 )
+@click.option(
+    "--workers",
+    "-j",
+    type=int,
+    default=1,
+    help="Number of workers to use.",
+)
+@click.option(
+    "--max-batch-size",
+    type=int,
+    default=1,
+    help="Max count of rows merged into one model call (micro-batching).",
+)
+@click.option(
+    "--max-batch-wait-us",
+    type=int,
+    default=1000,
+    help="Max time in microseconds to wait for the batch to be filled.",
+)
+@click.option(
+    "--response-encoder",
+    type=click.Choice(["auto", "json", "orjson"]),
+    default="auto",
+    help="Encoder of the service responses.",
+)
+@click.option(
+    "--float-precision",
+    type=int,
+    default=None,
+    help="Number of decimals to round output floats to.",
+)
+@click.option(
+    "--float32",
+    is_flag=True,
+    default=False,
+    help="Cast output floats to float32.",
+)
+@click.option(
+    "--executor",
+    type=click.Choice(["inline", "thread", "process"]),
+    default="thread",
+    help="Executor of the inference calls (async backends only).",
+)
+@click.option(
+    "--executor-workers",
+    type=int,
+    default=None,
+    help="Max count of the executor workers.",
+)
+@click.option(
+    "--max-pending",
+    type=int,
+    default=0,
+    help="Max count of the pending inference calls, 0 means no limit.",
+)
+@click.option(
+    "--requirements-from",
+    type=click.Choice(["source", "model", "both"]),
+    default="source",
+    help="Scan requirements from the sources, the pickled model or both.",
+)
+@click.option(
+    "--scan-recursive",
+    is_flag=True,
+    default=False,
+    help="Scan subdirectories of the scan path for requirements.",
+)
+@click.option(
+    "--dockerfile",
+    type=click.Choice(["backend", "multistage"]),
+    default="backend",
+    help="Copy Dockerfile of the backend or generate multi-stage one.",
+)
+@profile_option
 def build(
-    backend, additional_reqs, scan_path, model_path, ignore_mypy, verbose
+    backend,
+    additional_reqs,
+    scan_path,
+    model_path,
+    ignore_mypy,
+    verbose,
+    workers,
+    max_batch_size,
+    max_batch_wait_us,
+    response_encoder,
+    float_precision,
+    float32,
+    executor,
+    executor_workers,
+    max_pending,
+    requirements_from,
+    scan_recursive,
+    dockerfile,
+    profile_path,
 ):
     """Builds the project."""
 
     init(verbose)
 
-    scan_path = Path(scan_path).resolve()
-    model_path = Path(model_path).resolve()
+    with profile_to(profile_path):
+        scan_path = Path(scan_path).resolve()
+        model_path = Path(model_path).resolve()
 
-    serializer = detect_model_serializer(model_path)
-    # TODO (qnbhd): add support for other serializers
-    log.info("Detected model serializer: [bold red]%s[/]", serializer)
-    if serializer != "pickle":
-        raise NotImplementedError(f"Unsupported serializer: {serializer}")
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
+        serializer = detect_model_serializer(model_path)
+        log.info("Detected model serializer: [bold red]%s[/]", serializer)
+        if serializer == "unknown":
+            raise click.BadParameter(
+                f"Serializer of the model `{model_path}` is not detected."
+            )
+        with span("load-model"):
+            model = load_model(model_path, serializer)
 
-    project_build(
-        model=model,
-        backend=backend,
-        scan_path=scan_path,
-        verbose=verbose,
-        ignore_mypy=ignore_mypy,
-        additional_requirements_files=additional_reqs,
-    )
+        with span("project-build", "stage"):
+            project_build(
+                model=model,
+                backend=backend,
+                scan_path=scan_path,
+                verbose=verbose,
+                ignore_mypy=ignore_mypy,
+                additional_requirements_files=additional_reqs,
+                max_batch_size=max_batch_size,
+                max_batch_wait_us=max_batch_wait_us,
+                response_encoder=response_encoder,
+                float_precision=float_precision,
+                float32=float32,
+                executor=executor,
+                executor_workers=executor_workers,
+                max_pending=max_pending,
+                requirements_from=requirements_from,
+                scan_recursive=scan_recursive,
+                dockerfile=dockerfile,
+                n_workers=workers,
+            )
 
     log.info("Done!")
     log.info(f'Project was built in {Path.cwd() / "build"}')
@@ -1,16 +1,23 @@
 """CLI cook command module."""
 
 import logging
-import pickle
 from pathlib import Path
 
 import click
 
 from mljet import cook as mljet_cook
+from mljet.cli.helpers import (
+    profile_option,
+    profile_to,
+)
 from mljet.contrib.supported import Strategy
 from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
 from mljet.utils.logging_ import init
-from mljet.utils.serializers import detect_model_serializer
+from mljet.utils.profiling import span
+from mljet.utils.serializers import (
+    detect_model_serializer,
+    load_model,
+)
 
 log = logging.getLogger(__name__)
 
@@ -103,6 +110,79 @@ log = logging.getLogger(__name__)
     default=False,
     help="Silent mode (detached).",
 )
+@click.option(
+    "--max-batch-size",
+    type=int,
+    default=1,
+    help="Max count of rows merged into one model call (micro-batching).",
+)
+@click.option(
+    "--max-batch-wait-us",
+    type=int,
+    default=1000,
+    help="Max time in microseconds to wait for the batch to be filled.",
+)
+@click.option(
+    "--response-encoder",
+    type=click.Choice(["auto", "json", "orjson"]),
+    default="auto",
+    help="Encoder of the service responses.",
+)
+@click.option(
+    "--float-precision",
+    type=int,
+    default=None,
+    help="Number of decimals to round output floats to.",
+)
+@click.option(
+    "--float32",
+    is_flag=True,
+    default=False,
+    help="Cast output floats to float32.",
+)
+@click.option(
+    "--executor",
+    type=click.Choice(["inline", "thread", "process"]),
+    default="thread",
+    help="Executor of the inference calls (async backends only).",
+)
+@click.option(
+    "--executor-workers",
+    type=int,
+    default=None,
+    help="Max count of the executor workers.",
+)
+@click.option(
+    "--max-pending",
+    type=int,
+    default=0,
+    help="Max count of the pending inference calls, 0 means no limit.",
+)
+@click.option(
+    "--requirements-from",
+    type=click.Choice(["source", "model", "both"]),
+    default="source",
+    help="Scan requirements from the sources, the pickled model or both.",
+)
+@click.option(
+    "--scan-recursive",
+    is_flag=True,
+    default=False,
+    help="Scan subdirectories of the scan path for requirements.",
+)
+@click.option(
+    "--dockerfile",
+    type=click.Choice(["backend", "multistage"]),
+    default="backend",
+    help="Copy Dockerfile of the backend or generate multi-stage one.",
+)
+@click.option(
+    "--replicas",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Count of the containers, run behind the load balancer on the port.",
+)
+@profile_option
 def cook(
     model_path,
     strategy,
@@ -117,47 +197,77 @@ def cook(
     workers,
     silent,
     additional_reqs,
+    max_batch_size,
+    max_batch_wait_us,
+    response_encoder,
+    float_precision,
+    float32,
+    executor,
+    executor_workers,
+    max_pending,
+    requirements_from,
+    scan_recursive,
+    dockerfile,
+    replicas,
+    profile_path,
 ):
     """Builds and deploys the project."""
 
     if strategy == "local" and (
-        container_name is not None or tag is not None or base_image is not None
+        container_name is not None
+        or tag is not None
+        or base_image is not None
+        or replicas > 1
     ):
         raise click.BadParameter(
-            "Container name, tag and base image are not supported "
+            "Container name, tag, base image and replicas are not supported "
             "for local strategy."
         )
 
     init(verbose)
 
-    scan_path = Path(scan_path).resolve()
-    model_path = Path(model_path).resolve()
+    with profile_to(profile_path):
+        scan_path = Path(scan_path).resolve()
+        model_path = Path(model_path).resolve()
 
-    serializer = detect_model_serializer(model_path)
-    # TODO (qnbhd): add support for other serializers
-    log.info("Detected model serializer: [bold red]%s[/]", serializer)
-    if serializer != "pickle":
-        raise NotImplementedError(f"Unsupported serializer: {serializer}")
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
+        serializer = detect_model_serializer(model_path)
+        log.info("Detected model serializer: [bold red]%s[/]", serializer)
+        if serializer == "unknown":
+            raise click.BadParameter(
+                f"Serializer of the model `{model_path}` is not detected."
+            )
+        with span("load-model"):
+            model = load_model(model_path, serializer)
 
-    strategy = Strategy[strategy.upper()]
+        strategy = Strategy[strategy.upper()]
 
-    mljet_cook(
-        model=model,
-        strategy=strategy,
-        backend=backend,
-        port=port,
-        tag=tag,
-        base_image=base_image,
-        scan_path=scan_path,
-        verbose=verbose,
-        ignore_mypy=ignore_mypy,
-        need_run=True,
-        n_workers=workers,
-        silent=silent,
-        additional_requirements_files=additional_reqs,
-    )
+        mljet_cook(
+            model=model,
+            strategy=strategy,
+            backend=backend,
+            port=port,
+            tag=tag,
+            base_image=base_image,
+            scan_path=scan_path,
+            verbose=verbose,
+            ignore_mypy=ignore_mypy,
+            need_run=True,
+            n_workers=workers,
+            silent=silent,
+            additional_requirements_files=additional_reqs,
+            max_batch_size=max_batch_size,
+            max_batch_wait_us=max_batch_wait_us,
+            response_encoder=response_encoder,
+            float_precision=float_precision,
+            float32=float32,
+            executor=executor,
+            executor_workers=executor_workers,
+            max_pending=max_pending,
+            requirements_from=requirements_from,
+            scan_recursive=scan_recursive,
+            dockerfile=dockerfile,
+            replicas=replicas,
+        )
 
     log.info("Done!")
     log.info(f'Project was built in {Path.cwd() / "build"}')
@@ -1,7 +1,9 @@
 """CLI helpers module."""
 
 import json
+from contextlib import contextmanager
 from typing import (
+    Iterator,
     Literal,
     Optional,
     Union,
@@ -16,6 +18,8 @@ from mljet.utils.funcs import (
     compose,
     identity,
 )
+from mljet.utils.profiling import Profiler
+from mljet.utils.types import PathLike
 
 console = Console()
 
@@ -49,6 +53,55 @@ _no_color_option = lambda dest: option(
     help="Prints the output without colorization.",
 )
 
+# Profiling
+
+profile_option = option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Writes Chrome trace of the build steps to the file "
+    "and prints their timings.",
+)
+
+
+@contextmanager
+def profile_to(trace_path: Optional[PathLike]) -> Iterator[None]:
+    """
+    Profiles the wrapped block, if `trace_path` is passed.
+
+    Chrome trace of the steps is written to `trace_path`
+    and the steps table is printed, even if the block fails.
+    """
+
+    if trace_path is None:
+        yield
+        return
+
+    profiler = Profiler()
+    try:
+        with profiler:
+            yield
+    finally:
+        profiler.dump_trace(trace_path)
+        click.echo(format_info("profile", profiler.summary(), "plain"))
+        click.echo(f"Trace of the steps is written to {trace_path}")
+
+
+# Environment
+
+
+def parse_env(ctx, param, values):
+    """Parses `KEY=VALUE` pairs."""
+    env = {}
+    for value in values:
+        key, sep, val = value.partition("=")
+        if not sep or not key:
+            raise click.BadParameter(f"Expected KEY=VALUE, got `{value}`")
+        env[key] = val
+    return env
+
+
 # Formatting
 
 _plain_option = lambda dest: option(
@@ -101,7 +154,18 @@ Jsonable = Union[dict, list, str, int, float, bool, None]
 Format = Literal["markdown", "json", "plain"]
 
 
+def _is_records(data: Jsonable) -> bool:
+    """Checks if data is a table, i.e. non-empty list of dicts."""
+    return (
+        isinstance(data, list)
+        and bool(data)
+        and all(isinstance(x, dict) for x in data)
+    )
+
+
 def _plain_formatter(data: Jsonable) -> str:
+    if _is_records(data):
+        return pd.DataFrame(data).to_string(index=False)
     if isinstance(data, list):
         return ",".join(map(str, data))
     if isinstance(data, str):
@@ -123,6 +187,8 @@ def format_info(name: str, data: Jsonable, fmt: Format) -> str:
     """
 
     if fmt == "markdown":
+        if _is_records(data):
+            return pd.DataFrame(data).to_markdown(index=False)
         if isinstance(data, (int, float, str, bool)) or data is None:
             data = [data]
         return pd.Series(data, name=name).to_markdown()
@@ -4,7 +4,10 @@ import logging
 import platform
 import shutil
 from pathlib import Path
-from typing import Optional
+from typing import (
+    List,
+    Optional,
+)
 
 from mljet.contrib.supported import ModelType
 from mljet.contrib.validator import (
@@ -31,14 +34,39 @@ def docker_build(
     n_workers: int = 1,
     silent: bool = True,
     remove_project_dir: bool = False,
-) -> str:
-    """Cook docker image."""
+    startup_timeout: float = 120.0,
+    replicas: int = 1,
+) -> List[str]:
+    """
+    Cook docker image.
+
+    If `need_run`, the stage fails, unless the service answers
+    on the readiness route in `startup_timeout` seconds. Then the
+    time of the sample prediction is logged, its failure (e.g. the
+    model rejects the zeros row) doesn't fail the stage.
+    If `replicas` is more than 1, the containers are named
+    ``{container_name}-{i}`` and run behind the reverse proxy,
+    listening on `port`.
+
+    To tear the service down, remove the containers
+    (e.g. ``docker rm -f`` with the returned names). The proxy
+    of the background replicas exits by itself, once all the
+    containers are gone.
+
+    Returns:
+        Names of the containers.
+    """
     # Lazy docker import
     from mljet.contrib.dockerutils import (
         build_image,
         run_image,
+        run_replicas,
+        sample_payload,
     )
 
+    if replicas < 1:
+        raise ValueError(f"Count of replicas must be positive, got {replicas}")
+
     port = validate_ret_port(port)
 
     log.info("🔎 Detecting base image")
@@ -60,19 +88,39 @@ def docker_build(
     )
 
     container_name = container_name or get_random_name()
-    container_name = validate_ret_container_name(container_name)
+    container_names = (
+        [container_name]
+        if replicas == 1
+        else [f"{container_name}-{i}" for i in range(1, replicas + 1)]
+    )
+    container_names = [
+        validate_ret_container_name(name) for name in container_names
+    ]
 
-    if need_run:
+    if need_run and replicas == 1:
         run_image(
             tag,
             model_type=model_type,
             n_workers=n_workers,
-            container_name=container_name,
+            container_name=container_names[0],
+            port=port,
+            silent=silent,
+            probe_payload=sample_payload(model),
+            startup_timeout=startup_timeout,
+        )
+    elif need_run:
+        run_replicas(
+            tag,
+            model_type=model_type,
+            n_workers=n_workers,
+            container_names=container_names,
             port=port,
             silent=silent,
+            probe_payload=sample_payload(model),
+            startup_timeout=startup_timeout,
         )
 
     if remove_project_dir:
         shutil.rmtree(project_path, ignore_errors=True)
 
-    return container_name
+    return container_names
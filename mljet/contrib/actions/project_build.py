@@ -3,6 +3,8 @@
 import logging
 from pathlib import Path
 from typing import (
+    Dict,
+    List,
     Optional,
     Sequence,
     Union,
@@ -15,13 +17,16 @@ from returns.result import (
     safe,
 )
 
+from mljet.contrib.manifest import BuildManifest
 from mljet.contrib.project_builder import full_build
 from mljet.contrib.validator import (
     validate_ret_backend,
     validate_ret_model,
 )
+from mljet.cookie.templates.runtime import ServiceSettings
 from mljet.utils.logging_ import init
 from mljet.utils.pipelines.stage import stage
+from mljet.utils.requirements import sources_digest
 from mljet.utils.types import (
     Estimator,
     PathLike,
@@ -30,7 +35,34 @@ from mljet.utils.types import (
 log = logging.getLogger(__name__)
 
 
-@stage("project-build")
+def _build_state(
+    scan_path: Optional[PathLike] = None,
+    scan_recursive: bool = False,
+    additional_requirements_files: Optional[Sequence[PathLike]] = None,
+) -> List[str]:
+    """
+    Returns state of the files, that are read or written by the build,
+    so the stored result of the stage is not reused, if they are changed.
+    """
+
+    from mljet import __version__  # pylint: disable=import-outside-toplevel
+
+    project_path = Path.cwd().joinpath("build")
+
+    return [
+        __version__,
+        str(project_path.resolve()),
+        BuildManifest(project_path).fingerprint(),
+        sources_digest(
+            scan_path or Path.cwd(),
+            recursive=scan_recursive,
+            exclude=[project_path],
+        ),
+        *map(sources_digest, additional_requirements_files or []),
+    ]
+
+
+@stage("project-build", cache=_build_state)
 def project_build(
     model: Estimator,
     backend: Union[str, Path, None] = None,
@@ -38,8 +70,26 @@ def project_build(
     verbose: bool = False,
     ignore_mypy: bool = False,
     additional_requirements_files: Optional[Sequence[PathLike]] = None,
-) -> bool:
-    """Cook project"""
+    max_batch_size: int = 1,
+    max_batch_wait_us: int = 1000,
+    n_workers: int = 1,
+    response_encoder: str = "auto",
+    float_precision: Optional[int] = None,
+    float32: bool = False,
+    executor: str = "thread",
+    executor_workers: Optional[int] = None,
+    max_pending: int = 0,
+    requirements_from: str = "source",
+    scan_recursive: bool = False,
+    dockerfile: str = "backend",
+) -> Dict[str, List[str]]:
+    """
+    Cook project
+
+    Returns:
+        Artifacts of the project, that were reused,
+        rebuilt or removed by the incremental build.
+    """
 
     init(verbose=verbose)
 
@@ -64,6 +114,7 @@ def project_build(
     scan_path = Path(scan_path) if scan_path else Path.cwd()
 
     project_path = Path.cwd().joinpath("build")
+    manifest = BuildManifest(project_path)
 
     build_result = safe(full_build)(
         project_path,
@@ -75,6 +126,21 @@ def project_build(
         filename="server.py",
         ignore_mypy=ignore_mypy,
         additional_requirements_files=additional_requirements_files,
+        requirements_from=requirements_from,
+        scan_recursive=scan_recursive,
+        dockerfile=dockerfile,
+        manifest=manifest,
+        settings=ServiceSettings(
+            max_batch_size=max_batch_size,
+            max_batch_wait_us=max_batch_wait_us,
+            n_workers=n_workers,
+            response_encoder=response_encoder,
+            float_precision=float_precision,
+            float32=float32,
+            executor=executor,
+            executor_workers=executor_workers,
+            max_pending=max_pending,
+        ),
     )
 
     if not is_successful(build_result):
@@ -82,4 +148,4 @@ def project_build(
 
     log.info("Project structure successfully built")
 
-    return True
+    return manifest.report()
@@ -8,6 +8,7 @@ from typing import (
     Callable,
     Dict,
     List,
+    Optional,
 )
 
 from mljet.contrib.supported import ModelType
@@ -44,3 +45,23 @@ def get_associated_methods_wrappers(
     associated = dict(zip(extracted, get_dual_methods(mt, extracted)))
     log.info(f"Detected model methods: {json.dumps(extracted, indent=4)}")
     return associated
+
+
+def get_n_features(model: Estimator) -> Optional[int]:
+    """
+    Get count of the model input features.
+
+    Args:
+        model: fitted model
+
+    Returns:
+        Count of features or None, if it can't be detected.
+    """
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None:
+        return int(n_features)
+    # e.g. CatBoost models
+    names = getattr(model, "feature_names_", None)
+    if names is not None:
+        return len(names)
+    return None
@@ -0,0 +1,420 @@
+"""Load generator for the generated services."""
+
+import io
+import itertools
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import (
+    ExitStack,
+    contextmanager,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import requests
+
+from mljet.contrib.proxy import launch_proxy
+from mljet.utils.conn import (
+    find_free_port,
+    wait_for_port,
+)
+from mljet.utils.types import PathLike
+
+__all__ = [
+    "PAYLOADS",
+    "synthesize_batch",
+    "encode_payload",
+    "run_load",
+    "launch_project",
+    "launch_replicas",
+    "benchmark",
+    "compare_runs",
+]
+
+log = logging.getLogger(__name__)
+
+# payload format -> content type
+PAYLOADS = {
+    "json": "application/json",
+    "npy": "application/x-npy",
+}
+
+
+def synthesize_batch(
+    n_features: int, batch_size: int, seed: int = 0
+) -> np.ndarray:
+    """
+    Synthesizes batch of rows.
+
+    Args:
+        n_features: count of features
+        batch_size: count of rows
+        seed: seed of the random generator
+
+    Returns:
+        Matrix of normally distributed values.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((batch_size, n_features))
+
+
+def encode_payload(batch: np.ndarray, payload: str = "json") -> bytes:
+    """
+    Encodes batch into request body.
+
+    Args:
+        batch: rows to send
+        payload: payload format, one of :data:`PAYLOADS`
+
+    Returns:
+        Request body.
+    """
+    if payload == "json":
+        return json.dumps({"data": batch.tolist()}).encode()
+    if payload == "npy":
+        buffer = io.BytesIO()
+        np.save(buffer, batch)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown payload format `{payload}`")
+
+
+def _percentiles(latencies: Sequence[float]) -> Tuple[Any, ...]:
+    """Returns p50, p95, p99 in milliseconds."""
+    if not latencies:
+        return None, None, None
+    return tuple(
+        round(float(p) * 1000, 3)
+        for p in np.percentile(latencies, [50, 95, 99])
+    )
+
+
+def run_load(
+    url: str,
+    body: bytes,
+    content_type: str,
+    concurrency: int,
+    n_requests: int,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    Sends requests with closed-loop clients.
+
+    Each of ``concurrency`` clients sends the next
+    request right after the response to the previous one,
+    until ``n_requests`` requests are sent in total.
+
+    Args:
+        url: endpoint to send requests to
+        body: request body
+        content_type: request content type
+        concurrency: count of the concurrent clients
+        n_requests: total count of the requests
+        timeout: request timeout (in seconds)
+
+    Returns:
+        Count of requests and errors, throughput and latency percentiles.
+    """
+
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    headers = {"Content-Type": content_type}
+
+    def client():
+        nonlocal errors
+        with requests.Session() as session:
+            while next(counter) < n_requests:
+                started = time.perf_counter()
+                try:
+                    response = session.post(
+                        url, data=body, headers=headers, timeout=timeout
+                    )
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    p50, p95, p99 = _percentiles(latencies)
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+    }
+
+
+@contextmanager
+def launch_project(
+    project_path: PathLike,
+    port: int,
+    env: Optional[Mapping[str, str]] = None,
+    startup_timeout: float = 60.0,
+) -> Iterator[str]:
+    """
+    Launches built project locally.
+
+    Project is run with the current interpreter,
+    so its requirements must be installed.
+
+    Args:
+        project_path: path to the built project
+        port: port to bind
+        env: additional environment variables of the service
+            (e.g. ``MLJET_N_WORKERS``, ``MLJET_MAX_BATCH_SIZE``)
+        startup_timeout: maximum time (in seconds) to wait for the service
+
+    Yields:
+        Base URL of the service.
+
+    Raises:
+        FileNotFoundError: if project has no ``server.py``.
+        RuntimeError: if service failed to start.
+    """
+
+    project_path = Path(project_path).resolve()
+
+    if not project_path.joinpath("server.py").exists():
+        raise FileNotFoundError(f"`{project_path}` has no server.py")
+
+    host = "127.0.0.1"
+    service_env = {
+        **os.environ,
+        "SERVICE_HOST": host,
+        "SERVICE_PORT": str(port),
+        **(env or {}),
+    }
+
+    with tempfile.TemporaryFile() as logs:
+        log.info("Launching service from %s", project_path)
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "server.py"],
+            cwd=project_path,
+            env=service_env,
+            stdout=logs,
+            stderr=subprocess.STDOUT,
+            # service could fork workers, they are stopped with the group
+            start_new_session=hasattr(os, "killpg"),
+        )
+
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while not wait_for_port(port, host, timeout=0.5):
+                if process.poll() is not None or time.monotonic() > deadline:
+                    logs.seek(0)
+                    raise RuntimeError(
+                        "Service failed to start:\n"
+                        + logs.read().decode(errors="replace")
+                    )
+            yield f"http://{host}:{port}"
+        finally:
+            _stop(process)
+
+
+@contextmanager
+def launch_replicas(
+    project_path: PathLike,
+    port: int,
+    replicas: int,
+    env: Optional[Mapping[str, str]] = None,
+    startup_timeout: float = 60.0,
+) -> Iterator[str]:
+    """
+    Launches replicas of the built project behind the reverse proxy.
+
+    Replicas are launched locally (see :func:`launch_project`)
+    on free ports, the proxy listens on `port`.
+
+    Args:
+        project_path: path to the built project
+        port: port of the proxy
+        replicas: count of the replicas
+        env: additional environment variables of the services
+        startup_timeout: maximum time (in seconds) to wait for a replica
+
+    Yields:
+        Base URL of the proxy.
+    """
+
+    with ExitStack() as stack:
+        urls = [
+            stack.enter_context(
+                launch_project(
+                    project_path, find_free_port(), env, startup_timeout
+                )
+            )
+            for _ in range(replicas)
+        ]
+        proxy = launch_proxy(
+            port,
+            [("127.0.0.1", int(url.rsplit(":", 1)[1])) for url in urls],
+            host="127.0.0.1",
+        )
+        stack.callback(_stop, proxy)
+        yield f"http://127.0.0.1:{port}"
+
+
+def _stop(process: subprocess.Popen):
+    """Stops service with its workers."""
+    if process.poll() is not None:
+        return
+
+    def kill(sig):
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, sig)
+        else:
+            process.terminate()
+
+    kill(signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        kill(getattr(signal, "SIGKILL", signal.SIGTERM))
+        process.wait()
+
+
+def benchmark(
+    url: str,
+    n_features: int,
+    concurrency: Sequence[int] = (1, 8),
+    batch_sizes: Sequence[int] = (1, 32),
+    n_requests: int = 200,
+    warmup: int = 10,
+    payload: str = "json",
+    method: str = "predict",
+) -> List[Dict[str, Any]]:
+    """
+    Benchmarks the service.
+
+    Every combination of concurrency and batch size is
+    loaded with ``n_requests`` requests after ``warmup`` ones.
+
+    Args:
+        url: base URL of the service
+        n_features: count of the model features
+        concurrency: counts of the concurrent clients
+        batch_sizes: counts of rows per request
+        n_requests: count of the measured requests per combination
+        warmup: count of the warmup requests per combination
+        payload: payload format, one of :data:`PAYLOADS`
+        method: endpoint to load, e.g. ``predict``
+
+    Returns:
+        Results for every combination.
+    """
+
+    if payload not in PAYLOADS:
+        raise ValueError(f"Unknown payload format `{payload}`")
+
+    endpoint = f"{url.rstrip('/')}/{method}"
+    results = []
+
+    for batch_size in batch_sizes:
+        body = encode_payload(synthesize_batch(n_features, batch_size), payload)
+        for clients in concurrency:
+            log.info(
+                "Loading %s: concurrency %s, batch size %s",
+                endpoint,
+                clients,
+                batch_size,
+            )
+            if warmup:
+                run_load(endpoint, body, PAYLOADS[payload], clients, warmup)
+            stats = run_load(
+                endpoint, body, PAYLOADS[payload], clients, n_requests
+            )
+            results.append(
+                {
+                    "concurrency": clients,
+                    "batch_size": batch_size,
+                    **stats,
+                    "rows_per_s": round(stats["rps"] * batch_size, 2),
+                }
+            )
+
+    return results
+
+
+def compare_runs(
+    baseline: Sequence[Mapping[str, Any]],
+    current: Sequence[Mapping[str, Any]],
+    keys: Sequence[str] = ("concurrency", "batch_size"),
+    threshold: float = 0.1,
+) -> List[Dict[str, Any]]:
+    """
+    Compares two benchmark runs.
+
+    Results are matched by ``keys``. The result is regressed, if
+    its throughput dropped or its p99 latency grew by more than
+    ``threshold`` (relative change).
+
+    Args:
+        baseline: results of the baseline run
+        current: results of the current run
+        keys: fields, identifying the result
+        threshold: relative change, considered as a regression
+
+    Returns:
+        Changes of throughput and p99 latency for every matched result.
+    """
+
+    def key(result):
+        return tuple(result.get(k) for k in keys)
+
+    def change(old, new):
+        if not old or new is None:
+            return None
+        return round((new - old) / old, 4)
+
+    base = {key(result): result for result in baseline}
+    changes = []
+
+    for result in current:
+        old = base.get(key(result))
+        if old is None:
+            continue
+        rps = change(old["rps"], result["rps"])
+        p99 = change(old["p99_ms"], result["p99_ms"])
+        changes.append(
+            {
+                **{k: result.get(k) for k in keys},
+                "rps_change": rps,
+                "p99_change": p99,
+                "regressed": (rps is not None and rps < -threshold)
+                or (p99 is not None and p99 > threshold),
+            }
+        )
+
+    return changes
@@ -1,23 +1,64 @@
 """Docker build module."""
 
+import fnmatch
+import hashlib
+import json
 import logging
+import os
+import posixpath
 import re
 import signal
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
 from typing import (
-    NoReturn,
-    Union,
+    Any,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
 )
 
 import pandas as pd
+import requests
+
+from mljet.contrib.analyzer import get_n_features
+from mljet.contrib.proxy import launch_proxy
+from mljet.utils.cache import (
+    FileCache,
+    digest,
+)
+from mljet.utils.conn import find_free_port
+from mljet.utils.profiling import profiled
 
 log = logging.getLogger(__name__)
 
-_URL_REGEX = re.compile(
-    r"https?://(www\.)?[-a-zA-Z\d@:%._+~#=]{1,256}\.[a-zA-Z\d()]"
-    r"{1,6}\b([-a-zA-Z\d()@:%_+.~#?&/=]*)"
-)
+# label of the images with the digest of their build context
+CONTEXT_DIGEST_LABEL = "io.mljet.context-digest"
+# bump to invalidate digests of all images
+_CONTEXT_DIGEST_VERSION = "1"
+# maximum size (in bytes) of the cache of the images build durations
+DOCKER_CACHE_SIZE = 1024 * 1024
+
+# readiness route of the services, it is registered by every
+#  backend and answers, once the model is loaded
+HEALTH_ROUTE = "/health"
+
+# statuses of the server, that answers without the readiness
+#  route (e.g. custom backend), the server is considered ready
+_NO_ROUTE_STATUSES = (404, 405)
+
+# time (in seconds), the background proxy outlives its replicas
+PROXY_ORPHAN_TIMEOUT = 5.0
+
+# official python images without a variant suffix, e.g. python:3.10
+_PYTHON_IMAGE_REGEX = re.compile(r"^(?:.+/)?python:\d+(?:\.\d+)*$")
+
+
+class ServiceStartupError(RuntimeError):
+    """Raised if service in the container doesn't become ready."""
 
 
 @lru_cache(None)
@@ -54,40 +95,376 @@ def build_data(project_path: Path, example_data: pd.DataFrame):
     example_data.to_csv(str(data_path / "example.csv"), index=False)
 
 
-def build_image(project_path: Path, image_name: str, base_image: str):
+def slim_image(base_image: str) -> str:
+    """
+    Returns the slim variant of the official python image.
+
+    Other images are returned as is, so the runtime stage
+    of the multi-stage Dockerfile uses the base image.
+    """
+    if _PYTHON_IMAGE_REGEX.match(base_image):
+        return f"{base_image}-slim"
+    return base_image
+
+
+def read_dockerignore(project_path: Path) -> List[str]:
+    """Returns patterns of the project .dockerignore."""
+    try:
+        with open(Path(project_path).joinpath(".dockerignore")) as fin:
+            lines = fin.read().splitlines()
+    except OSError:
+        return []
+    patterns = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        pattern = posixpath.normpath(line.lstrip("!").strip()).lstrip("/")
+        patterns.append(f"!{pattern}" if negated else pattern)
+    return patterns
+
+
+def _match_parts(parts: List[str], pattern: List[str]) -> bool:
+    if not pattern:
+        return not parts
+    if pattern[0] == "**":
+        return any(
+            _match_parts(parts[i:], pattern[1:]) for i in range(len(parts) + 1)
+        )
+    return (
+        bool(parts)
+        and fnmatch.fnmatchcase(parts[0], pattern[0])
+        and _match_parts(parts[1:], pattern[1:])
+    )
+
+
+def is_ignored(relpath: str, patterns: List[str]) -> bool:
+    """
+    Checks if the file is excluded from the build context.
+
+    Patterns follow .dockerignore rules: ``*`` doesn't match
+    separators, ``**`` matches any number of directories,
+    the pattern matches the path or any of its parents and
+    the last matching pattern wins, ``!`` re-includes the path.
+    """
+    parts = relpath.split("/")
+    ignored = False
+    for pattern in patterns:
+        negated = pattern.startswith("!")
+        pattern_parts = pattern.lstrip("!").split("/")
+        if any(
+            _match_parts(parts[:i], pattern_parts)
+            for i in range(1, len(parts) + 1)
+        ):
+            ignored = not negated
+    return ignored
+
+
+def context_digest(
+    project_path: Path, buildargs: Optional[Mapping[str, str]] = None
+) -> str:
+    """
+    Compute a deterministic digest of the Docker build.
+
+    The digest covers relative paths, executable bits and contents
+    of the project files, and the build arguments (e.g. base image).
+    Files, excluded by .dockerignore, are not sent to Docker,
+    so they don't affect the digest.
+
+    Args:
+        project_path: path to the project
+        buildargs: build arguments of the image
+
+    Returns:
+        Hex digest.
+    """
+
+    parts = [
+        _CONTEXT_DIGEST_VERSION,
+        json.dumps(dict(buildargs or {}), sort_keys=True),
+    ]
+
+    ignore = read_dockerignore(project_path)
+
+    for root, dirs, files in os.walk(project_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = Path(root, name)
+            relpath = path.relative_to(project_path).as_posix()
+            if is_ignored(relpath, ignore):
+                continue
+            hasher = hashlib.sha256()
+            with open(path, "rb") as fin:
+                for chunk in iter(lambda: fin.read(2**20), b""):
+                    hasher.update(chunk)
+            parts += [
+                relpath,
+                "x" if path.stat().st_mode & stat.S_IXUSR else "-",
+                hasher.hexdigest(),
+            ]
+
+    return digest(*parts)
+
+
+def find_image(context: str):
+    """
+    Find an image, built from the context with the passed digest.
+
+    Args:
+        context: digest of the build context
+
+    Returns:
+        docker.models.images.Image or None
+    """
+
+    images = _get_docker_client().images.list(
+        filters={"label": f"{CONTEXT_DIGEST_LABEL}={context}"}
+    )
+    return images[0] if images else None
+
+
+@profiled("build-image")
+def build_image(
+    project_path: Path,
+    image_name: str,
+    base_image: str,
+    force: bool = False,
+):
     """
     Build a Docker image with the project.
 
+    Images are labeled with the digest of their build context
+    (see :func:`context_digest`). If an image with the same digest
+    exists, it is tagged with `image_name` instead of being rebuilt.
+
     Args:
         project_path: path to the project
         image_name: name of the image to build
         base_image: base image to build on
+        force: build the image, even if the same one exists
 
     Returns:
-        None
+        docker.models.images.Image: built or reused image
     """
 
+    # runtime image is used only by the multi-stage Dockerfile
+    buildargs = {
+        "BASE_IMAGE": base_image,
+        "RUNTIME_IMAGE": slim_image(base_image),
+    }
+    context = context_digest(project_path, buildargs)
+    durations = FileCache("docker", max_size=DOCKER_CACHE_SIZE)
+
+    image = None if force else find_image(context)
+
+    if image is not None:
+        if image_name not in image.tags:
+            image.tag(image_name)
+        saved = durations.get(context)
+        log.info(
+            "♻️ Reusing Docker image %s with the same content%s",
+            image.short_id,
+            f", saved ~{float(saved):.1f}s" if saved is not None else "",
+        )
+        return image
+
     log.info("🍻 Building Docker image")
 
-    _get_docker_client().images.build(
-        buildargs={"BASE_IMAGE": base_image},
+    started = time.perf_counter()
+    image, _ = _get_docker_client().images.build(
+        buildargs=buildargs,
         tag=image_name,
         path=str(project_path),
+        labels={CONTEXT_DIGEST_LABEL: context},
         rm=True,
     )
+    elapsed = time.perf_counter() - started
+    durations.put(context, f"{elapsed:.3f}".encode())
+    log.info("Docker image built in %.1fs", elapsed)
+
+    return image
+
+
+def sample_payload(model: Any) -> Optional[bytes]:
+    """
+    Returns request body with one row of zeros for the model.
+
+    Returns None, if count of the model features is unknown.
+    """
+    n_features = get_n_features(model)
+    if n_features is None or n_features <= 0:
+        return None
+    return json.dumps({"data": [[0.0] * n_features]}).encode()
+
+
+@profiled("wait-until-ready")
+def wait_until_ready(
+    container,
+    url: str,
+    timeout: float = 120.0,
+    initial_delay: float = 0.05,
+    max_delay: float = 2.0,
+) -> float:
+    """
+    Polls the readiness route of the service until it answers.
 
+    Services load the model before binding the port, so the first
+    successful response means the model is loaded. Requests are
+    retried with exponential backoff on connection errors and
+    non-2xx statuses. Servers without the readiness route
+    (404 or 405 status) are ready, once they answer.
 
-def run_image(  # type: ignore
+    Args:
+        container: container of the service
+        url: readiness endpoint of the service
+        timeout: maximum time (in seconds) to wait for the service
+        initial_delay: delay (in seconds) before the second request
+        max_delay: maximum delay (in seconds) between the requests
+
+    Returns:
+        Time (in seconds) from the call to the first successful response.
+
+    Raises:
+        ServiceStartupError: if container exited or the service
+            is not ready before the timeout expired.
+    """
+
+    started = time.monotonic()
+    deadline = started + timeout
+    delay = initial_delay
+    attempts = 0
+    last_error = "no response"
+
+    while True:
+        attempts += 1
+        left = deadline - time.monotonic()
+        try:
+            response = requests.get(url, timeout=max(left, 0.1))
+        except requests.RequestException as exc:
+            last_error = f"{type(exc).__name__}: {exc}"
+        else:
+            if response.ok or response.status_code in _NO_ROUTE_STATUSES:
+                elapsed = time.monotonic() - started
+                log.info(
+                    "⏱️ Service is ready in %.2fs (%s probes)",
+                    elapsed,
+                    attempts,
+                )
+                return elapsed
+            last_error = f"status {response.status_code}: {response.text[:200]}"
+
+        container.reload()
+        if container.status in ("exited", "dead"):
+            raise ServiceStartupError(
+                f"Container exited before the service became ready:\n"
+                f"{_logs_tail(container)}"
+            )
+        if time.monotonic() + delay > deadline:
+            raise ServiceStartupError(
+                f"Service is not ready in {timeout}s, the last probe"
+                f" failed with {last_error}:\n{_logs_tail(container)}"
+            )
+
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+def first_prediction(
+    url: str, payload: bytes, timeout: float = 60.0
+) -> Optional[float]:
+    """
+    Measures time of the first prediction of the ready service.
+
+    The failed prediction is logged, but not raised, because
+    the sample payload could be rejected by the model (e.g.
+    categorical features).
+
+    Args:
+        url: prediction endpoint of the service
+        payload: request body
+        timeout: timeout (in seconds) of the request
+
+    Returns:
+        Time (in seconds) of the prediction, None if it failed.
+    """
+
+    started = time.monotonic()
+    try:
+        response = requests.post(
+            url,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+    except requests.RequestException as exc:
+        log.warning("Sample prediction failed: %s", exc)
+        return None
+    elapsed = time.monotonic() - started
+    if not response.ok:
+        log.warning(
+            "Sample prediction failed with status %s: %s",
+            response.status_code,
+            response.text[:200],
+        )
+        return None
+    log.info("⏱️ First prediction in %.2fs", elapsed)
+    return elapsed
+
+
+def _logs_tail(container, lines: int = 50) -> str:
+    return container.logs(tail=lines).decode("utf-8", errors="replace")
+
+
+def _run_container(
+    image_name: str,
+    model_type: str,
+    n_workers: int,
+    container_name: str,
+    port: int,
+):
+    log.info(f"🐳 Running container [bold red]{container_name}[/]")
+
+    return _get_docker_client().containers.run(
+        image=image_name,
+        environment={
+            "MODEL_TYPE": model_type,
+            "MLJET_N_WORKERS": n_workers,
+        },
+        name=container_name,
+        ports={"5000": port},
+        detach=True,
+    )
+
+
+def _free_ports(count: int) -> List[int]:
+    ports: List[int] = []
+    while len(ports) < count:
+        port = find_free_port()
+        if port not in ports:
+            ports.append(port)
+    return ports
+
+
+@profiled("run-image")
+def run_image(
     image_name: str,
     model_type: str,
     n_workers: int,
     container_name: str,
     port: int = 5000,
     silent: bool = True,
-) -> Union[None, NoReturn]:
+    probe_payload: Optional[bytes] = None,
+    startup_timeout: float = 120.0,
+) -> float:
     """
     Run a Docker image with the project.
 
+    The call returns (or starts streaming the container logs, if
+    not `silent`) after the service is ready (see
+    :func:`wait_until_ready`). Then the time of the first prediction
+    of `probe_payload` is logged (see :func:`first_prediction`).
+
     Args:
         image_name: name of the image to run
         model_type: type of the model to run
@@ -95,35 +472,48 @@ def run_image(  # type: ignore
         container_name: name of the container to run
         port: port to run
         silent: if True, run container in the background
+        probe_payload: body of the sample prediction request,
+            no prediction is made if None
+        startup_timeout: maximum time (in seconds) to wait for the service
+
+    Returns:
+        Time (in seconds) from the container start to the readiness.
 
     Raises:
         Exception: if container with the same name already exists
+        ServiceStartupError: if service doesn't become ready,
+            the container is removed
 
     """
 
-    log.info(f"🐳 Running container [bold red]{container_name}[/]")
-
-    container = _get_docker_client().containers.run(
-        image=image_name,
-        environment={
-            "MODEL_TYPE": model_type,
-            "N_WORKERS": n_workers,
-        },
-        name=container_name,
-        ports={"5000": port},
-        detach=True,
+    container = _run_container(
+        image_name, model_type, n_workers, container_name, port
     )
 
-    if silent:
-        log.info(f"🚀 Service running on http://127.0.0.1:{port}")
-        return None
-
     def teardown():
         log.info("👋 Stopping container ...")
         container.kill()
         container.remove()
         log.info("👋 Container stopped")
 
+    try:
+        startup_time = wait_until_ready(
+            container,
+            f"http://127.0.0.1:{port}{HEALTH_ROUTE}",
+            timeout=startup_timeout,
+        )
+    except ServiceStartupError:
+        container.remove(force=True)
+        raise
+
+    if probe_payload is not None:
+        first_prediction(f"http://127.0.0.1:{port}/predict", probe_payload)
+
+    log.info(f"🚀 Service running on http://127.0.0.1:{port}")
+
+    if silent:
+        return startup_time
+
     signal.signal(signal.SIGHUP, lambda *_: teardown())
     signal.signal(signal.SIGTERM, lambda *_: teardown())
 
@@ -136,11 +526,121 @@ def run_image(  # type: ignore
             for drop in to_drop:
                 decoded = decoded.replace(drop, "")
 
-            if _URL_REGEX.search(decoded):
-                log.info(f"🚀 Service running on http://127.0.0.1:{port}")
-            else:
-                log.info(decoded.strip())
+            log.info(decoded.strip())
     except KeyboardInterrupt:
         teardown()
     finally:
         log.info("Service is closed! Bye ...")
+
+    return startup_time
+
+
+@profiled("run-replicas")
+def run_replicas(
+    image_name: str,
+    model_type: str,
+    n_workers: int,
+    container_names: Sequence[str],
+    port: int = 5000,
+    silent: bool = True,
+    probe_payload: Optional[bytes] = None,
+    startup_timeout: float = 120.0,
+) -> List[float]:
+    """
+    Run replicas of the image behind the reverse proxy.
+
+    Every container is published on a free port, containers are
+    started at once and waited in parallel. The proxy (see
+    :class:`~mljet.contrib.proxy.ReverseProxy`) listens on `port`
+    and sends every request to the replica with the least
+    count of the outstanding requests.
+
+    If `silent`, the proxy runs in the background and exits by
+    itself, once all the containers are stopped or removed
+    (e.g. ``docker rm -f``) for ``PROXY_ORPHAN_TIMEOUT`` seconds,
+    so the port is released. Otherwise the proxy and containers
+    are stopped on interrupt.
+
+    Args:
+        image_name: name of the image to run
+        model_type: type of the model to run
+        n_workers: number of workers to run in every container
+        container_names: names of the containers, one per replica
+        port: port of the proxy
+        silent: if True, run containers and proxy in the background
+        probe_payload: body of the sample prediction request,
+            it is sent through the proxy, no prediction is made if None
+        startup_timeout: maximum time (in seconds) to wait for the service
+
+    Returns:
+        Time (in seconds) from the start to the readiness
+        of every replica.
+
+    Raises:
+        ServiceStartupError: if any replica doesn't become ready,
+            all containers are removed
+
+    """
+
+    ports = _free_ports(len(container_names))
+    containers = []
+
+    try:
+        for name, replica_port in zip(container_names, ports):
+            containers.append(
+                _run_container(
+                    image_name, model_type, n_workers, name, replica_port
+                )
+            )
+        with ThreadPoolExecutor(len(containers)) as pool:
+            startup_times = list(
+                pool.map(
+                    lambda container, replica_port: wait_until_ready(
+                        container,
+                        f"http://127.0.0.1:{replica_port}{HEALTH_ROUTE}",
+                        timeout=startup_timeout,
+                    ),
+                    containers,
+                    ports,
+                )
+            )
+        proxy = launch_proxy(
+            port,
+            [("127.0.0.1", replica_port) for replica_port in ports],
+            silent=silent,
+            orphan_timeout=PROXY_ORPHAN_TIMEOUT if silent else None,
+        )
+    except Exception:
+        for container in containers:
+            container.remove(force=True)
+        raise
+
+    log.info(
+        f"🚀 Service running on http://127.0.0.1:{port}"
+        f" ({len(containers)} replicas, proxy pid {proxy.pid})"
+    )
+
+    if probe_payload is not None:
+        first_prediction(f"http://127.0.0.1:{port}/predict", probe_payload)
+
+    if silent:
+        return startup_times
+
+    def teardown():
+        log.info("👋 Stopping proxy and containers ...")
+        proxy.terminate()
+        for container in containers:
+            container.remove(force=True)
+        log.info("👋 Containers stopped")
+
+    signal.signal(signal.SIGHUP, lambda *_: teardown())
+    signal.signal(signal.SIGTERM, lambda *_: teardown())
+
+    try:
+        proxy.wait()
+    except KeyboardInterrupt:
+        teardown()
+    finally:
+        log.info("Service is closed! Bye ...")
+
+    return startup_times
@@ -41,6 +41,18 @@ def cook(
     remove_project_dir: bool = False,
     ignore_mypy: bool = False,
     additional_requirements_files: Optional[Sequence[PathLike]] = None,
+    max_batch_size: int = 1,
+    max_batch_wait_us: int = 1000,
+    response_encoder: str = "auto",
+    float_precision: Optional[int] = None,
+    float32: bool = False,
+    executor: str = "thread",
+    executor_workers: Optional[int] = None,
+    max_pending: int = 0,
+    requirements_from: str = "source",
+    scan_recursive: bool = False,
+    dockerfile: str = "backend",
+    replicas: int = 1,
 ) -> RunResult:
     """
     Cook web-service.
@@ -55,15 +67,40 @@ def cook(
         need_run: run service after build or not
         port: port to use
         scan_path: path to scan for requirements
-        n_workers: number of workers
+        n_workers: number of service worker processes, sharing
+            the model loaded by the parent process
         silent: silent mode
         verbose: verbose mode
         remove_project_dir: remove project directory after build
         ignore_mypy: ignore mypy errors
         additional_requirements_files: additional requirements files
+        max_batch_size: maximum count of rows merged into one model call
+            by the service, values less than 2 disable micro-batching
+        max_batch_wait_us: maximum time (in microseconds) the service
+            waits for the batch to be filled
+        response_encoder: encoder of the service responses, one of
+            ``json``, ``orjson`` or ``auto`` (``orjson`` if it is installed)
+        float_precision: number of decimals to round output floats to
+        float32: cast output floats to ``float32`` to shrink responses
+        executor: executor of the inference calls in async backends:
+            ``thread`` for libraries, that release the GIL,
+            ``process`` for the others, ``inline`` to run on the event loop
+        executor_workers: maximum count of the executor workers
+        max_pending: maximum count of the pending inference calls,
+            extra requests are rejected with 503, 0 means no limit
+        requirements_from: source of the service requirements:
+            ``source`` scans imports of the files in `scan_path`,
+            ``model`` scans globals of the pickled model, ``both``
+            merges them
+        scan_recursive: scan subdirectories of `scan_path` too
+        dockerfile: ``backend`` copies Dockerfile of the backend,
+            ``multistage`` generates multi-stage Dockerfile with
+            a slim runtime image and models in the last layer
+        replicas: count of the containers, run behind the reverse
+            proxy on `port` (docker strategy only)
 
     Returns:
-        Result of build, maybe bool or container name (if docker strategy)
+        Result of build, maybe bool or container names (if docker strategy)
 
     """
 
@@ -90,6 +127,18 @@ def cook(
         remove_project_dir=remove_project_dir,
         ignore_mypy=ignore_mypy,
         additional_requirements_files=additional_requirements_files,
+        max_batch_size=max_batch_size,
+        max_batch_wait_us=max_batch_wait_us,
+        response_encoder=response_encoder,
+        float_precision=float_precision,
+        float32=float32,
+        executor=executor,
+        executor_workers=executor_workers,
+        max_pending=max_pending,
+        requirements_from=requirements_from,
+        scan_recursive=scan_recursive,
+        dockerfile=dockerfile,
+        replicas=replicas,
     )
 
 
@@ -0,0 +1,168 @@
+"""Manifest of the built project artifacts."""
+
+import filecmp
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+import joblib
+
+from mljet.utils.cache import digest
+from mljet.utils.types import (
+    PathLike,
+    Serializer,
+)
+
+__all__ = ["MANIFEST_FILENAME", "BuildManifest"]
+
+MANIFEST_FILENAME = ".mljet-manifest.json"
+
+log = logging.getLogger(__name__)
+
+
+class BuildManifest:
+    """
+    Content hashes of the project artifacts.
+
+    Artifacts are rewritten only when their content differs from the
+    one on the disk, so unchanged files keep their mtimes and the
+    Docker layer cache stays valid. Models are serialized only when
+    their fingerprint differs from the one in the manifest.
+
+    Artifacts of the previous build, that were not produced by the
+    current one, are removed on :meth:`save`.
+
+    Args:
+        project_path: path to the project directory
+    """
+
+    def __init__(self, project_path: PathLike):
+        self.project_path = Path(project_path)
+        self.path = self.project_path.joinpath(MANIFEST_FILENAME)
+        self._previous = self._load()
+        self._current: Dict[str, str] = {}
+        self.reused: List[str] = []
+        self.rebuilt: List[str] = []
+        self.removed: List[str] = []
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "rb") as fin:
+                artifacts = json.loads(fin.read())["artifacts"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+        return artifacts if isinstance(artifacts, dict) else {}
+
+    def _record(self, relpath: str, fingerprint: str, reused: bool):
+        self._current[relpath] = fingerprint
+        (self.reused if reused else self.rebuilt).append(relpath)
+        log.debug("%s `%s`", "Reused" if reused else "Rebuilt", relpath)
+
+    def write_bytes(self, relpath: str, data: bytes) -> Path:
+        """Writes artifact, if its content is changed."""
+        target = self.project_path.joinpath(relpath)
+        try:
+            with open(target, "rb") as fin:
+                unchanged = fin.read() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "wb") as fout:
+                fout.write(data)
+        self._record(relpath, digest(data), unchanged)
+        return target
+
+    def write_text(self, relpath: str, text: str) -> Path:
+        """Writes text artifact, if its content is changed."""
+        return self.write_bytes(relpath, text.encode("utf-8"))
+
+    def copy_file(self, relpath: str, source: PathLike) -> Path:
+        """Copies file to the artifact, if their contents differ."""
+        target = self.project_path.joinpath(relpath)
+        try:
+            unchanged = filecmp.cmp(source, target, shallow=False)
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+        self._record(relpath, digest(Path(source).read_bytes()), unchanged)
+        return target
+
+    def dump_model(
+        self, relpath: str, model: Any, serializer: Serializer
+    ) -> Path:
+        """
+        Serializes model, if its fingerprint is changed.
+
+        The fingerprint is computed by :func:`joblib.hash`, which
+        hashes the array buffers without copying them.
+        """
+        target = self.project_path.joinpath(relpath)
+        name = getattr(serializer, "__name__", type(serializer).__name__)
+        fingerprint = f"{name}:{joblib.hash(model)}"
+        unchanged = (
+            self._previous.get(relpath) == fingerprint and target.is_file()
+        )
+        if not unchanged:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "wb") as fout:
+                serializer.dump(model, fout)
+        self._record(relpath, fingerprint, unchanged)
+        return target
+
+    def report(self) -> Dict[str, List[str]]:
+        """Returns reused, rebuilt and removed artifacts."""
+        return {
+            "reused": sorted(self.reused),
+            "rebuilt": sorted(self.rebuilt),
+            "removed": sorted(self.removed),
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Returns fingerprint of the built project.
+
+        It is changed, if the manifest or any of its artifacts
+        is changed or removed since the last build.
+        """
+        parts = [json.dumps(self._previous, sort_keys=True)]
+        for relpath in sorted(self._previous):
+            try:
+                stat = self.project_path.joinpath(relpath).stat()
+            except OSError:
+                parts.append(f"{relpath}:missing")
+                continue
+            parts.append(f"{relpath}:{stat.st_mtime_ns}:{stat.st_size}")
+        return digest(*parts)
+
+    def save(self) -> Path:
+        """Removes stale artifacts and writes the manifest."""
+        root = self.project_path.resolve()
+        for relpath in sorted(set(self._previous) - set(self._current)):
+            stale = root.joinpath(relpath).resolve()
+            # never remove files outside of the project
+            if root not in stale.parents:
+                continue
+            if stale.is_file():
+                stale.unlink()
+                self.removed.append(relpath)
+        data = json.dumps(
+            {"artifacts": dict(sorted(self._current.items()))}, indent=4
+        )
+        try:
+            with open(self.path, "rb") as fin:
+                unchanged = fin.read() == data.encode("utf-8")
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            with open(self.path, "w", encoding="utf-8") as fout:
+                fout.write(data)
+        return self.path
@@ -3,11 +3,14 @@
 import json
 import logging
 import pickle
+import re
 import shutil
+import tempfile
 from functools import partial
 from pathlib import Path
 from typing import (
     Callable,
+    Dict,
     List,
     Optional,
     Sequence,
@@ -30,10 +33,23 @@ from returns.result import (
 )
 
 from mljet.contrib.analyzer import get_associated_methods_wrappers
+from mljet.contrib.manifest import BuildManifest
 from mljet.cookie.cutter import build_backend as cook_backend
+from mljet.cookie.templates import runtime
+from mljet.cookie.templates.docker import (
+    DOCKERIGNORE,
+    MULTISTAGE_DOCKERFILE,
+)
+from mljet.cookie.templates.runtime import (
+    SETTINGS_FILENAME,
+    ServiceSettings,
+)
+from mljet.utils.profiling import profiled
 from mljet.utils.requirements import (
     make_requirements_txt,
     merge_requirements_txt,
+    scan_model_requirements,
+    write_requirements_txt,
 )
 from mljet.utils.types import (
     Estimator,
@@ -43,6 +59,18 @@ from mljet.utils.types import (
 
 get_mna_aw = safe(get_associated_methods_wrappers)
 
+# runtime helpers, used by backend templates
+RUNTIME_PATH = Path(runtime.__file__).parent
+RUNTIME_PACKAGE = "mljet_runtime"
+
+# sources of the requirements: project sources, pickled models or both
+REQUIREMENTS_SOURCES = ("source", "model", "both")
+
+# Dockerfiles: copied from the backend or generated multi-stage one
+DOCKERFILE_MODES = ("backend", "multistage")
+
+_CMD_REGEX = re.compile(r"^CMD\s.*$", re.MULTILINE)
+
 log = logging.getLogger(__name__)
 
 
@@ -58,6 +86,7 @@ def managed_write(
         return Success(Path(filepath))
 
 
+@profiled("init-project-directory")
 def init_project_directory(path: PathLike, force: bool = False) -> Path:
     """Initializes project directory."""
     log.info("Initializing project directory")
@@ -72,18 +101,29 @@ def init_project_directory(path: PathLike, force: bool = False) -> Path:
     return path
 
 
+@profiled("dump-models")
 def dumps_models(
     path: PathLike,
     models: Sequence[Estimator],
     models_names: Sequence[str],
     serializer: Serializer = pickle,  # type: ignore
     ext: str = "pkl",
+    manifest: Optional[BuildManifest] = None,
 ) -> Path:
-    """Dumps models to models_path."""
+    """
+    Dumps models to models_path.
+
+    If `manifest` is passed, models with unchanged
+    fingerprints are not serialized again.
+    """
     log.info("Serializing models")
     models_path = Path(path) / "models"
     if len(models) != len(models_names):
         raise ValueError("models and models_names must be same length")
+    if manifest is not None:
+        for name, model in zip(models_names, models):
+            manifest.dump_model(f"models/{name}.{ext}", model, serializer)
+        return Path(path)
     dump_result = Fold.collect(  # type: ignore
         [
             # write serialized model to models_path
@@ -109,6 +149,7 @@ def dumps_models(
     return Path(path)
 
 
+@profiled("build-backend")
 def build_backend(
     path: PathLike,
     filename: str,
@@ -116,6 +157,7 @@ def build_backend(
     models: Sequence,
     imports: Optional[Sequence[str]] = None,
     ignore_mypy: bool = False,
+    manifest: Optional[BuildManifest] = None,
 ) -> Path:
     path_wrapped = Path(path)
     imports = imports or []
@@ -156,6 +198,8 @@ def build_backend(
                 path_wrapped.joinpath(filename),
                 lambda stream: stream.write(x),
             )
+            if manifest is None
+            else safe(manifest.write_text)(filename, x)
         )
     )
 
@@ -166,38 +210,212 @@ def build_backend(
 
 
 def copy_backend_dockerfile(
-    project_path: PathLike, backend_path: PathLike
+    project_path: PathLike,
+    backend_path: PathLike,
+    manifest: Optional[BuildManifest] = None,
 ) -> Path:
     """Copies backend Dockerfile to project_path."""
     backend_dockerfile = Path(backend_path).joinpath("Dockerfile")
+    if manifest is not None:
+        manifest.copy_file("Dockerfile", backend_dockerfile)
+        return Path(project_path)
     project_dockerfile = Path(project_path).joinpath("Dockerfile")
     shutil.copyfile(backend_dockerfile, project_dockerfile)
     return Path(project_path)
 
 
+def write_multistage_dockerfile(
+    project_path: PathLike,
+    backend_path: PathLike,
+    filename: str = "server.py",
+    manifest: Optional[BuildManifest] = None,
+) -> Path:
+    """
+    Writes multi-stage Dockerfile to project_path.
+
+    Requirements are installed in the builder stage and only
+    the installed packages are copied into the slim runtime stage.
+    Models are copied in the last layer, so the layers of
+    the requirements and the code are reused, when only models change.
+    The command of the service is taken from the backend Dockerfile.
+    """
+    with open(Path(backend_path).joinpath("Dockerfile")) as fin:
+        commands = _CMD_REGEX.findall(fin.read())
+    if not commands:
+        raise ValueError(f"Backend Dockerfile in {backend_path} has no CMD")
+    with open(MULTISTAGE_DOCKERFILE) as fin:
+        dockerfile = fin.read().format(
+            runtime=RUNTIME_PACKAGE,
+            filename=filename,
+            settings=SETTINGS_FILENAME,
+            cmd=commands[-1],
+        )
+    if manifest is not None:
+        manifest.write_text("Dockerfile", dockerfile)
+    else:
+        with open(Path(project_path).joinpath("Dockerfile"), "w") as fout:
+            fout.write(dockerfile)
+    return Path(project_path)
+
+
+def copy_dockerignore(
+    project_path: PathLike, manifest: Optional[BuildManifest] = None
+) -> Path:
+    """Copies .dockerignore to project_path."""
+    if manifest is not None:
+        manifest.copy_file(".dockerignore", DOCKERIGNORE)
+    else:
+        shutil.copyfile(
+            DOCKERIGNORE, Path(project_path).joinpath(".dockerignore")
+        )
+    return Path(project_path)
+
+
+@profiled("build-dockerfile")
+def build_dockerfile(
+    project_path: PathLike,
+    backend_path: PathLike,
+    filename: str = "server.py",
+    dockerfile: str = "backend",
+    manifest: Optional[BuildManifest] = None,
+) -> Path:
+    """
+    Builds Dockerfile and .dockerignore
+
+    Dockerfile is copied from the backend, or generated
+    multi-stage one is written, depending on `dockerfile`.
+    """
+
+    if dockerfile not in DOCKERFILE_MODES:
+        raise ValueError(
+            f"Unknown Dockerfile mode `{dockerfile}`,"
+            f" expected one of {DOCKERFILE_MODES}"
+        )
+
+    if dockerfile == "multistage":
+        write_multistage_dockerfile(
+            project_path, backend_path, filename, manifest=manifest
+        )
+    else:
+        copy_backend_dockerfile(project_path, backend_path, manifest=manifest)
+
+    return copy_dockerignore(project_path, manifest=manifest)
+
+
+@profiled("copy-runtime")
+def copy_runtime(
+    project_path: PathLike, manifest: Optional[BuildManifest] = None
+) -> Path:
+    """Copies runtime helpers package to project_path."""
+    runtime_path = Path(project_path).joinpath(RUNTIME_PACKAGE)
+    runtime_path.mkdir(parents=True, exist_ok=True)
+    for module in RUNTIME_PATH.glob("*.py"):
+        if manifest is not None:
+            manifest.copy_file(f"{RUNTIME_PACKAGE}/{module.name}", module)
+        else:
+            shutil.copyfile(module, runtime_path.joinpath(module.name))
+    return Path(project_path)
+
+
+@profiled("write-service-settings")
+def write_service_settings(
+    project_path: PathLike,
+    settings: Optional[ServiceSettings] = None,
+    manifest: Optional[BuildManifest] = None,
+) -> Path:
+    """Writes service settings to project_path."""
+    settings = settings or ServiceSettings()
+    log.debug("Service settings: %s", settings)
+    if manifest is not None:
+        manifest.write_text(SETTINGS_FILENAME, settings.to_json())
+    else:
+        settings.dump(Path(project_path).joinpath(SETTINGS_FILENAME))
+    return Path(project_path)
+
+
+@profiled("build-requirements")
 def build_requirements_txt(
     project_path: PathLike,
     backend_path: PathLike,
     scan_path: PathLike,
     additional_requirements_files: Optional[Sequence[PathLike]] = None,
+    models: Optional[Sequence] = None,
+    requirements_from: str = "source",
+    scan_recursive: bool = False,
+    manifest: Optional[BuildManifest] = None,
 ) -> Path:
-    """Builds requirements.txt"""
+    """
+    Builds requirements.txt
+
+    Requirements are taken from the imports of the sources in
+    `scan_path`, from the globals of the pickled models
+    or from both, depending on `requirements_from`. Subdirectories
+    of `scan_path` are scanned, if `scan_recursive` is set.
+    """
+
+    if requirements_from not in REQUIREMENTS_SOURCES:
+        raise ValueError(
+            f"Unknown requirements source `{requirements_from}`,"
+            f" expected one of {REQUIREMENTS_SOURCES}"
+        )
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # scanned requirements are merged in the scratch file,
+        # so the target is written once
+        _build_requirements_txt(
+            project_path,
+            backend_path,
+            scan_path,
+            Path(scratch).joinpath("requirements.txt"),
+            additional_requirements_files,
+            models,
+            requirements_from,
+            scan_recursive,
+            manifest,
+        )
 
+    return Path(project_path)
+
+
+def _build_requirements_txt(
+    project_path: PathLike,
+    backend_path: PathLike,
+    scan_path: PathLike,
+    scanned_reqs_path: Path,
+    additional_requirements_files: Optional[Sequence[PathLike]],
+    models: Optional[Sequence],
+    requirements_from: str,
+    scan_recursive: bool,
+    manifest: Optional[BuildManifest],
+):
     scan_path = Path(scan_path)
     backend_reqs = Path(backend_path).joinpath("requirements.txt")
     target_reqs_path = Path(project_path).joinpath("requirements.txt")
     make_reqs_txt = safe(make_requirements_txt)
 
-    # try to scan and make requirements.txt
-    log.info("Scanning and making requirements.txt")
-    make_result = make_reqs_txt(
-        scan_path, out_path=target_reqs_path, ignore_mods=["mljet"]
-    )
+    reqs: Dict[str, str] = {}
+
+    if requirements_from in ("source", "both"):
+        # try to scan and make requirements.txt
+        log.info("Scanning and making requirements.txt")
+        make_result = make_reqs_txt(
+            scan_path,
+            out_path=scanned_reqs_path,
+            ignore_mods=["mljet"],
+            recursive=scan_recursive,
+            # sources of the previous build are not the user's ones
+            exclude=[project_path],
+        )
 
-    if not is_successful(make_result):
-        raise make_result.failure()
+        if not is_successful(make_result):
+            raise make_result.failure()
 
-    reqs = make_result.unwrap()
+        reqs.update(make_result.unwrap())
+
+    if requirements_from in ("model", "both"):
+        log.info("Scanning models for requirements")
+        reqs.update(scan_model_requirements(models or [], ["mljet"]))
+        write_requirements_txt(reqs, scanned_reqs_path)
     if not reqs and not additional_requirements_files:
         log.warning(
             "No requirements in scan stage found. Service may not work properly."
@@ -214,7 +432,7 @@ def build_requirements_txt(
     merge_reqs_result = flow(
         # setup merge-reqs
         safe(merge_requirements_txt)(
-            backend_reqs, target_reqs_path, *additional_requirements_files
+            backend_reqs, scanned_reqs_path, *additional_requirements_files
         ),
         # write to file
         bind(
@@ -224,6 +442,10 @@ def build_requirements_txt(
                         target_reqs_path,
                         lambda stream: stream.write("\n".join(deps)),
                     )
+                    if manifest is None
+                    else manifest.write_text(
+                        "requirements.txt", "\n".join(deps)
+                    )
                 )
             )
         ),
@@ -232,6 +454,11 @@ def build_requirements_txt(
     if not is_successful(merge_reqs_result):
         raise merge_reqs_result.failure()
 
+
+@profiled("save-manifest")
+def save_manifest(project_path: PathLike, manifest: BuildManifest) -> Path:
+    """Removes stale artifacts and writes build manifest to project_path."""
+    manifest.save()
     return Path(project_path)
 
 
@@ -248,9 +475,24 @@ def full_build(
     ext: str = "pkl",
     ignore_mypy: bool = False,
     additional_requirements_files: Optional[Sequence[PathLike]] = None,
+    settings: Optional[ServiceSettings] = None,
+    requirements_from: str = "source",
+    scan_recursive: bool = False,
+    dockerfile: str = "backend",
+    manifest: Optional[BuildManifest] = None,
 ) -> ResultE[Path]:
-    """Builds project."""
+    """
+    Builds project.
+
+    The build is incremental: artifacts are rewritten only when their
+    content is changed, models are serialized only when their
+    fingerprints are changed (see :class:`BuildManifest`).
+
+    Dockerfile is copied from the backend or generated multi-stage
+    one is written, depending on `dockerfile` (see :func:`build_dockerfile`).
+    """
     imports = imports or []
+    manifest = manifest or BuildManifest(project_path)
     build_result = (
         safe(init_project_directory)(project_path, force=True)
         .bind(
@@ -262,10 +504,31 @@ def full_build(
                     models=models,
                     imports=imports,
                     ignore_mypy=ignore_mypy,
+                    manifest=manifest,
+                )
+            )
+        )
+        .bind(
+            safe(
+                partial(
+                    build_dockerfile,
+                    backend_path=backend_path,
+                    filename=filename,
+                    dockerfile=dockerfile,
+                    manifest=manifest,
+                )
+            )
+        )
+        .bind(safe(partial(copy_runtime, manifest=manifest)))
+        .bind(
+            safe(
+                partial(
+                    write_service_settings,
+                    settings=settings,
+                    manifest=manifest,
                 )
             )
         )
-        .bind(safe(partial(copy_backend_dockerfile, backend_path=backend_path)))
         .bind(
             safe(
                 partial(
@@ -273,6 +536,10 @@ def full_build(
                     backend_path=backend_path,
                     scan_path=scan_path,
                     additional_requirements_files=additional_requirements_files,
+                    models=models,
+                    requirements_from=requirements_from,
+                    scan_recursive=scan_recursive,
+                    manifest=manifest,
                 )
             )
         )
@@ -284,12 +551,23 @@ def full_build(
                     models_names=models_names,
                     serializer=serializer,
                     ext=ext,
+                    manifest=manifest,
                 )
             )
         )
+        .bind(safe(partial(save_manifest, manifest=manifest)))
     )
 
     if not is_successful(build_result):
         raise build_result.failure()
 
+    report = manifest.report()
+    log.info(
+        "Artifacts reused: %s, rebuilt: %s, removed: %s",
+        len(report["reused"]),
+        len(report["rebuilt"]),
+        len(report["removed"]),
+    )
+    log.debug("Build report: %s", json.dumps(report, indent=4))
+
     return build_result
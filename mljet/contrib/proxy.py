@@ -0,0 +1,490 @@
+"""Reverse proxy, balancing requests between the service replicas."""
+
+import asyncio
+import itertools
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import (
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import click
+
+from mljet.utils.conn import wait_for_port
+
+__all__ = ["Upstream", "ReverseProxy", "launch_proxy"]
+
+log = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+# headers of the connection, they are not forwarded
+_HOP_HEADERS = {
+    b"connection",
+    b"keep-alive",
+    b"proxy-connection",
+    b"te",
+    b"trailer",
+    b"transfer-encoding",
+    b"upgrade",
+    b"expect",
+    b"content-length",
+}
+
+_MAX_HEAD_SIZE = 64 * 1024
+
+# interval (in seconds) between the checks of the replicas
+_WATCH_INTERVAL = 1.0
+
+_REASONS = {
+    400: b"Bad Request",
+    502: b"Bad Gateway",
+    504: b"Gateway Timeout",
+}
+
+
+class ProtocolError(Exception):
+    """Raised on malformed HTTP message."""
+
+
+class Upstream:
+    """
+    Replica of the service with a pool of keep-alive connections.
+
+    Args:
+        host: host of the replica
+        port: port of the replica
+        max_idle: maximum count of the idle connections
+    """
+
+    def __init__(self, host: str, port: int, max_idle: int = 64):
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        # count of the requests, sent and not answered yet
+        self.outstanding = 0
+        self._idle: List[Connection] = []
+
+    def __repr__(self) -> str:
+        return f"Upstream({self.host}:{self.port})"
+
+    async def acquire(self) -> Tuple[Connection, bool]:
+        """Returns idle or new connection and if it was reused."""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+        return await asyncio.open_connection(self.host, self.port), False
+
+    def release(self, conn: Connection, reusable: bool):
+        """Returns connection into the pool or closes it."""
+        if reusable and len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+
+    def close(self):
+        """Closes idle connections."""
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Reads start line and headers, returns None on clean EOF."""
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial:
+            return None
+        raise ProtocolError("Unexpected end of the message head") from exc
+    except asyncio.LimitOverrunError as exc:
+        raise ProtocolError("Message head is too large") from exc
+
+
+def _parse_head(head: bytes) -> Tuple[List[bytes], Headers]:
+    lines = head[:-4].split(b"\r\n")
+    start = lines[0].split(b" ", 2)
+    if len(start) < 2:
+        raise ProtocolError(f"Malformed start line {lines[0]!r}")
+    headers = []
+    for line in lines[1:]:
+        name, sep, value = line.partition(b":")
+        if not sep:
+            raise ProtocolError(f"Malformed header {line!r}")
+        headers.append((name.strip().lower(), value.strip()))
+    return start, headers
+
+
+def _get(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def _keep_alive(version: bytes, headers: Headers) -> bool:
+    tokens = (_get(headers, b"connection") or b"").lower()
+    if version == b"HTTP/1.0":
+        return b"keep-alive" in tokens
+    return b"close" not in tokens
+
+
+async def _read_body(
+    reader: asyncio.StreamReader, headers: Headers, until_eof: bool
+) -> Tuple[bytes, bool]:
+    """
+    Reads message body, chunked bodies are decoded.
+
+    Returns:
+        Body and if the connection could be reused.
+    """
+    if b"chunked" in (_get(headers, b"transfer-encoding") or b"").lower():
+        chunks: List[bytes] = []
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            try:
+                size = int(line.split(b";", 1)[0], 16)
+            except ValueError as exc:
+                raise ProtocolError(f"Malformed chunk size {line!r}") from exc
+            if size == 0:
+                # skip trailers
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks), True
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    length = _get(headers, b"content-length")
+    if length is not None:
+        try:
+            return await reader.readexactly(int(length)), True
+        except ValueError as exc:
+            raise ProtocolError(f"Malformed Content-Length {length!r}") from exc
+    if until_eof:
+        return await reader.read(), False
+    return b"", True
+
+
+def _format(
+    start: bytes,
+    headers: Headers,
+    body: bytes,
+    connection: Optional[bytes] = None,
+) -> bytes:
+    """Formats message with the end-to-end headers and Content-Length."""
+    lines = [start]
+    lines.extend(
+        name + b": " + value
+        for name, value in headers
+        if name not in _HOP_HEADERS
+    )
+    lines.append(b"content-length: " + str(len(body)).encode())
+    if connection is not None:
+        lines.append(b"connection: " + connection)
+    return b"\r\n".join(lines) + b"\r\n\r\n" + body
+
+
+def _error(status: int, connection: Optional[bytes] = b"close") -> bytes:
+    start = b"HTTP/1.1 %d %s" % (status, _REASONS[status])
+    return _format(start, [], _REASONS[status], connection)
+
+
+class ReverseProxy:
+    """
+    HTTP/1.1 reverse proxy with least-outstanding-requests balancing.
+
+    Each request is sent to the replica with the least count
+    of the requests in flight, ties are broken round-robin.
+    Connections to the replicas are kept alive and reused.
+    Bodies are buffered, so the proxy fits request-response
+    APIs like prediction endpoints, not streaming.
+
+    Args:
+        upstreams: host and port of every replica
+        timeout: timeout (in seconds) of the replica response
+    """
+
+    def __init__(
+        self, upstreams: Sequence[Tuple[str, int]], timeout: float = 60.0
+    ):
+        if not upstreams:
+            raise ValueError("At least one upstream is required")
+        self.upstreams = [Upstream(host, port) for host, port in upstreams]
+        self.timeout = timeout
+        self._turn = itertools.count()
+
+    def pick(self) -> Upstream:
+        """Returns the replica with the least outstanding requests."""
+        offset = next(self._turn) % len(self.upstreams)
+        ordered = self.upstreams[offset:] + self.upstreams[:offset]
+        return min(ordered, key=lambda upstream: upstream.outstanding)
+
+    async def _exchange(
+        self, conn: Connection, request: bytes, method: bytes
+    ) -> Tuple[bytes, Headers, bytes, bool]:
+        reader, writer = conn
+        writer.write(request)
+        await writer.drain()
+        while True:
+            head = await _read_head(reader)
+            if head is None:
+                raise ConnectionResetError("Upstream closed the connection")
+            (version, status, *_), headers = _parse_head(head)
+            # informational responses precede the final one
+            if not status.startswith(b"1") or status == b"101":
+                break
+        reusable = _keep_alive(version, headers)
+        if method == b"HEAD" or status in (b"204", b"304"):
+            body = b""
+        else:
+            body, complete = await _read_body(reader, headers, until_eof=True)
+            reusable = reusable and complete
+        reason = head.split(b"\r\n", 1)[0].split(b" ", 1)[1]
+        return b"HTTP/1.1 " + reason, headers, body, reusable
+
+    async def forward(
+        self, method: bytes, request: bytes
+    ) -> Tuple[bytes, Headers, bytes]:
+        """Sends request to the replica, returns its response."""
+        upstream = self.pick()
+        upstream.outstanding += 1
+        try:
+            while True:
+                conn, reused = await upstream.acquire()
+                try:
+                    start, headers, body, reusable = await self._exchange(
+                        conn, request, method
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    # idle connection could be closed by the replica
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    conn[1].close()
+                    raise
+                upstream.release(conn, reusable)
+                return start, headers, body
+        finally:
+            upstream.outstanding -= 1
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Serves client connection."""
+        try:
+            while True:
+                head = await _read_head(reader)
+                if head is None:
+                    break
+                (method, target, *rest), headers = _parse_head(head)
+                version = rest[0] if rest else b"HTTP/1.0"
+                keep_alive = _keep_alive(version, headers)
+                if not keep_alive:
+                    connection: Optional[bytes] = b"close"
+                elif version == b"HTTP/1.0":
+                    connection = b"keep-alive"
+                else:
+                    connection = None
+                expect = (_get(headers, b"expect") or b"").lower()
+                if expect == b"100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                body, _ = await _read_body(reader, headers, until_eof=False)
+                request = _format(
+                    b"%s %s HTTP/1.1" % (method, target), headers, body
+                )
+                try:
+                    start, resp_headers, resp_body = await asyncio.wait_for(
+                        self.forward(method, request), self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    response = _error(504, connection)
+                except (
+                    OSError,
+                    ProtocolError,
+                    asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError,
+                ) as exc:
+                    log.warning("Upstream request failed: %r", exc)
+                    response = _error(502, connection)
+                else:
+                    response = _format(
+                        start, resp_headers, resp_body, connection
+                    )
+                writer.write(response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ProtocolError, asyncio.LimitOverrunError):
+            writer.write(_error(400))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        """Starts serving on host and port."""
+        return await asyncio.start_server(
+            self.handle, host, port, limit=_MAX_HEAD_SIZE
+        )
+
+    async def _reachable(self, upstream: Upstream) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(upstream.host, upstream.port),
+                _WATCH_INTERVAL,
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def watch(self, orphan_timeout: float):
+        """Returns, once all the replicas are unreachable for the timeout."""
+        loop = asyncio.get_running_loop()
+        down_since: Optional[float] = None
+        while True:
+            await asyncio.sleep(min(_WATCH_INTERVAL, orphan_timeout))
+            checks = [self._reachable(upstream) for upstream in self.upstreams]
+            if any(await asyncio.gather(*checks)):
+                down_since = None
+            elif down_since is None:
+                down_since = loop.time()
+            elif loop.time() - down_since >= orphan_timeout:
+                return
+
+    def run(self, host: str, port: int, orphan_timeout: Optional[float] = None):
+        """
+        Serves until interrupted.
+
+        Args:
+            host: host to bind
+            port: port to bind
+            orphan_timeout: stop serving, once all the replicas are
+                unreachable for this time (in seconds), e.g. their
+                containers are removed, None to serve forever
+        """
+
+        async def main():
+            server = await self.serve(host, port)
+            log.info(
+                "Proxy on %s:%s, upstreams: %s", host, port, self.upstreams
+            )
+            try:
+                async with server:
+                    if orphan_timeout is None:
+                        await server.serve_forever()
+                    else:
+                        await self.watch(orphan_timeout)
+                        log.info("Replicas are gone, stopping the proxy")
+            finally:
+                for upstream in self.upstreams:
+                    upstream.close()
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
+
+
+def launch_proxy(
+    port: int,
+    upstreams: Sequence[Tuple[str, int]],
+    host: str = "0.0.0.0",
+    silent: bool = True,
+    startup_timeout: float = 10.0,
+    orphan_timeout: Optional[float] = None,
+) -> subprocess.Popen:
+    """
+    Launches the proxy in the separate process.
+
+    The process is started in the new session, so it outlives
+    the current one. It must be terminated by the caller, unless
+    `orphan_timeout` is passed, then the proxy exits by itself
+    after its replicas are gone.
+
+    Args:
+        port: port of the proxy
+        upstreams: host and port of every replica
+        host: host of the proxy
+        silent: discard the proxy output
+        startup_timeout: maximum time (in seconds) to wait for the proxy
+        orphan_timeout: exit, once all the replicas are unreachable
+            for this time (in seconds)
+
+    Returns:
+        Process of the proxy.
+
+    Raises:
+        RuntimeError: if proxy failed to start.
+    """
+    args = [sys.executable, "-m", __name__, "--host", host, "--port", str(port)]
+    for upstream_host, upstream_port in upstreams:
+        args += ["--upstream", f"{upstream_host}:{upstream_port}"]
+    if orphan_timeout is not None:
+        args += ["--orphan-timeout", str(orphan_timeout)]
+    # mljet is importable from any working directory
+    root = str(Path(__file__).resolve().parents[2])
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [root, os.environ.get("PYTHONPATH")])
+        ),
+    }
+    output = subprocess.DEVNULL if silent else None
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        args, stdout=output, stderr=output, env=env, start_new_session=True
+    )
+    probe_host = "127.0.0.1" if host in ("0.0.0.0", "") else host
+    if not wait_for_port(port, probe_host, timeout=startup_timeout):
+        process.kill()
+        raise RuntimeError(f"Proxy failed to start on port {port}")
+    return process
+
+
+def _parse_upstream(ctx, param, values):
+    upstreams = []
+    for value in values:
+        host, sep, port = value.rpartition(":")
+        if not sep or not port.isdigit():
+            raise click.BadParameter(f"Expected HOST:PORT, got `{value}`")
+        upstreams.append((host or "127.0.0.1", int(port)))
+    return upstreams
+
+
+@click.command()
+@click.option("--host", default="0.0.0.0", help="Host to bind.")
+@click.option("--port", type=int, required=True, help="Port to bind.")
+@click.option(
+    "--upstream",
+    "upstreams",
+    multiple=True,
+    required=True,
+    callback=_parse_upstream,
+    help="HOST:PORT of the replica.",
+)
+@click.option("--timeout", type=float, default=60.0)
+@click.option(
+    "--orphan-timeout",
+    type=float,
+    default=None,
+    help="Exit, once all the replicas are unreachable for this time.",
+)
+def main(host, port, upstreams, timeout, orphan_timeout):
+    """Balances requests between the replicas."""
+    logging.basicConfig(level=logging.INFO)
+    ReverseProxy(upstreams, timeout=timeout).run(
+        host, port, orphan_timeout=orphan_timeout
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -4,8 +4,14 @@ import importlib
 import importlib.util
 import inspect
 import logging
+import os
+import platform
 import re
-from functools import partial
+import time
+from functools import (
+    lru_cache,
+    partial,
+)
 from pathlib import Path
 from types import ModuleType
 from typing import (
@@ -16,12 +22,15 @@ from typing import (
     Union,
 )
 
+import black
+import isort
 from black import (
     FileMode,
     format_str as process_black,
 )
 from isort.api import sort_code_string
 from mypy.api import run as _mypy_run
+from mypy.version import __version__ as mypy_version
 from returns.iterables import Fold
 from returns.pipeline import (
     flow,
@@ -34,7 +43,18 @@ from returns.result import (
     safe,
 )
 
+from mljet.cookie import validator
 from mljet.cookie.validator import validate
+from mljet.utils.cache import (
+    FileCache,
+    digest,
+    get_cache_dir,
+    is_cache_enabled,
+)
+from mljet.utils.profiling import (
+    profiled,
+    span,
+)
 from mljet.utils.types import PathLike
 
 log = logging.getLogger(__name__)
@@ -45,7 +65,9 @@ __all__ = [
     "MypyValidationError",
     "replace_functions_by_names",
     "insert_import",
+    "get_mypy_cache_dir",
     "mypy_run",
+    "build_key",
     "build_backend",
 ]
 
@@ -54,6 +76,9 @@ pyfunc_with_body = re.compile(
     r"\t]*->[ \t]*(?P<return>\w+))?:(?P<body>(?:\n(?P=indent)(?:[ \t]+[^\n]*)|\n)+)"
 )
 
+# maximum size (in bytes) of the built backends cache
+BACKENDS_CACHE_SIZE = 32 * 1024 * 1024
+
 
 class MypyValidationError(Exception):
     """Exception raised when the template is not passing mypy check."""
@@ -114,6 +139,20 @@ def insert_import(text: str, deps: Sequence[str]) -> str:
     return "\n".join([*[f"import {dep}" for dep in deps], text])
 
 
+def get_mypy_cache_dir() -> str:
+    """
+    Returns mypy cache directory in the mljet user cache.
+
+    Typeshed and third-party stubs are analyzed once and then
+    reused by all builds. If the cache is disabled, mypy
+    cache is not written at all.
+    """
+    if not is_cache_enabled():
+        return os.devnull
+    return str(get_cache_dir().joinpath("mypy"))
+
+
+@profiled("mypy")
 def mypy_run(text: str) -> str:
     """
     Run mypy check on template.
@@ -126,12 +165,67 @@ def mypy_run(text: str) -> str:
     """
     log.debug("Running mypy check on template")
 
-    res = _mypy_run(["--ignore-missing-imports", "-c", text])
+    cache_dir = get_mypy_cache_dir()
+    started = time.perf_counter()
+    res = _mypy_run(
+        ["--ignore-missing-imports", "--cache-dir", cache_dir, "-c", text]
+    )
+    log.debug(
+        "Mypy check took %.2fs (cache: %s)",
+        time.perf_counter() - started,
+        cache_dir,
+    )
     if res[2]:
         raise MypyValidationError(res[0])
     return res[0]
 
 
+@lru_cache(None)
+def _toolchain_fingerprint() -> str:
+    """Fingerprint of everything, that affects built app besides inputs."""
+    return digest(
+        platform.python_version(),
+        black.__version__,
+        isort.__version__,
+        mypy_version,
+        # builder and validator logic itself
+        Path(__file__).read_bytes(),
+        Path(validator.__file__).read_bytes(),
+    )
+
+
+def build_key(
+    text: str,
+    methods_to_replace: Sequence[str],
+    methods: Sequence[Callable],
+    imports: Sequence[str],
+    ignore_mypy: bool,
+) -> Optional[str]:
+    """
+    Returns the build cache key.
+
+    The key is a hash of the template text, the names and
+    the sources of the replacement functions, the imports
+    and the versions of the tools.
+
+    Returns:
+        Cache key or None, if the sources can't be obtained.
+    """
+    try:
+        sources = [inspect.getsource(method) for method in methods]
+    except (OSError, TypeError):
+        return None
+
+    return digest(
+        _toolchain_fingerprint(),
+        text,
+        *map(str, methods_to_replace),
+        *sources,
+        *map(str, imports),
+        str(ignore_mypy),
+    )
+
+
 def build_backend(
     template_path: PathLike,
     methods_to_replace: Sequence[str],
@@ -170,6 +264,10 @@ def build_backend(
 
     .. note::
         After app is built, it should be formatted with black, isort.
+
+    .. note::
+        Built app is stored in the build cache (see :mod:`mljet.utils.cache`),
+        so validation and formatting are skipped for the same inputs.
     """
 
     if len(methods_to_replace) != len(methods):
@@ -193,20 +291,29 @@ def build_backend(
     with open(template_path, encoding="utf-8") as fin:
         text = fin.read()
 
+    cache = FileCache("backends", max_size=BACKENDS_CACHE_SIZE)
+    key = build_key(text, methods_to_replace, methods, imports, ignore_mypy)
+    cached = cache.get(key) if key else None
+
+    if cached is not None:
+        log.info("Backend is taken from the build cache")
+        return cached.decode("utf-8")
+
     log.info("Validating backend template")
-    # merge validation's results into one
-    validation_result: ResultE = Fold.collect(  # type: ignore
-        (
-            # Checks:
-            # entrypoint exists
-            # existence of methods
-            # existence of associated endpoints
-            safe(validate)(text, methods_to_replace),
-            # mypy check
-            safe(mypy_run if not ignore_mypy else lambda x: x)(text),
-        ),
-        Success(()),
-    )
+    with span("validate-template"):
+        # merge validation's results into one
+        validation_result: ResultE = Fold.collect(  # type: ignore
+            (
+                # Checks:
+                # entrypoint exists
+                # existence of methods
+                # existence of associated endpoints
+                safe(validate)(text, methods_to_replace),
+                # mypy check
+                safe(mypy_run if not ignore_mypy else lambda x: x)(text),
+            ),
+            Success(()),
+        )
 
     # if `validation_result` is `Failure`, then raise exception
     if not is_successful(validation_result):
@@ -220,20 +327,26 @@ def build_backend(
     # 3. Format template with black.
     # 4. Format template with isort.
     # TODO (qnbhd): Mypy check crashes if mypy version != 0.950
-    text_result = flow(  # type: ignore
-        text,
-        safe(
-            partial(
-                replace_functions_by_names,
-                names2repls=dict(zip(methods_to_replace, methods)),
-            )
-        ),
-        bind(safe(partial(insert_import, deps=imports))),
-        bind(safe(partial(process_black, mode=FileMode()))),
-        bind(safe(sort_code_string)),
-    )
+    with span("format-backend"):
+        text_result = flow(  # type: ignore
+            text,
+            safe(
+                partial(
+                    replace_functions_by_names,
+                    names2repls=dict(zip(methods_to_replace, methods)),
+                )
+            ),
+            bind(safe(partial(insert_import, deps=imports))),
+            bind(safe(partial(process_black, mode=FileMode()))),
+            bind(safe(sort_code_string)),
+        )
 
     if not is_successful(text_result):
         raise text_result.failure()
 
-    return text_result.unwrap()
+    built = text_result.unwrap()
+
+    if key:
+        cache.put(key, built.encode("utf-8"))
+
+    return built
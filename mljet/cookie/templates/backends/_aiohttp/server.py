@@ -3,9 +3,23 @@
 import os
 import pickle
 from pathlib import Path
-from typing import List
+from typing import (
+    Any,
+    List,
+)
 
 from aiohttp import web
+from mljet_runtime import (  # type: ignore
+    SETTINGS_FILENAME,
+    InferenceExecutor,
+    MicroBatcher,
+    Overloaded,
+    PayloadError,
+    ServiceSettings,
+    decode_payload,
+    get_encoder,
+    serve,
+)
 from pydantic import BaseModel
 
 
@@ -13,12 +27,23 @@ class PredictRequest(BaseModel):
     data: List[List]
 
 
+def parse_json(raw: bytes) -> list:
+    return PredictRequest.parse_raw(raw).data
+
+
+settings = ServiceSettings.load(
+    Path(__file__).parent.joinpath(SETTINGS_FILENAME)
+)
+encoder = get_encoder(
+    settings.response_encoder, settings.float_precision, settings.float32
+)
+
 with open(Path(__file__).parent.joinpath("models", "model.pkl"), "rb") as f:
     loaded_model = pickle.load(f)
 
 
 # THIS CODE MUST BE REPLACED DYNAMICALLY
-def predict(model, data) -> list:
+def predict(model, data) -> Any:
     """
     Wrapper for `predict` method.
 
@@ -29,10 +54,10 @@ def predict(model, data) -> list:
     Returns:
         The predicted class
     """
-    return model.predict(data).tolist()
+    return model.predict(data)
 
 
-def predict_proba(model, data) -> list:
+def predict_proba(model, data) -> Any:
     """
     Wrapper for `predict_proba` method.
 
@@ -44,29 +69,90 @@ def predict_proba(model, data) -> list:
         Probability of each class
     """
 
-    return model.predict_proba(data).tolist()
+    return model.predict_proba(data)
 
 
 # END OF DYNAMIC CODE
 
 
-async def _predict(self, request: PredictRequest):
-    prediction = predict(loaded_model, request.data)
-    return web.json_response(prediction)
+def run_predict(data):
+    return predict(loaded_model, data)
+
+
+def run_predict_proba(data):
+    return predict_proba(loaded_model, data)
+
+
+predict_executor = InferenceExecutor(
+    run_predict,
+    settings.executor,
+    settings.executor_workers,
+    settings.max_pending,
+)
+predict_proba_executor = InferenceExecutor(
+    run_predict_proba,
+    settings.executor,
+    settings.executor_workers,
+    settings.max_pending,
+)
+predict_batcher = MicroBatcher(
+    predict_executor.submit,
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+predict_proba_batcher = MicroBatcher(
+    predict_proba_executor.submit,
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+
+
+async def read_data(request: web.Request):
+    try:
+        return decode_payload(
+            request.headers.get("Content-Type"),
+            await request.read(),
+            parse_json,
+        )
+    except PayloadError as exc:
+        if exc.status == web.HTTPUnsupportedMediaType.status_code:
+            raise web.HTTPUnsupportedMediaType(text=str(exc))
+        raise web.HTTPBadRequest(text=str(exc))
+
+
+async def infer(batcher: MicroBatcher, data: Any) -> web.Response:
+    try:
+        prediction = await batcher.acall(data)
+    except Overloaded as exc:
+        raise web.HTTPServiceUnavailable(text=str(exc))
+    return web.Response(
+        body=encoder.encode(prediction), content_type=encoder.content_type
+    )
+
+
+# the port is bound after the model is loaded,
+#  so the service is ready, once it answers
+async def _health(request: web.Request):
+    return web.Response(text="ok")
+
+
+async def _predict(request: web.Request):
+    return await infer(predict_batcher, await read_data(request))
 
 
-async def _predict_proba(self, request: PredictRequest):
-    prediction = predict_proba(loaded_model, request.data)
-    return web.json_response(prediction)
+async def _predict_proba(request: web.Request):
+    return await infer(predict_proba_batcher, await read_data(request))
 
 
 app = web.Application()
 app.router.add_post("/predict_proba", _predict_proba)  # type: ignore
 app.router.add_post("/predict", _predict)  # type: ignore
+app.router.add_get("/health", _health)  # type: ignore
 
 if __name__ == "__main__":
-    web.run_app(
-        app,
-        host=os.getenv("SERVICE_HOST", "0.0.0.0"),
-        port=int(os.getenv("SERVICE_PORT", "5000")),
+    serve(
+        lambda sock: web.run_app(app, sock=sock),
+        os.getenv("SERVICE_HOST", "0.0.0.0"),
+        int(os.getenv("SERVICE_PORT", "5000")),
+        settings.n_workers,
     )
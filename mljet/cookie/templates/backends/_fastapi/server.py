@@ -3,26 +3,54 @@
 import os
 import pickle
 from pathlib import Path
-from typing import List
+from typing import (
+    Any,
+    List,
+)
 
 import uvicorn  # type: ignore
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import (
+    FastAPI,
+    HTTPException,
+    Request,
+)
+from fastapi.responses import Response
+from mljet_runtime import (  # type: ignore
+    SETTINGS_FILENAME,
+    MicroBatcher,
+    PayloadError,
+    ServiceSettings,
+    decode_payload,
+    get_encoder,
+    serve,
+)
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 
 class PredictRequest(BaseModel):
     data: List[List]
 
 
+def parse_json(raw: bytes) -> list:
+    return PredictRequest.parse_raw(raw).data
+
+
 app = FastAPI()
 
+settings = ServiceSettings.load(
+    Path(__file__).parent.joinpath(SETTINGS_FILENAME)
+)
+encoder = get_encoder(
+    settings.response_encoder, settings.float_precision, settings.float32
+)
+
 with open(Path(__file__).parent.joinpath("models", "model.pkl"), "rb") as f:
     loaded_model = pickle.load(f)
 
 
 # THIS CODE MUST BE REPLACED DYNAMICALLY
-def predict(model, data) -> list:
+def predict(model, data) -> Any:
     """
     Wrapper for `predict` method.
 
@@ -33,10 +61,10 @@ def predict(model, data) -> list:
     Returns:
         The predicted class
     """
-    return model.predict(data).tolist()
+    return model.predict(data)
 
 
-def predict_proba(model, data) -> list:
+def predict_proba(model, data) -> Any:
     """
     Wrapper for `predict_proba` method.
 
@@ -48,25 +76,71 @@ def predict_proba(model, data) -> list:
         Probability of each class
     """
 
-    return model.predict_proba(data).tolist()
+    return model.predict_proba(data)
 
 
 # END OF DYNAMIC CODE
 
 
+predict_batcher = MicroBatcher(
+    lambda data: predict(loaded_model, data),
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+predict_proba_batcher = MicroBatcher(
+    lambda data: predict_proba(loaded_model, data),
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+
+
+async def read_data(request: Request):
+    try:
+        return decode_payload(
+            request.headers.get("Content-Type"),
+            await request.body(),
+            parse_json,
+        )
+    except PayloadError as exc:
+        raise HTTPException(status_code=exc.status, detail=str(exc))
+
+
+def respond(prediction: Any) -> Response:
+    return Response(
+        content=encoder.encode(prediction), media_type=encoder.content_type
+    )
+
+
+async def infer(batcher: MicroBatcher, data: Any) -> Response:
+    if batcher.enabled:
+        # the request waits for the batch without holding a thread
+        prediction = await batcher.acall(data)
+    else:
+        prediction = await run_in_threadpool(batcher, data)
+    return respond(prediction)
+
+
+# the port is bound after the model is loaded,
+#  so the service is ready, once it answers
+@app.get("/health")
+async def _health():
+    return Response(content="ok", media_type="text/plain")
+
+
 @app.post("/predict")
-def _predict(body: PredictRequest):
-    return JSONResponse(content=predict(loaded_model, body.data))
+async def _predict(request: Request):
+    return await infer(predict_batcher, await read_data(request))
 
 
 @app.post("/predict_proba")
-def _predict_proba(body: PredictRequest):
-    return JSONResponse(content=predict_proba(loaded_model, body.data))
+async def _predict_proba(request: Request):
+    return await infer(predict_proba_batcher, await read_data(request))
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        app,
-        host=os.getenv("SERVICE_HOST", "0.0.0.0"),
-        port=int(os.getenv("SERVICE_PORT", "5000")),
+    serve(
+        lambda sock: uvicorn.Server(uvicorn.Config(app)).run(sockets=[sock]),
+        os.getenv("SERVICE_HOST", "0.0.0.0"),
+        int(os.getenv("SERVICE_PORT", "5000")),
+        settings.n_workers,
     )
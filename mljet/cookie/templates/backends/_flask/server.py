@@ -3,13 +3,26 @@
 import os
 import pickle
 from pathlib import Path
-from typing import List
+from typing import (
+    Any,
+    List,
+)
 
 from flask import (
     Flask,
-    jsonify,
+    Response,
+    abort,
+    request,
+)
+from mljet_runtime import (  # type: ignore
+    SETTINGS_FILENAME,
+    MicroBatcher,
+    PayloadError,
+    ServiceSettings,
+    decode_payload,
+    get_encoder,
+    serve_wsgi,
 )
-from flask_pydantic import validate  # type: ignore
 from pydantic import BaseModel
 
 
@@ -17,14 +30,25 @@ class PredictRequest(BaseModel):
     data: List[List]
 
 
+def parse_json(raw: bytes) -> list:
+    return PredictRequest.parse_raw(raw).data
+
+
 app = Flask(__name__)
 
+settings = ServiceSettings.load(
+    Path(__file__).parent.joinpath(SETTINGS_FILENAME)
+)
+encoder = get_encoder(
+    settings.response_encoder, settings.float_precision, settings.float32
+)
+
 with open(Path(__file__).parent.joinpath("models", "model.pkl"), "rb") as f:
     loaded_model = pickle.load(f)
 
 
 # THIS CODE MUST BE REPLACED DYNAMICALLY
-def predict(model, data) -> list:
+def predict(model, data) -> Any:
     """
     Wrapper for `predict` method.
 
@@ -35,10 +59,10 @@ def predict(model, data) -> list:
     Returns:
         The predicted class
     """
-    return model.predict(data).tolist()
+    return model.predict(data)
 
 
-def predict_proba(model, data) -> list:
+def predict_proba(model, data) -> Any:
     """
     Wrapper for `predict_proba` method.
 
@@ -50,26 +74,61 @@ def predict_proba(model, data) -> list:
         Probability of each class
     """
 
-    return model.predict_proba(data).tolist()
+    return model.predict_proba(data)
 
 
 # END OF DYNAMIC CODE
 
 
+predict_batcher = MicroBatcher(
+    lambda data: predict(loaded_model, data),
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+predict_proba_batcher = MicroBatcher(
+    lambda data: predict_proba(loaded_model, data),
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+
+
+def read_data():
+    try:
+        return decode_payload(
+            request.headers.get("Content-Type"),
+            request.get_data(),
+            parse_json,
+        )
+    except PayloadError as exc:
+        abort(exc.status, str(exc))
+
+
+def respond(prediction: Any) -> Response:
+    return Response(encoder.encode(prediction), mimetype=encoder.content_type)
+
+
+# the port is bound after the model is loaded,
+#  so the service is ready, once it answers
+@app.get("/health")
+def _health():
+    return Response("ok", mimetype="text/plain")
+
+
 @app.post("/predict")
-@validate()
-def _predict(body: PredictRequest):
-    return jsonify(predict(loaded_model, body.data))
+def _predict():
+    return respond(predict_batcher(read_data()))
 
 
 @app.post("/predict_proba")
-@validate()
-def _predict_proba(body: PredictRequest):
-    return jsonify(predict_proba(loaded_model, body.data))
+def _predict_proba():
+    return respond(predict_proba_batcher(read_data()))
 
 
 if __name__ == "__main__":
-    app.run(
-        host=os.getenv("SERVICE_HOST", "0.0.0.0"),
-        port=int(os.getenv("SERVICE_PORT", "5000")),
+    serve_wsgi(
+        app,
+        os.getenv("SERVICE_HOST", "0.0.0.0"),
+        int(os.getenv("SERVICE_PORT", "5000")),
+        settings.n_workers,
+        settings.n_threads,
     )
@@ -3,21 +3,53 @@
 import os
 import pickle
 from pathlib import Path
-from typing import List
-
+from typing import (
+    Any,
+    List,
+)
+
+from mljet_runtime import (  # type: ignore
+    SETTINGS_FILENAME,
+    InferenceExecutor,
+    MicroBatcher,
+    Overloaded,
+    PayloadError,
+    ServiceSettings,
+    decode_payload,
+    get_encoder,
+    serve,
+)
 from pydantic import BaseModel
 from sanic import Sanic
-from sanic.response import json as sanic_json
-from sanic_ext import validate
+from sanic.exceptions import (
+    SanicException,
+    ServiceUnavailable,
+)
+from sanic.response import (
+    HTTPResponse,
+    raw,
+    text,
+)
 
 app = Sanic("app")
 
+settings = ServiceSettings.load(
+    Path(__file__).parent.joinpath(SETTINGS_FILENAME)
+)
+encoder = get_encoder(
+    settings.response_encoder, settings.float_precision, settings.float32
+)
+
 
 class PredictRequest(BaseModel):
     data: List[List]
 
 
-def predict(model, data) -> list:
+def parse_json(raw: bytes) -> list:
+    return PredictRequest.parse_raw(raw).data
+
+
+def predict(model, data) -> Any:
     """
     Wrapper for `predict` method.
 
@@ -28,10 +60,10 @@ def predict(model, data) -> list:
     Returns:
         The predicted class
     """
-    return model.predict(data).tolist()
+    return model.predict(data)
 
 
-def predict_proba(model, data) -> list:
+def predict_proba(model, data) -> Any:
     """
     Wrapper for `predict_proba` method.
 
@@ -43,29 +75,81 @@ def predict_proba(model, data) -> list:
         Probability of each class
     """
 
-    return model.predict_proba(data).tolist()
+    return model.predict_proba(data)
+
+
+def run_predict(data):
+    return predict(loaded_model, data)
+
+
+def run_predict_proba(data):
+    return predict_proba(loaded_model, data)
+
+
+predict_executor = InferenceExecutor(
+    run_predict,
+    settings.executor,
+    settings.executor_workers,
+    settings.max_pending,
+)
+predict_proba_executor = InferenceExecutor(
+    run_predict_proba,
+    settings.executor,
+    settings.executor_workers,
+    settings.max_pending,
+)
+predict_batcher = MicroBatcher(
+    predict_executor.submit,
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+predict_proba_batcher = MicroBatcher(
+    predict_proba_executor.submit,
+    settings.max_batch_size,
+    settings.max_batch_wait_us,
+)
+
+
+def read_data(request):
+    try:
+        return decode_payload(
+            request.headers.get("Content-Type"), request.body, parse_json
+        )
+    except PayloadError as exc:
+        raise SanicException(str(exc), status_code=exc.status)
+
+
+async def infer(batcher: MicroBatcher, data: Any) -> HTTPResponse:
+    try:
+        prediction = await batcher.acall(data)
+    except Overloaded as exc:
+        raise ServiceUnavailable(str(exc))
+    return raw(encoder.encode(prediction), content_type=encoder.content_type)
+
+
+# the port is bound after the model is loaded,
+#  so the service is ready, once it answers
+@app.get("/health")
+async def _health(request):
+    return text("ok")
 
 
 @app.post("/predict")
-@validate(json=PredictRequest)
-async def _predict(
-    request, body: PredictRequest
-):  # pylint: disable=unused-argument
-    return sanic_json(predict(loaded_model, body.data))
+async def _predict(request):
+    return await infer(predict_batcher, read_data(request))
 
 
 @app.post("/predict_proba")
-@validate(json=PredictRequest)
-async def _predict_proba(
-    request, body: PredictRequest
-):  # pylint: disable=unused-argument
-    return sanic_json(predict_proba(loaded_model, body.data))
+async def _predict_proba(request):
+    return await infer(predict_proba_batcher, read_data(request))
 
 
 if __name__ == "__main__":
     with open(Path(__file__).parent.joinpath("models", "model.pkl"), "rb") as f:
         loaded_model = pickle.load(f)
-    app.run(
-        host=os.getenv("SERVICE_HOST", "0.0.0.0"),
-        port=int(os.getenv("SERVICE_PORT", "5000")),
+    serve(
+        lambda sock: app.run(sock=sock, single_process=True),
+        os.getenv("SERVICE_HOST", "0.0.0.0"),
+        int(os.getenv("SERVICE_PORT", "5000")),
+        settings.n_workers,
     )
@@ -0,0 +1,10 @@
+"""Templates of the generated Docker files."""
+
+from pathlib import Path
+
+TEMPLATES_PATH = Path(__file__).parent
+
+MULTISTAGE_DOCKERFILE = TEMPLATES_PATH.joinpath("Dockerfile.multistage")
+DOCKERIGNORE = TEMPLATES_PATH.joinpath("dockerignore")
+
+__all__ = ["MULTISTAGE_DOCKERFILE", "DOCKERIGNORE"]
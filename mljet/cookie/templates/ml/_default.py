@@ -1,4 +1,6 @@
 """Module that contains Scikit-learn model method's wrappers."""
+from typing import Any
+
 from mljet.contrib.supported import ModelType
 
 USED_FOR = [
@@ -9,7 +11,7 @@ USED_FOR = [
 ]
 
 
-def predict(model, data) -> list:
+def predict(model, data) -> Any:
     """
     Wrapper for `predict` method.
 
@@ -20,10 +22,10 @@ def predict(model, data) -> list:
     Returns:
         The predicted class
     """
-    return model.predict(data).tolist()
+    return model.predict(data)
 
 
-def predict_proba(model, data) -> list:
+def predict_proba(model, data) -> Any:
     """
     Wrapper for `predict_proba` method.
 
@@ -35,4 +37,4 @@ def predict_proba(model, data) -> list:
         Probability of each class
     """
 
-    return model.predict_proba(data).tolist()
+    return model.predict_proba(data)
@@ -1,4 +1,6 @@
 """Module that contains LAMA model method's wrappers."""
+from typing import Any
+
 from mljet.contrib.supported import ModelType
 
 USED_FOR = [
@@ -6,7 +8,7 @@ USED_FOR = [
 ]
 
 
-def predict(model, data) -> list:
+def predict(model, data) -> Any:
     """
     Wrapper for `predict` method.
 
@@ -21,4 +23,4 @@ def predict(model, data) -> list:
 
     return model.predict(
         np.array(data), features_names=list(map(str, range(len(data[0]))))
-    ).data.tolist()
+    ).data
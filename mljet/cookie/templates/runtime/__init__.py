@@ -0,0 +1,26 @@
+"""
+Runtime helpers of the generated services.
+
+The package is copied into the built project as ``mljet_runtime``
+and imported by the backend templates, so it must depend only on
+the standard library and on the packages of the model itself.
+"""
+
+from .batching import MicroBatcher
+from .encoders import get_encoder
+from .executors import (
+    InferenceExecutor,
+    Overloaded,
+)
+from .payloads import (
+    PayloadError,
+    decode_payload,
+)
+from .serving import (
+    serve,
+    serve_wsgi,
+)
+from .settings import (
+    SETTINGS_FILENAME,
+    ServiceSettings,
+)
@@ -0,0 +1,287 @@
+"""Adaptive micro-batching of prediction calls."""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+__all__ = ["MicroBatcher"]
+
+log = logging.getLogger(__name__)
+
+_Pending = Tuple[Sequence, "Future[Any]"]
+
+# marker of the request, that must not join the batch
+_SKIP = object()
+
+
+def _width(rows: Sequence) -> Optional[Tuple[int, ...]]:
+    """
+    Returns shape of the single row of the request.
+
+    None is returned for the empty request, which fits any batch.
+
+    Raises:
+        ValueError: if rows of the request have different widths
+        TypeError: if rows are not a sequence
+    """
+
+    if not len(rows):
+        return None
+
+    shape = getattr(rows, "shape", None)
+    if shape is not None:
+        return tuple(shape[1:])
+
+    widths = {
+        (len(row),) if isinstance(row, (list, tuple)) else () for row in rows
+    }
+    if len(widths) > 1:
+        raise ValueError("Rows of the request have different widths")
+    return widths.pop()
+
+
+def _merge(chunks: List[Sequence]) -> Sequence:
+    """Merges rows of the requests, decoded from JSON or binary formats."""
+    if all(isinstance(chunk, list) for chunk in chunks):
+        return [row for chunk in chunks for row in chunk]
+
+    import numpy as np
+
+    # empty request is skipped, its shape could differ
+    arrays = [np.asarray(chunk) for chunk in chunks if len(chunk)]
+    return np.concatenate(arrays or [np.asarray(chunks[0])])
+
+
+def _fail(batch: List[_Pending], exc: BaseException):
+    """Sets exception to every unresolved call of the batch."""
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(exc)
+
+
+def _split(batch: List[_Pending], result: Sequence):
+    """Splits the batch result back out."""
+    offset = 0
+    for rows, future in batch:
+        if not future.done():
+            future.set_result(result[offset : offset + len(rows)])
+        offset += len(rows)
+
+
+def _resolve(batch: List[_Pending], done: "Future[Any]"):
+    """Resolves the batch by the finished future."""
+    try:
+        if done.cancelled():
+            raise RuntimeError("Batch prediction was cancelled")
+        exc = done.exception()
+        if exc is not None:
+            _fail(batch, exc)
+        else:
+            _split(batch, done.result())
+    except Exception as exc:  # pylint: disable=broad-except
+        _fail(batch, exc)
+
+
+class MicroBatcher:
+    """
+    Merges concurrent prediction calls into one model call.
+
+    Rows of the concurrent requests are collected until
+    ``max_batch_size`` rows are gathered or ``max_wait_us``
+    microseconds are passed since the first request of the batch.
+    Then the merged rows are passed to ``func`` in a single call
+    and the result is split back out to each caller.
+
+    Example:
+
+        >>> batcher = MicroBatcher(lambda rows: [sum(r) for r in rows], 32, 500)
+        >>> batcher([[1, 2], [3, 4]])
+        [3, 7]
+
+    .. note::
+        If ``max_batch_size`` is less than 2, batching is disabled
+        and calls are passed to ``func`` as is.
+
+    .. note::
+        ``func`` may return :class:`~concurrent.futures.Future`
+        (e.g. ``executor.submit``), then the batch is dispatched
+        without waiting and the collecting of the next one goes on.
+
+    .. note::
+        Requests with the different row widths are not merged,
+        so the malformed request fails alone. Requests,
+        cancelled before the dispatch, are dropped.
+
+    .. note::
+        The collecting thread is started lazily in the process
+        that makes the first call, so the batcher can be created
+        before the server forks its workers.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Sequence],
+        max_batch_size: int,
+        max_wait_us: int,
+    ):
+        self._func = func
+        self._max_batch_size = max_batch_size
+        self._max_wait = max(max_wait_us, 0) / 1_000_000
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._owner_pid: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Is batching enabled or not."""
+        return self._max_batch_size > 1
+
+    def submit(self, rows: Sequence) -> "Future[Any]":
+        """
+        Submits rows to the next batch.
+
+        Args:
+            rows: rows to predict
+
+        Returns:
+            Future with the prediction for passed rows.
+        """
+
+        future: "Future[Any]" = Future()
+
+        if not self.enabled:
+            try:
+                result = self._func(rows)
+            except Exception as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+                return future
+            if isinstance(result, Future):
+                return result
+            future.set_result(result)
+            return future
+
+        self._ensure_started()
+        self._queue.put((rows, future))
+        return future
+
+    def __call__(self, rows: Sequence) -> Any:
+        """Predicts rows, blocks until the batch is processed."""
+        if not self.enabled:
+            result = self._func(rows)
+            if isinstance(result, Future):
+                return result.result()
+            return result
+        return self.submit(rows).result()
+
+    async def acall(self, rows: Sequence) -> Any:
+        """Predicts rows, suspends until the batch is processed."""
+        return await asyncio.wrap_future(self.submit(rows))
+
+    def _ensure_started(self):
+        """Starts collecting thread in the current process."""
+        pid = os.getpid()
+        if self._owner_pid == pid:
+            return
+        with self._lock:
+            if self._owner_pid == pid:
+                return
+            # queue could be inherited from the parent
+            # process, so we need the new one
+            self._queue = queue.Queue()
+            thread = threading.Thread(
+                target=self._collect, name="mljet-batcher", daemon=True
+            )
+            thread.start()
+            self._owner_pid = pid
+
+    def _collect(self):
+        """Collects rows into batches and runs them."""
+        carry = None
+        while True:
+            if carry is None:
+                pending = self._queue.get()
+                width = self._admit(pending)
+                if width is _SKIP:
+                    continue
+            else:
+                (pending, width), carry = carry, None
+
+            batch: List[_Pending] = [pending]
+            size = len(pending[0])
+            deadline = time.monotonic() + self._max_wait
+
+            while size < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                other = self._admit(pending)
+                if other is _SKIP:
+                    continue
+                if width is None:
+                    width = other
+                elif other is not None and other != width:
+                    # starts the next batch
+                    carry = (pending, other)
+                    break
+                batch.append(pending)
+                size += len(pending[0])
+
+            try:
+                self._run(batch)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception("Failed to process the batch")
+                _fail(batch, exc)
+
+    @staticmethod
+    def _admit(pending: _Pending) -> Any:
+        """
+        Prepares the request to join the batch.
+
+        Returns:
+            Width of the rows, or ``_SKIP`` if the request
+            was cancelled or its rows are malformed.
+        """
+
+        rows, future = pending
+        # cancelled future could not be resolved, and the
+        # running one could not be cancelled any more
+        if not future.set_running_or_notify_cancel():
+            return _SKIP
+        try:
+            return _width(rows)
+        except Exception as exc:  # pylint: disable=broad-except
+            future.set_exception(exc)
+            return _SKIP
+
+    def _run(self, batch: List[_Pending]):
+        """Runs the batch and splits the result back out."""
+        try:
+            result = self._func(_merge([rows for rows, _ in batch]))
+        except Exception as exc:  # pylint: disable=broad-except
+            _fail(batch, exc)
+            return
+
+        if isinstance(result, Future):
+            result.add_done_callback(lambda done: _resolve(batch, done))
+            return
+
+        try:
+            _split(batch, result)
+        except Exception as exc:  # pylint: disable=broad-except
+            _fail(batch, exc)
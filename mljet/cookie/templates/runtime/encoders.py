@@ -0,0 +1,134 @@
+"""Encoding of the prediction responses."""
+
+import abc
+import json
+import logging
+from typing import (
+    Any,
+    Optional,
+)
+
+__all__ = [
+    "ResponseEncoder",
+    "JsonEncoder",
+    "OrjsonEncoder",
+    "get_encoder",
+]
+
+log = logging.getLogger(__name__)
+
+# dtypes kinds (bool, int, uint, float), that are
+# serialized from the array buffer without conversion
+_NATIVE_KINDS = frozenset("biuf")
+
+
+class ResponseEncoder(abc.ABC):
+    """
+    Base class of the responses encoders.
+
+    Encoder prepares the model output (rounds floats,
+    casts it to ``float32``) and encodes it into bytes.
+
+    Args:
+        float_precision: number of decimals to round floats to,
+            floats are not rounded if it is None.
+        float32: cast float output to ``float32``.
+    """
+
+    content_type = "application/json"
+
+    def __init__(
+        self, float_precision: Optional[int] = None, float32: bool = False
+    ):
+        self.float_precision = float_precision
+        self.float32 = float32
+
+    def prepare(self, obj: Any) -> Any:
+        """Applies precision settings to the model output."""
+        if not hasattr(obj, "dtype") or obj.dtype.kind != "f":
+            return obj
+
+        import numpy as np
+
+        if self.float32:
+            obj = obj.astype(np.float32, copy=False)
+        if self.float_precision is not None:
+            obj = np.round(obj, self.float_precision)
+        return obj
+
+    @abc.abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """Encodes the model output."""
+
+
+class JsonEncoder(ResponseEncoder):
+    """Encoder, based on the standard library :mod:`json`."""
+
+    def encode(self, obj: Any) -> bytes:
+        obj = self.prepare(obj)
+        if hasattr(obj, "tolist"):
+            obj = obj.tolist()
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+class OrjsonEncoder(ResponseEncoder):
+    """
+    Encoder, based on :mod:`orjson`.
+
+    NumPy arrays of numbers are serialized directly from
+    their buffers, without conversion into Python objects.
+    """
+
+    def __init__(
+        self, float_precision: Optional[int] = None, float32: bool = False
+    ):
+        super().__init__(float_precision, float32)
+
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_SERIALIZE_NUMPY
+
+    def encode(self, obj: Any) -> bytes:
+        obj = self.prepare(obj)
+        if hasattr(obj, "dtype"):
+            if obj.dtype.kind not in _NATIVE_KINDS:
+                # e.g. string labels of the classifier
+                obj = obj.tolist()
+            elif not obj.flags.c_contiguous:
+                import numpy as np
+
+                obj = np.ascontiguousarray(obj)
+        return self._dumps(obj, option=self._option)
+
+
+def get_encoder(
+    name: str = "auto",
+    float_precision: Optional[int] = None,
+    float32: bool = False,
+) -> ResponseEncoder:
+    """
+    Returns response encoder by name.
+
+    Args:
+        name: name of the encoder, one of ``json``, ``orjson``, ``auto``.
+            ``auto`` means ``orjson`` if it is installed, else ``json``.
+        float_precision: number of decimals to round floats to.
+        float32: cast float output to ``float32``.
+
+    Returns:
+        Response encoder.
+    """
+
+    if name not in ("auto", "json", "orjson"):
+        raise ValueError(f"Unknown response encoder `{name}`")
+
+    if name in ("auto", "orjson"):
+        try:
+            return OrjsonEncoder(float_precision, float32)
+        except ImportError:
+            if name == "orjson":
+                raise
+            log.debug("orjson is not installed, using json encoder")
+
+    return JsonEncoder(float_precision, float32)
@@ -0,0 +1,183 @@
+"""Bounded executors of the blocking inference calls."""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import (
+    Any,
+    Callable,
+    Optional,
+)
+
+__all__ = ["EXECUTOR_KINDS", "Overloaded", "InferenceExecutor"]
+
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+# interval (in seconds) of checking, that
+# the parent of the pool process is alive
+_WATCH_INTERVAL = 0.5
+
+
+class Overloaded(Exception):
+    """Exception raised when too many calls are pending."""
+
+
+def _watch_parent(parent_pid: int):
+    """Exits the process, when its parent is dead."""
+    while os.getppid() == parent_pid:
+        time.sleep(_WATCH_INTERVAL)
+    os._exit(0)  # pylint: disable=protected-access
+
+
+def _init_process_worker(parent_pid: int):
+    """
+    Initializes the process of the pool.
+
+    Server workers exit without shutting down the pools,
+    so the pool processes watch their parent, otherwise
+    they would keep the inherited listening socket open.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    threading.Thread(
+        target=_watch_parent, args=(parent_pid,), daemon=True
+    ).start()
+
+
+class InferenceExecutor:
+    """
+    Runs blocking inference calls off the event loop.
+
+    Kinds of the executor:
+
+    - ``inline`` runs calls in the caller thread;
+    - ``thread`` runs calls in the thread pool, it suits libraries
+      that release the GIL during inference (XGBoost, LightGBM, ...);
+    - ``process`` runs calls in the pool of processes, forked from
+      the current one, so they share the already loaded model.
+
+    Args:
+        func: blocking function, must be picklable
+            (defined at module level) for the ``process`` kind.
+        kind: kind of the executor.
+        max_workers: maximum count of the pool workers,
+            default of the pool is used if it is None.
+        max_pending: maximum count of the submitted, but not
+            finished calls, values less than 1 disable the limit.
+
+    .. note::
+        The pool is created lazily in the process that makes the
+        first call, so the executor can be created before the
+        server forks its workers.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 0,
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unknown executor kind `{kind}`, "
+                f"expected one of {EXECUTOR_KINDS}"
+            )
+        self._func = func
+        self._kind = kind
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+        self._owner_pid: Optional[int] = None
+
+    @property
+    def pending(self) -> int:
+        """Count of the submitted, but not finished calls."""
+        return self._pending
+
+    def submit(self, rows: Any) -> "Future[Any]":
+        """
+        Submits call to the executor.
+
+        Args:
+            rows: rows to predict
+
+        Returns:
+            Future with the prediction for passed rows.
+
+        Raises:
+            :class:`Overloaded`: if too many calls are pending.
+        """
+
+        with self._lock:
+            if 0 < self._max_pending <= self._pending:
+                raise Overloaded(
+                    f"Too many pending inference calls ({self._pending})"
+                )
+            self._pending += 1
+
+        try:
+            future = self._submit(rows)
+        except BaseException:
+            self._done()
+            raise
+
+        future.add_done_callback(lambda _: self._done())
+        return future
+
+    def __call__(self, rows: Any) -> Any:
+        """Predicts rows, blocks until the call is finished."""
+        return self.submit(rows).result()
+
+    def _done(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, rows: Any) -> "Future[Any]":
+        if self._kind == "inline":
+            future: "Future[Any]" = Future()
+            try:
+                future.set_result(self._func(rows))
+            except Exception as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+            return future
+        return self._get_pool().submit(self._func, rows)
+
+    def _get_pool(self) -> Executor:
+        """Returns pool of the current process."""
+        pid = os.getpid()
+        if self._owner_pid == pid and self._pool is not None:
+            return self._pool
+        with self._lock:
+            if self._owner_pid != pid or self._pool is None:
+                # pool could be inherited from the parent
+                # process, so we need the new one
+                self._pool = self._make_pool()
+                self._owner_pid = pid
+            return self._pool
+
+    def _make_pool(self) -> Executor:
+        if self._kind == "thread":
+            return ThreadPoolExecutor(
+                self._max_workers, thread_name_prefix="mljet-inference"
+            )
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "fork" if "fork" in methods else None
+        )
+        return ProcessPoolExecutor(
+            self._max_workers,
+            mp_context=context,
+            initializer=_init_process_worker,
+            initargs=(os.getpid(),),
+        )
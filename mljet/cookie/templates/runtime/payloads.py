@@ -0,0 +1,161 @@
+"""Decoding of the prediction requests payloads."""
+
+import io
+from typing import (
+    Any,
+    Callable,
+    Optional,
+)
+
+__all__ = [
+    "JSON",
+    "NPY",
+    "ARROW_STREAM",
+    "PayloadError",
+    "decode_npy",
+    "decode_arrow",
+    "decode_payload",
+]
+
+JSON = "application/json"
+NPY = "application/x-npy"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+class PayloadError(Exception):
+    """Exception raised when the payload can't be decoded."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _check_matrix(array):
+    """Checks that array is a matrix of rows."""
+    if array.ndim != 2:
+        raise PayloadError(
+            f"Expected 2-dimensional array, got {array.ndim} dimensions"
+        )
+    return array
+
+
+def decode_npy(body: bytes):
+    """
+    Decodes NumPy ``.npy`` payload without copying.
+
+    Args:
+        body: payload, written with :func:`numpy.save`
+
+    Returns:
+        Read-only array, that shares memory with the payload.
+    """
+    import numpy as np
+
+    stream = io.BytesIO(body)
+
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(stream)
+        elif version == (2, 0):
+            header = np.lib.format.read_array_header_2_0(stream)
+        else:
+            raise PayloadError(f"Unsupported .npy version {version}")
+    except ValueError as exc:
+        raise PayloadError(f"Invalid .npy payload: {exc}") from exc
+
+    shape, fortran_order, dtype = header
+
+    if dtype.hasobject:
+        raise PayloadError("Arrays of Python objects are not supported")
+
+    count = 1
+    for dim in shape:
+        count *= dim
+
+    try:
+        array = np.frombuffer(
+            body, dtype=dtype, count=count, offset=stream.tell()
+        )
+    except ValueError as exc:
+        raise PayloadError(f"Invalid .npy payload: {exc}") from exc
+
+    if fortran_order:
+        # the only case, when copy is needed to get row-major matrix
+        array = np.ascontiguousarray(array.reshape(shape, order="F"))
+    else:
+        array = array.reshape(shape)
+
+    return _check_matrix(array)
+
+
+def decode_arrow(body: bytes):
+    """
+    Decodes Arrow IPC stream payload.
+
+    Columns buffers are read without copying, then
+    columns are stacked into one row-major matrix.
+
+    Args:
+        body: payload, written with :class:`pyarrow.ipc.RecordBatchStreamWriter`
+
+    Returns:
+        Matrix of rows.
+    """
+    import numpy as np
+
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise PayloadError(
+            "Arrow payloads are not supported, pyarrow is not installed", 415
+        ) from exc
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as exc:
+        raise PayloadError(f"Invalid Arrow payload: {exc}") from exc
+
+    columns = [column.to_numpy() for column in table.columns]
+
+    if not columns:
+        return np.empty((table.num_rows, 0))
+
+    return _check_matrix(np.column_stack(columns))
+
+
+def decode_payload(
+    content_type: Optional[str],
+    body: bytes,
+    parse_json: Callable[[bytes], Any],
+) -> Any:
+    """
+    Decodes payload according to its content type.
+
+    Args:
+        content_type: value of the ``Content-Type`` header,
+            JSON is used if it is missing
+        body: raw payload
+        parse_json: function that parses (and validates) JSON payload
+
+    Returns:
+        Rows to predict.
+
+    Raises:
+        :class:`PayloadError`: if the payload can't be decoded
+            or the content type is not supported.
+    """
+
+    mime = (content_type or JSON).split(";")[0].strip().lower()
+
+    if mime == JSON:
+        try:
+            return parse_json(body)
+        except ValueError as exc:
+            raise PayloadError(f"Invalid JSON payload: {exc}") from exc
+    if mime == NPY:
+        return decode_npy(body)
+    if mime == ARROW_STREAM:
+        return decode_arrow(body)
+
+    raise PayloadError(f"Unsupported content type `{mime}`", 415)
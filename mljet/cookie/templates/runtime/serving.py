@@ -0,0 +1,184 @@
+"""Pre-fork serving of the generated services."""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import (
+    Any,
+    Callable,
+    Dict,
+)
+
+__all__ = ["freeze_heap", "bind_socket", "serve", "serve_wsgi"]
+
+log = logging.getLogger(__name__)
+
+# worker, exited earlier than this timeout (in seconds),
+# is considered as failed to boot
+_BOOT_TIMEOUT = 1.0
+
+WorkerRunner = Callable[[socket.socket], None]
+
+
+def freeze_heap():
+    """
+    Moves all objects (e.g. loaded model) into the permanent
+    generation of the garbage collector.
+
+    Forked workers share memory pages of the parent while
+    nobody writes into them. Garbage collector touches headers
+    of all tracked objects, so without freezing the model pages
+    would be copied into every worker.
+    """
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Binds listening socket, shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(run_worker: WorkerRunner, sock: socket.socket):
+    """Runs worker in the forked process, never returns."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 0
+    try:
+        run_worker(sock)
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)  # pylint: disable=protected-access
+
+
+def serve(run_worker: WorkerRunner, host: str, port: int, n_workers: int):
+    """
+    Serves application with ``n_workers`` pre-forked workers.
+
+    The model must be loaded before the call, so workers
+    share its memory pages with the parent (copy-on-write).
+    The parent only watches workers and respawns dead ones.
+    If a worker fails to boot, all workers are stopped.
+
+    Args:
+        run_worker: function, that runs server on passed socket
+        host: host to bind
+        port: port to bind
+        n_workers: number of workers
+
+    .. note::
+        If ``os.fork`` is not available or ``n_workers`` is less
+        than 2, the server is run in the current process.
+    """
+
+    sock = bind_socket(host, port)
+
+    if n_workers <= 1 or not hasattr(os, "fork"):
+        run_worker(sock)
+        return
+
+    freeze_heap()
+
+    # pid -> boot time
+    workers: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(run_worker, sock)
+        workers[pid] = time.monotonic()
+        log.info("Booted worker with pid %s", pid)
+
+    def stop(*_: Any):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(n_workers):
+        spawn()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        booted_at = workers.pop(pid, time.monotonic())
+        if stopping:
+            continue
+        log.warning("Worker %s exited with status %s", pid, status)
+        if status and time.monotonic() - booted_at < _BOOT_TIMEOUT:
+            log.error("Worker %s failed to boot, shutting down", pid)
+            stop()
+            continue
+        spawn()
+
+    sock.close()
+
+
+def serve_wsgi(app: Any, host: str, port: int, n_workers: int, n_threads: int):
+    """
+    Serves WSGI application with gunicorn.
+
+    Application is preloaded in the gunicorn master, so the
+    model is shared with workers the same way as in :func:`serve`.
+    Falls back to the werkzeug server, if gunicorn is not available.
+
+    Args:
+        app: WSGI application
+        host: host to bind
+        port: port to bind
+        n_workers: number of workers
+        n_threads: number of threads per worker
+    """
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        log.warning("gunicorn is not available, using werkzeug server")
+        from werkzeug.serving import run_simple
+
+        run_simple(host, port, app, threaded=n_threads > 1)
+        return
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": max(n_workers, 1),
+        "threads": max(n_threads, 1),
+        "worker_class": "gthread",
+        "preload_app": True,
+    }
+
+    class _Application(BaseApplication):  # pylint: disable=abstract-method
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    freeze_heap()
+    _Application().run()
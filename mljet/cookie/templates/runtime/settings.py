@@ -0,0 +1,148 @@
+"""Settings of the generated service."""
+
+import json
+import logging
+import os
+from dataclasses import (
+    asdict,
+    dataclass,
+    fields,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Optional,
+    Union,
+    get_args,
+)
+
+__all__ = ["ServiceSettings", "SETTINGS_FILENAME", "ENV_PREFIX"]
+
+# name of the settings file, placed next to the `server.py`
+SETTINGS_FILENAME = "service.json"
+# prefix of the environment variables, that override settings
+ENV_PREFIX = "MLJET_"
+
+log = logging.getLogger(__name__)
+
+
+def _parse_env(env: str, raw: str, annotation: Any) -> Any:
+    """
+    Parses environment variable value into the setting type.
+
+    Args:
+        env: name of the environment variable.
+        raw: value of the environment variable.
+        annotation: type of the setting, e.g. ``int`` or ``Optional[int]``.
+
+    Returns:
+        Parsed value.
+
+    Raises:
+        ValueError: if value doesn't match the setting type.
+    """
+
+    # Optional[X] is Union[X, None]
+    types = get_args(annotation) or (annotation,)
+    if str in types:
+        return raw
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    if value is None and type(None) in types:
+        return value
+    # bool is a subclass of int, but it is not a valid int setting
+    if type(value) in types:
+        return value
+    expected = " or ".join(
+        "null" if t is type(None) else t.__name__ for t in types
+    )
+    raise ValueError(f"Environment variable {env}={raw!r} must be {expected}")
+
+
+@dataclass
+class ServiceSettings:
+    """
+    Settings of the generated service.
+
+    Settings are written by the project builder into
+    the ``service.json`` file. Every setting can be overridden
+    at runtime by the environment variable with the same
+    name in upper case and ``MLJET_`` prefix
+    (e.g. ``MLJET_MAX_BATCH_SIZE``).
+
+    Attributes:
+        max_batch_size: maximum count of rows merged into one model call,
+            values less than 2 disable micro-batching.
+        max_batch_wait_us: maximum time (in microseconds) to wait
+            for the batch to be filled.
+        n_workers: number of pre-forked worker processes.
+        n_threads: number of threads per worker (WSGI backends only).
+        response_encoder: encoder of the responses, one of ``json``,
+            ``orjson`` or ``auto`` (``orjson`` if it is installed).
+        float_precision: number of decimals to round output floats to,
+            floats are not rounded if it is None.
+        float32: cast output floats to ``float32``.
+        executor: executor of the inference calls (async backends only),
+            one of ``inline``, ``thread`` or ``process``.
+        executor_workers: maximum count of the executor workers,
+            default of the pool is used if it is None.
+        max_pending: maximum count of the pending inference calls,
+            extra requests are rejected with 503, values less than 1
+            disable the limit.
+    """
+
+    max_batch_size: int = 1
+    max_batch_wait_us: int = 1000
+    n_workers: int = 1
+    n_threads: int = 8
+    response_encoder: str = "auto"
+    float_precision: Optional[int] = None
+    float32: bool = False
+    executor: str = "thread"
+    executor_workers: Optional[int] = None
+    max_pending: int = 0
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ServiceSettings":
+        """
+        Loads settings from file and environment.
+
+        Args:
+            path: path to the settings file,
+                defaults are used if file does not exist.
+
+        Returns:
+            Loaded settings.
+
+        Raises:
+            ValueError: if environment variable has a wrong type.
+        """
+
+        values = {}
+
+        try:
+            with open(path, encoding="utf-8") as fin:
+                values = json.load(fin)
+        except FileNotFoundError:
+            log.debug("Settings file `%s` not found, using defaults", path)
+
+        known = {f.name: f.type for f in fields(cls)}
+
+        for name, annotation in known.items():
+            env = ENV_PREFIX + name.upper()
+            raw = os.getenv(env)
+            if raw is not None:
+                values[name] = _parse_env(env, raw, annotation)
+
+        return cls(**{k: v for k, v in values.items() if k in known})
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Dumps settings to file."""
+        with open(path, "w", encoding="utf-8") as fout:
+            fout.write(self.to_json())
+
+    def to_json(self) -> str:
+        """Returns settings as JSON string."""
+        return json.dumps(asdict(self), indent=4)
@@ -0,0 +1,164 @@
+"""Persistent on-disk cache of the build artifacts."""
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import (
+    Optional,
+    Union,
+)
+
+__all__ = [
+    "CACHE_DIR_ENV",
+    "NO_CACHE_ENV",
+    "get_cache_dir",
+    "is_cache_enabled",
+    "digest",
+    "FileCache",
+]
+
+log = logging.getLogger(__name__)
+
+# environment variable to override the cache directory
+CACHE_DIR_ENV = "MLJET_CACHE_DIR"
+# environment variable to disable the cache
+NO_CACHE_ENV = "MLJET_NO_CACHE"
+
+
+def get_cache_dir() -> Path:
+    """
+    Returns the mljet user cache directory.
+
+    The directory is taken from ``MLJET_CACHE_DIR``, then from
+    ``XDG_CACHE_HOME``, and defaults to ``~/.cache/mljet``.
+    The directory is not created.
+    """
+    override = os.getenv(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    xdg = os.getenv("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home().joinpath(".cache")
+    return base.joinpath("mljet")
+
+
+def is_cache_enabled() -> bool:
+    """Checks if the cache is not disabled by ``MLJET_NO_CACHE``."""
+    return os.getenv(NO_CACHE_ENV, "").lower() not in ("1", "true", "yes")
+
+
+def digest(*parts: Union[str, bytes]) -> str:
+    """
+    Returns SHA-256 hex digest of the parts.
+
+    Parts are length-prefixed, so different splits
+    of the same text give different digests.
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+class FileCache:
+    """
+    Content-addressed cache, that stores one file per key.
+
+    The cache is best-effort: IO errors are logged
+    and treated as cache misses.
+
+    If `max_size` is set, least recently used entries are removed
+    after the write, that exceeds it, until the size of the cache
+    fits it. The size is tracked after the first write, so the
+    cache directory is not listed on every write. Entries are
+    touched on read to track their use.
+
+    Args:
+        namespace: name of the cache subdirectory
+        root: cache root directory, defaults to :func:`get_cache_dir`
+        max_size: maximum total size (in bytes) of the entries
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        root: Optional[Path] = None,
+        max_size: Optional[int] = None,
+    ):
+        self.path = Path(root or get_cache_dir()).joinpath(namespace)
+        self.max_size = max_size
+        # size of the entries, None if it is not known yet
+        self._size: Optional[int] = None
+
+    def _entry(self, key: str) -> Path:
+        # split into subdirectories like git objects
+        return self.path.joinpath(key[:2], key[2:])
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns cached data or None."""
+        if not is_cache_enabled():
+            return None
+        entry = self._entry(key)
+        try:
+            data = entry.read_bytes()
+        except OSError:
+            return None
+        if self.max_size is not None:
+            try:
+                os.utime(entry)
+            except OSError:
+                pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Stores data, replacing the file atomically."""
+        if not is_cache_enabled():
+            return
+        entry = self._entry(key)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as fout:
+                    fout.write(data)
+                os.replace(tmp, entry)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as exc:
+            log.debug("Failed to write cache entry %s: %s", entry, exc)
+            return
+        if self.max_size is None:
+            return
+        if self._size is not None:
+            # replaced entries are counted twice, so
+            # the eviction is never late
+            self._size += len(data)
+        if self._size is None or self._size > self.max_size:
+            self.evict(self.max_size)
+
+    def evict(self, max_size: int) -> None:
+        """Removes least recently used entries, until cache fits `max_size`."""
+        entries = []
+        for entry in self.path.glob("*/*"):
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda x: x[:2]):
+            if total <= max_size:
+                break
+            try:
+                entry.unlink()
+            except OSError as exc:
+                log.debug("Failed to remove cache entry %s: %s", entry, exc)
+                continue
+            total -= size
+        self._size = total
@@ -1,6 +1,7 @@
 """Helper functions for connecting across the network."""
 
 import socket
+import time
 from contextlib import closing
 
 
@@ -32,3 +33,33 @@ def find_free_port() -> int:
         sock.bind(("", 0))
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         return sock.getsockname()[1]
+
+
+def wait_for_port(
+    port: int,
+    host: str = "localhost",
+    timeout: float = 30.0,
+    interval: float = 0.1,
+) -> bool:
+    """
+    Wait until the port starts accepting connections.
+
+    Args:
+        port: port to wait for
+        host: host to connect to
+        timeout: maximum time to wait (in seconds)
+        interval: time between attempts (in seconds)
+
+    Returns:
+        True if port accepts connections, False if timeout is exceeded
+    """
+
+    deadline = time.monotonic() + timeout
+
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex((host, port)) == 0:
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
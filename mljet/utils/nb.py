@@ -1,16 +1,37 @@
 """Module that contains the code for handling Jupyter notebooks."""
 
+import json
+import re
 from typing import (
+    IO,
+    Any,
+    Iterator,
     List,
     Literal,
+    Optional,
     TypedDict,
 )
 
-from nbformat import read
+from nbformat import (
+    NBFormatError,
+    read,
+)
+from nbformat.reader import NotJSONError
 
 from mljet.utils.types import PathLike
 
-__all__ = ["get_code_from_ipynb", "get_code_cells_sources_from_notebook"]
+__all__ = [
+    "get_code_from_ipynb",
+    "get_code_cells_sources_from_notebook",
+    "iter_code_from_ipynb",
+]
+
+# size of the chunks, read from the notebook file
+_CHUNK_SIZE = 2**20
+
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
 
 
 class _Cell(TypedDict):
@@ -57,12 +78,19 @@ def get_code_cells_sources_from_notebook(notebook: _Notebook) -> List[str]:
     ]
 
 
-def get_code_from_ipynb(path: PathLike, explicit_version: int = 4) -> List[str]:
+def get_code_from_ipynb(
+    path: PathLike, explicit_version: int = 4, validate: bool = False
+) -> List[str]:
     """
     Get the source code from a Jupyter notebook.
 
     Args:
         path: The path to the notebook.
+        explicit_version: The version to convert the notebook to,
+            used only with ``validate``.
+        validate: Read the whole notebook with :mod:`nbformat`
+            and validate it, by default the notebook is streamed
+            with :func:`iter_code_from_ipynb`.
 
     Returns:
         The source code from the notebook.
@@ -74,12 +102,255 @@ def get_code_from_ipynb(path: PathLike, explicit_version: int = 4) -> List[str]:
         :class:`nbformat.NBFormatError`: If the notebook has an invalid version.
 
     .. note::
-        The notebook version will be explicitly
+        With ``validate`` the notebook version will be explicitly
         converted to version ``explicit_version``.
 
     """
 
+    if not validate:
+        return list(iter_code_from_ipynb(path))
+
     with open(path) as f:
         notebook = read(f, explicit_version)
 
     return get_code_cells_sources_from_notebook(notebook)
+
+
+class _JsonStream:
+    """
+    Incremental reader of the JSON document.
+
+    Values can be skipped without being materialized, so memory
+    usage doesn't depend on the size of the skipped values.
+    """
+
+    def __init__(self, stream: IO[str]):
+        self._stream = stream
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Reads next chunk, drops consumed part of the buffer."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> NotJSONError:
+        return NotJSONError(f"Notebook is not valid JSON: {message}")
+
+    def peek(self) -> str:
+        """Returns next non-whitespace char, empty string on EOF."""
+        while True:
+            match = _WHITESPACE.match(self._buf, self._pos)
+            if match is None:
+                raise self._error(f"unexpected char at {self._pos}")
+            self._pos = match.end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"expected `{char}`")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Reads and returns the next (small) value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                # value could be cut by the end of the buffer
+                if self._fill():
+                    continue
+                raise self._error(str(exc)) from exc
+            # number could be cut by the end of the buffer too
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self):
+        """Skips the next value without materializing it."""
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+        elif char in ("{", "["):
+            self._skip_container()
+        else:
+            self.read_value()
+
+    def _skip_string(self):
+        self._pos += 1
+        while True:
+            quote = self._buf.find('"', self._pos)
+            if quote == -1:
+                # drop the scanned part, but keep the trailing
+                # backslashes, they could escape the next quote
+                tail = len(self._buf) - len(self._buf.rstrip("\\"))
+                self._pos = max(self._pos, len(self._buf) - tail)
+                if not self._fill():
+                    raise self._error("unterminated string")
+                continue
+            start = quote
+            while start > self._pos and self._buf[start - 1] == "\\":
+                start -= 1
+            self._pos = quote + 1
+            # quote is escaped by the odd count of backslashes
+            if (quote - start) % 2 == 0:
+                return
+
+    def _skip_container(self):
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise self._error("unterminated object")
+                continue
+            char = match.group()
+            self._pos = match.start()
+            if char == '"':
+                self._skip_string()
+                continue
+            self._pos += 1
+            depth += 1 if char in ("{", "[") else -1
+            if depth == 0:
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Yields keys of the object.
+
+        The value of every key must be read or skipped
+        before the next key is requested.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise self._error("expected object key")
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error("expected `,` or `}`")
+
+    def iter_array(self) -> Iterator[None]:
+        """
+        Iterates over items of the array.
+
+        Every item must be read or skipped before the next one.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error("expected `,` or `]`")
+
+    def expect_end(self):
+        if self.peek():
+            raise self._error("extra data after the document")
+
+
+def _join_source(source: Any) -> str:
+    # on disk sources are stored as lists of lines
+    if isinstance(source, list):
+        return "".join(source)
+    if isinstance(source, str):
+        return source
+    raise NBFormatError("Cell source must be a string or a list of strings")
+
+
+def _iter_cells(stream: _JsonStream) -> Iterator[str]:
+    """Yields sources of the non-empty code cells."""
+    for _ in stream.iter_array():
+        cell_type: Optional[str] = None
+        source: Any = None
+        for key in stream.iter_object():
+            if key == "cell_type":
+                cell_type = stream.read_value()
+            # nbformat 3 stores code of the code cells in `input`
+            elif key == "source" and source is None or key == "input":
+                source = stream.read_value()
+            else:
+                # outputs, attachments, metadata
+                stream.skip_value()
+        if cell_type == "code" and source is not None:
+            code = _join_source(source)
+            if code.strip():
+                yield code
+
+
+def iter_code_from_ipynb(path: PathLike) -> Iterator[str]:
+    """
+    Lazily yields the source code of the code cells of a Jupyter notebook.
+
+    The notebook is parsed incrementally, outputs and attachments
+    are skipped without being loaded, the notebook is not validated.
+
+    Args:
+        path: The path to the notebook.
+
+    Yields:
+        The source code of the non-empty code cells.
+
+    Raises:
+        FileNotFoundError: If the notebook does not exist.
+        :class:`nbformat.reader.NotJSONError`: If the notebook is not valid JSON.
+        :class:`nbformat.NBFormatError`: If the notebook has no cells
+            or has an unsupported version.
+    """
+
+    version = None
+    has_cells = False
+
+    with open(path, encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for key in stream.iter_object():
+            if key == "cells":
+                has_cells = True
+                yield from _iter_cells(stream)
+            elif key == "worksheets":
+                # nbformat 3
+                has_cells = True
+                for _ in stream.iter_array():
+                    for worksheet_key in stream.iter_object():
+                        if worksheet_key == "cells":
+                            yield from _iter_cells(stream)
+                        else:
+                            stream.skip_value()
+            elif key == "nbformat":
+                version = stream.read_value()
+            else:
+                stream.skip_value()
+        stream.expect_end()
+
+    if version not in (3, 4) or not has_cells:
+        raise NBFormatError(
+            f"Unsupported notebook: version {version!r}"
+            f"{'' if has_cells else ', no cells'}"
+        )
@@ -1,19 +1,21 @@
 """Module that contains the DAG implementation."""
 
-import copy
+import itertools
 from collections import (
     Counter as Counter_,
-    defaultdict,
     deque,
 )
 from typing import (
     Counter,
-    DefaultDict,
     Deque,
     Dict,
     Generic,
+    Iterable,
     List,
+    Mapping,
+    Optional,
     Set,
+    Tuple,
     TypeVar,
 )
 
@@ -49,6 +51,21 @@ class DirectedAcyclicGraph(Generic[T]):
 
         If a cycle is detected, the _graph will not be modified.
 
+    .. note::
+
+        Cycles are detected incrementally (Pearce-Kelly algorithm):
+        the DAG keeps a topological index of every node and on
+        the edge insertion, that violates it, only nodes between
+        the ends of the edge are searched and reordered.
+        Use :meth:`add_many` to add many edges with a single check.
+
+    .. note::
+
+        Relations are stored as ordered sets (dicts with `None` values)
+        in both directions, so the duplicate relations are merged and
+        the membership, in-degree and predecessors queries do not
+        scan the _graph.
+
     .. note::
 
         Nodes with no incoming links will additionally be sorted
@@ -60,23 +77,37 @@ class DirectedAcyclicGraph(Generic[T]):
 
     def __init__(self):
         """Initialize the DAG"""
-        self._graph: DefaultDict[T, List[T]] = defaultdict(list)
-        self._ordered: List[T] = []
+        self._graph: Dict[T, Dict[T, None]] = {}
+        # predecessors of the nodes
+        self._parents: Dict[T, Dict[T, None]] = {}
+        # topological indices of the nodes, maintained incrementally
+        self._index: Dict[T, int] = {}
+        self._head = itertools.count(-1, -1)
+        self._tail = itertools.count()
+        # cached result of `_topsort`, None if graph was changed
+        self._ordered: Optional[List[T]] = None
 
     @property
     def ordered(self) -> List[T]:
         """Returns the topologically sorted list of nodes"""
+        if self._ordered is None:
+            self._ordered = self._topsort()
         return self._ordered[:]
 
     @property
     def isolated(self) -> List[T]:
         """Returns a list of isolated nodes"""
-        relationscountmap = self.relationscountmap()
-        return [x for x in self._graph.keys() if relationscountmap[x] == 0]
+        return [x for x, parents in self._parents.items() if not parents]
 
     def relationscountmap(self) -> Counter[T]:
         """Returns a map of the number of relations each node has"""
-        return Counter_(x for y in self._graph.values() for x in y)
+        return Counter_(
+            {x: len(parents) for x, parents in self._parents.items() if parents}
+        )
+
+    def in_degree(self, node: T) -> int:
+        """Returns the number of relations to the given node"""
+        return len(self._parents.get(node, ()))
 
     def _topsort(self) -> List[T]:
         """
@@ -89,14 +120,16 @@ class DirectedAcyclicGraph(Generic[T]):
 
         """
 
-        relationscountmap = self.relationscountmap()
+        relationscountmap = {
+            x: len(parents) for x, parents in self._parents.items()
+        }
         to_visit: Deque[T] = deque()
 
         to_visit.extend(
             # nodes that do not have incoming connections will
             # be added to the visit list first
             sorted(
-                [x for x in self._graph.keys() if relationscountmap[x] == 0],
+                [x for x, count in relationscountmap.items() if count == 0],
                 # sort by the number of outgoing links
                 key=lambda x: len(self._graph[x]),
                 reverse=True,
@@ -118,6 +151,79 @@ class DirectedAcyclicGraph(Generic[T]):
 
         return visited
 
+    def _add_node(self, node: T, created: List[T]):
+        if node in self._graph:
+            return
+        self._graph[node] = {}
+        self._parents[node] = {}
+        self._index[node] = next(self._tail)
+        created.append(node)
+
+    def _link(self, from_: T, to: T, added: List[Tuple[T, T]]):
+        self._graph[from_][to] = None
+        self._parents[to][from_] = None
+        added.append((from_, to))
+
+    def _rollback(self, added: List[Tuple[T, T]], created: List[T]):
+        for from_, to in added:
+            del self._graph[from_][to]
+            del self._parents[to][from_]
+        # topological indices of the rest nodes are still valid
+        for node in created:
+            del self._graph[node]
+            del self._parents[node]
+            del self._index[node]
+
+    def _reach(
+        self,
+        start: T,
+        adjacency: Dict[T, Dict[T, None]],
+        lower: int,
+        upper: int,
+    ) -> Set[T]:
+        """Returns nodes, reachable from start, with indices in bounds."""
+        reached = {start}
+        stack = [start]
+        while stack:
+            for node in adjacency[stack.pop()]:
+                if node not in reached and lower < self._index[node] < upper:
+                    reached.add(node)
+                    stack.append(node)
+        return reached
+
+    def _check_edge(self, from_: T, to: T):
+        """
+        Restores topological indices for the new edge.
+
+        Raises:
+            CycleExistsError: If the edge closes a cycle
+        """
+        lower, upper = self._index[to], self._index[from_]
+        if lower > upper:
+            return
+        if lower == upper:
+            raise CycleExistsError(f"Cycle detected with `{from_}`")
+        # source (sink) could be moved before (after) all nodes,
+        # that is the common case of the growing graph
+        if not self._parents[from_]:
+            self._index[from_] = next(self._head)
+            return
+        if not self._graph[to]:
+            self._index[to] = next(self._tail)
+            return
+        # nodes after `to`, that must follow `from_`
+        forward = self._reach(to, self._graph, lower - 1, upper + 1)
+        if from_ in forward:
+            raise CycleExistsError(f"Cycle detected with `{from_}` and `{to}`")
+        # nodes before `from_`, that must precede `to`
+        backward = self._reach(from_, self._parents, lower, upper + 1)
+        moved = sorted(backward, key=self._index.__getitem__) + sorted(
+            forward, key=self._index.__getitem__
+        )
+        slots = sorted(self._index[node] for node in moved)
+        for node, slot in zip(moved, slots):
+            self._index[node] = slot
+
     def add(self, item: T, *to: T):
         """
         Add an item to the _graph, and optionally add relations to other items
@@ -138,21 +244,72 @@ class DirectedAcyclicGraph(Generic[T]):
 
         """
 
-        commit = copy.deepcopy(self._graph)
-        self._graph[item].extend(to)
+        created: List[T] = []
+        added: List[Tuple[T, T]] = []
+
+        self._add_node(item, created)
+        for node in to:
+            self._add_node(node, created)
+
+        try:
+            for node in to:
+                if node in self._graph[item]:
+                    continue
+                self._check_edge(item, node)
+                self._link(item, node, added)
+        except CycleExistsError:
+            self._rollback(added, created)
+            raise CycleExistsError(
+                f"Cycle detected with `{item}` and `{to}`"
+            ) from None
+
+        self._ordered = None
+
+    def add_many(self, items: Mapping[T, Iterable[T]]):
+        """
+        Add items with their relations, the _graph is checked once.
+
+        Equivalent of `add(item, *to)` for every pair of `items`,
+        but takes O(V + E) time instead of searching for a cycle
+        on every edge.
+
+        Args:
+            items: The items mapped to the items to add relations to
+
+        Raises:
+            CycleExistsError: If a cycle is detected in the _graph,
+                the _graph is not modified
+
+        """
+
+        created: List[T] = []
+        added: List[Tuple[T, T]] = []
+
+        for item, to in items.items():
+            to = list(to)
+            self._add_node(item, created)
+            for node in to:
+                self._add_node(node, created)
+            for node in to:
+                if node not in self._graph[item]:
+                    self._link(item, node, added)
+
         topsorted = self._topsort()
         if len(topsorted) != len(self._graph):
-            # rollback
-            self._graph = commit
-            raise CycleExistsError(f"Cycle detected with `{item}` and `{to}`")
+            self._rollback(added, created)
+            raise CycleExistsError(f"Cycle detected in `{dict(items)}`")
 
+        self._index = {node: i for i, node in enumerate(topsorted)}
+        self._head = itertools.count(-1, -1)
+        self._tail = itertools.count(len(topsorted))
         self._ordered = topsorted
 
     def __len__(self):
         return len(self._graph)
 
     def __repr__(self):
-        return f"DirectedAcyclicGraph({dict(self._graph)})"
+        graph = {x: list(targets) for x, targets in self._graph.items()}
+        return f"DirectedAcyclicGraph({graph})"
 
     def __contains__(self, item):
         return item in self._graph
@@ -161,14 +318,13 @@ class DirectedAcyclicGraph(Generic[T]):
     def from_dict(cls, d: Dict[T, List[T]]) -> "DirectedAcyclicGraph[T]":
         """Create a DAG from a dictionary"""
         dag = cls()
-        for item, to in d.items():
-            dag.add(item, *to)
+        dag.add_many(d)
         return dag
 
     def edges_to(self, to: T) -> Set[T]:
         """Returns a set of vertices from which edges go to the given vertex"""
-        return {x for x in self._graph.keys() if to in self._graph[x]}
+        return set(self._parents.get(to, ()))
 
     def edges_from(self, from_: T) -> Set[T]:
         """Returns a set of vertices to which edges go from the given vertex"""
-        return set(self._graph[from_])
+        return set(self._graph.get(from_, ()))
@@ -1,19 +1,39 @@
 """Module that contains the Pipeline implementation."""
 
+import asyncio
 import copy
+import functools
+import inspect
 import logging
+import pickle
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import (
     Any,
     Dict,
+    List,
     NoReturn,
     Optional,
+    Set,
+    Tuple,
 )
 
 import joblib
 
+from mljet.utils.cache import (
+    FileCache,
+    digest,
+)
 from mljet.utils.pipelines.dag import DirectedAcyclicGraph
 from mljet.utils.pipelines.stage import Stage
+from mljet.utils.profiling import span
 from mljet.utils.utils import drop_unnecessary_kwargs
 
 log = logging.getLogger(__name__)
@@ -55,7 +75,25 @@ class Context:
 
 
 class FrozenContext(Context):
-    """Frozen context for pipeline."""
+    """
+    Frozen context for pipeline.
+
+    It is a read-only view of the parameters and results,
+    they are not copied, so stages must not mutate them.
+    """
+
+    def __init__(
+        self,
+        parameters: Optional[Dict[str, Any]] = None,
+        stages_results: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__()
+        self._parameters = MappingProxyType(  # type: ignore
+            {} if parameters is None else parameters
+        )
+        self._stages_results = MappingProxyType(  # type: ignore
+            {} if stages_results is None else stages_results
+        )
 
     def set(self, key: str, value: Any) -> NoReturn:
         raise RuntimeError("Cannot set parameter in frozen context.")
@@ -64,18 +102,47 @@ class FrozenContext(Context):
         raise RuntimeError("Cannot set result in frozen context.")
 
     @classmethod
-    def from_context(cls, context: Context):
-        return cls(
-            copy.deepcopy(context._parameters),
-            copy.deepcopy(context._stages_results),
+    def from_context(cls, context: Context, deep: bool = False):
+        """
+        Creates frozen context from the context.
+
+        Args:
+            context: context to freeze
+            deep: copy parameters and results, otherwise
+                the frozen context is a view of the context.
+        """
+        if deep:
+            return cls(
+                copy.deepcopy(context._parameters),
+                copy.deepcopy(context._stages_results),
+            )
+        return cls(context._parameters, context._stages_results)
+
+    def __reduce__(self):
+        # mapping proxies are not picklable
+        return type(self), (
+            dict(self._parameters),
+            dict(self._stages_results),
         )
 
     def __repr__(self):
-        return f"FrozenContext(parameters={self._parameters}, stages_results={self._stages_results})"
+        return f"FrozenContext(parameters={dict(self._parameters)}, stages_results={dict(self._stages_results)})"
 
 
 RunResult = Dict[str, Any]
 
+# kinds of the stages executor
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+# maximum size (in bytes) of the stages results cache
+STAGES_CACHE_SIZE = 256 * 1024 * 1024
+
+# bump to invalidate stages results cached by the previous versions
+_CHECKPOINT_VERSION = "2"
+
 RuntimeCheckAbleStage = Any
 
 
@@ -83,16 +150,60 @@ class IncorrectDependsError(Exception):
     """Incorrect `depends_on` error."""
 
 
+def _is_coroutine_stage(stage: Stage) -> bool:
+    """Checks if stage is `async def` function or callable object."""
+    return inspect.iscoroutinefunction(stage) or inspect.iscoroutinefunction(
+        getattr(stage, "__call__", None)
+    )
+
+
+def _run_stage(stage: Stage, params: Dict[str, Any]) -> Any:
+    """
+    Runs stage, recording it to the active profiler.
+
+    Coroutine stage is run in the new event loop.
+
+    Raises:
+        RuntimeError: if coroutine stage is run in the thread
+            of the running event loop.
+    """
+    with span(stage.name, "stage"):
+        result = stage(**params)
+        if not inspect.iscoroutine(result):
+            return result
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(result)
+        result.close()
+        raise RuntimeError(
+            f"Coroutine stage `{stage.name}` can't be run inside"
+            f" the running event loop, use `await pipeline.run_async()`"
+        )
+
+
 class Pipeline:
     """
     Stages pipeline.
     Run stages with resolved order.
+
+    Results of the stages, created with `cache` option, are stored
+    in the cache by the fingerprint of their parameters and results
+    of the stages they depend on. If the fingerprint is not changed,
+    the stage is skipped on the next run, so failed pipeline resumes
+    from the last stored result.
+
+    Args:
+        context: context of the pipeline
+        cache: stages results cache, defaults to the cache
+            of the `STAGES_CACHE_SIZE` size in the mljet user cache
     """
 
-    def __init__(self, context: Context):
+    def __init__(self, context: Context, cache: Optional[FileCache] = None):
         self._dag: DirectedAcyclicGraph[str] = DirectedAcyclicGraph()
         self._context = context
         self._name2stage: Dict[str, Stage] = {}
+        self._cache = cache or FileCache("stages", max_size=STAGES_CACHE_SIZE)
 
     def add(self, stage: RuntimeCheckAbleStage):
         """Add stage to pipeline.
@@ -114,6 +225,16 @@ class Pipeline:
 
         self._name2stage[stage.name] = stage
 
+    def _check_depends(self):
+        """Checks that all stages, the stages depend on, are added."""
+        for j in filter(lambda x: x not in self._name2stage, self._dag.ordered):
+            edges_to = self._dag.edges_from(j)
+            edges_joined = ", ".join(edges_to)
+            raise IncorrectDependsError(
+                f"Stages `{edges_joined}` depends on `{j}`, "
+                f"but `{j}` is not in pipeline."
+            )
+
     def get_actual_params(self, fun):
         """
         Get actual parameters for stage.
@@ -132,56 +253,374 @@ class Pipeline:
 
         return pars
 
-    def __call__(self, allow_isolated_concurrency: bool = False) -> RunResult:
+    def _fingerprint(
+        self, stage: Stage, params: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Returns fingerprint of the stage inputs, None if it is not cached.
+
+        Inputs (e.g. the model) are hashed once per stage run,
+        the fingerprint is reused to restore and store the result.
+        """
+
+        if not getattr(stage, "cache", False):
+            return None
+
+        inputs = {k: v for k, v in params.items() if k != "ctx"}
+        # noinspection PyProtectedMember
+        results = {
+            name: self._context._stages_results.get(name)
+            for name in sorted(stage.depends_on)
+        }
+
+        try:
+            return digest(
+                _CHECKPOINT_VERSION,
+                stage.name,
+                getattr(stage, "__module__", ""),
+                getattr(stage, "__qualname__", type(stage).__qualname__),
+                joblib.hash(inputs),
+                joblib.hash(results),
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            log.debug("Result of `%s` is not cached: %s", stage.name, e)
+            return None
+
+    def _checkpoint_key(
+        self,
+        stage: Stage,
+        params: Dict[str, Any],
+        fingerprint: Optional[str],
+    ) -> Optional[str]:
+        """Returns key of the stage result, None if it is not cached."""
+
+        if fingerprint is None:
+            return None
+
+        option = getattr(stage, "cache", False)
+        if not callable(option):
+            return fingerprint
+
+        inputs = {k: v for k, v in params.items() if k != "ctx"}
+        try:
+            state = option(**drop_unnecessary_kwargs(option, inputs))
+            return digest(fingerprint, joblib.hash(state))
+        except Exception as e:  # pylint: disable=broad-except
+            log.debug("Result of `%s` is not cached: %s", stage.name, e)
+            return None
+
+    def _restore(
+        self,
+        stage: Stage,
+        params: Dict[str, Any],
+        fingerprint: Optional[str],
+    ) -> Tuple[bool, Any]:
+        """Returns stored result of the stage, if it is cached."""
+
+        key = self._checkpoint_key(stage, params, fingerprint)
+        data = self._cache.get(key) if key else None
+        if data is None:
+            return False, None
+        try:
+            result = pickle.loads(data)
+        except Exception:  # pylint: disable=broad-except
+            return False, None
+        log.info(
+            "Stage `%s` is skipped, its inputs are not changed", stage.name
+        )
+        return True, result
+
+    def _store(
+        self,
+        stage: Stage,
+        params: Dict[str, Any],
+        fingerprint: Optional[str],
+        result: Any,
+    ):
+        """Stores result of the finished stage, if it is cached."""
+
+        # the state is taken again, because the stage could change
+        # it, the next run will be compared with
+        key = self._checkpoint_key(stage, params, fingerprint)
+        if key is None:
+            return
+        try:
+            data = pickle.dumps(result)
+        except Exception as e:  # pylint: disable=broad-except
+            log.debug("Result of `%s` is not cached: %s", stage.name, e)
+            return
+        self._cache.put(key, data)
+
+    def __call__(
+        self,
+        allow_isolated_concurrency: bool = False,
+        executor: str = "inline",
+        max_workers: Optional[int] = None,
+    ) -> RunResult:
         """
         Run stages in pipeline.
 
+        Kinds of the executor:
+
+        - ``inline`` runs stages one by one in the resolved order;
+        - ``thread`` and ``process`` run every stage in the pool
+          as soon as all stages it depends on are finished, so
+          independent branches of the pipeline run side by side.
+          Stages (and their results) must be picklable for
+          the ``process`` kind.
+
+        If a stage fails, stages that are not started yet are not
+        run, the running ones are awaited and the error is raised.
+
         Args:
             allow_isolated_concurrency: allow concurrent execution
-                of stages that are not depends on each other.
+                of stages that are not depends on each other,
+                same as the ``thread`` executor.
+            executor: kind of the executor.
+            max_workers: maximum count of the concurrently running
+                stages, count of the stages is used if it is None.
+
+        Returns:
+            Results of the stages, they are not copied.
 
+        Raises:
+            ValueError: if executor kind is unknown.
+            IncorrectDependsError: if stage depends on the missing one.
+            RuntimeError: if coroutine stage is run inline
+                inside the running event loop.
         """
 
-        for j in filter(lambda x: x not in self._name2stage, self._dag.ordered):
-            edges_to = self._dag.edges_from(j)
-            edges_joined = ", ".join(edges_to)
-            raise IncorrectDependsError(
-                f"Stages `{edges_joined}` depends on `{j}`, "
-                f"but `{j}` is not in pipeline."
-            )
+        if allow_isolated_concurrency and executor == "inline":
+            executor = "thread"
+
+        if executor != "inline" and executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor kind `{executor}`")
+
+        self._check_depends()
 
-        # take isolated stages
-        isolated = [self._name2stage[x] for x in self._dag.isolated]
+        if executor == "inline":
+            for name in self._dag.ordered:
+                stage = self._name2stage[name]
+                params = self.get_actual_params(stage)
+                fingerprint = self._fingerprint(stage, params)
+                restored, result = self._restore(stage, params, fingerprint)
+                if not restored:
+                    log.info("Running stage `%s`" % stage.name)
+                    result = _run_stage(stage, params)
+                    self._store(stage, params, fingerprint, result)
+                self._context.set_result(stage.name, result)
+        else:
+            self._schedule(
+                EXECUTORS[executor],
+                max_workers or max(len(self._name2stage), 1),
+            )
 
-        # take the rest stages
-        jobs = [self._name2stage[x] for x in self._dag.ordered]
+        # noinspection PyProtectedMember
+        return dict(self._context._stages_results)  # noqa: W0212
+
+    def _schedule(self, pool_cls, max_workers: int):
+        """Runs every stage as soon as its dependencies are finished."""
+
+        order = self._dag.ordered
+        position = {name: i for i, name in enumerate(order)}
+        # count of the unfinished dependencies
+        waits = {name: self._dag.in_degree(name) for name in order}
+        ready = [name for name in order if not waits[name]]
+        running: Dict[Future, Tuple[Stage, Dict[str, Any], Optional[str]]] = {}
+        failure: Optional[BaseException] = None
+
+        def finish(name, result):
+            self._context.set_result(name, result)
+            for after in self._dag.edges_from(name):
+                waits[after] -= 1
+                if not waits[after]:
+                    ready.append(after)
+            ready.sort(key=position.__getitem__)
+
+        with pool_cls(max_workers) as pool:
+            while running or (ready and failure is None):
+                # dispatch no more stages than workers, so
+                # the rest could be skipped on failure
+                started: List[str] = []
+                while ready and failure is None and len(running) < max_workers:
+                    stage = self._name2stage[ready.pop(0)]
+                    params = self.get_actual_params(stage)
+                    fingerprint = self._fingerprint(stage, params)
+                    restored, result = self._restore(stage, params, fingerprint)
+                    if restored:
+                        finish(stage.name, result)
+                        continue
+                    running[pool.submit(_run_stage, stage, params)] = (
+                        stage,
+                        params,
+                        fingerprint,
+                    )
+                    started.append(stage.name)
+
+                if len(started) > 1:
+                    log.info(f"Running {started} in parallel")
+                elif started:
+                    log.info("Running stage `%s`" % started[0])
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in sorted(
+                    done, key=lambda x: position[running[x][0].name]
+                ):
+                    stage, params, fingerprint = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:  # pylint: disable=broad-except
+                        log.error("Stage `%s` failed", stage.name)
+                        failure = failure or e
+                        continue
+                    self._store(stage, params, fingerprint, result)
+                    finish(stage.name, result)
+
+        if failure is not None:
+            skipped = [
+                x for x in order if x not in self._context._stages_results
+            ]
+            log.warning("Stages %s were not completed", skipped)
+            raise failure
+
+    async def run_async(
+        self,
+        executor: str = "thread",
+        max_workers: Optional[int] = None,
+    ) -> RunResult:
+        """
+        Run stages in pipeline on the running event loop.
 
-        # if allow isolated concurrency
-        # run isolated stages in parallel
-        if allow_isolated_concurrency:
+        Every stage is started as soon as all stages it depends
+        on are finished. Coroutine (`async def`) stages are awaited
+        on the loop, so I/O bound stages overlap without threads
+        or processes, other stages are run in the pool of the
+        `executor` kind (see :meth:`__call__`).
 
-            log.info(f"Running {[x.name for x in isolated]} in parallel")
+        If a stage fails, stages that are not started yet are
+        not run, the running coroutine stages are cancelled,
+        the running pool stages are awaited and the error is raised.
 
-            # create joblib tasks and parallel
-            delayed = (joblib.delayed(item) for item in isolated)
-            parallel = joblib.Parallel(n_jobs=-1)
+        Args:
+            executor: kind of the pool executor, ``thread`` or ``process``.
+            max_workers: maximum count of the concurrently running
+                stages, count of the stages is used if it is None.
 
-            # run tasks
-            run_results = parallel(
-                stage_delayed(**self.get_actual_params(stage))
-                for stage, stage_delayed in zip(isolated, delayed)
-            )
+        Returns:
+            Results of the stages, they are not copied.
 
-            # update context and remove from jobs
-            for stage, result in zip(isolated, run_results):
-                self._context.set_result(stage.name, result)
-                jobs.remove(stage)
+        Raises:
+            ValueError: if executor kind is unknown.
+            IncorrectDependsError: if stage depends on the missing one.
+        """
 
-        # run sequential stages
-        for stage in jobs:
-            log.info("Running stage `%s`" % stage.name)
-            result = stage(**self.get_actual_params(stage))
-            self._context.set_result(stage.name, result)
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor kind `{executor}`")
+
+        self._check_depends()
+
+        loop = asyncio.get_running_loop()
+        max_workers = max_workers or max(len(self._name2stage), 1)
+        limit = asyncio.Semaphore(max_workers)
+
+        order = self._dag.ordered
+        position = {name: i for i, name in enumerate(order)}
+        # count of the unfinished dependencies
+        waits = {name: self._dag.in_degree(name) for name in order}
+        # stages, that are run in the pool, they can't be cancelled
+        in_pool: Set[str] = set()
+        names: Dict[asyncio.Future, str] = {}
+        failure: Optional[BaseException] = None
+
+        pool = EXECUTORS[executor](max_workers)
+
+        def restore(
+            stage: Stage, params: Dict[str, Any]
+        ) -> Tuple[Optional[str], bool, Any]:
+            fingerprint = self._fingerprint(stage, params)
+            return (fingerprint, *self._restore(stage, params, fingerprint))
+
+        async def run(stage: Stage) -> Any:
+            params = self.get_actual_params(stage)
+            fingerprint, restored, result = None, False, None
+            if getattr(stage, "cache", False):
+                # inputs are hashed in the thread, not to block the loop
+                fingerprint, restored, result = await loop.run_in_executor(
+                    None, restore, stage, params
+                )
+            if restored:
+                return result
+            async with limit:
+                log.info("Running stage `%s`" % stage.name)
+                if _is_coroutine_stage(stage):
+                    with span(stage.name, "stage"):
+                        result = await stage(**params)
+                else:
+                    in_pool.add(stage.name)
+                    try:
+                        result = await loop.run_in_executor(
+                            pool, functools.partial(_run_stage, stage, params)
+                        )
+                    finally:
+                        in_pool.discard(stage.name)
+            if fingerprint is not None:
+                await loop.run_in_executor(
+                    None, self._store, stage, params, fingerprint, result
+                )
+            return result
+
+        def start(name: str) -> asyncio.Future:
+            task = asyncio.ensure_future(run(self._name2stage[name]))
+            names[task] = name
+            return task
+
+        pending = {start(name) for name in order if not waits[name]}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=lambda x: position[names[x]]):
+                    name = names[task]
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        log.error("Stage `%s` failed", name)
+                        failure = failure or task.exception()
+                        continue
+                    self._context.set_result(name, task.result())
+                    if failure is not None:
+                        continue
+                    for after in sorted(
+                        self._dag.edges_from(name), key=position.__getitem__
+                    ):
+                        waits[after] -= 1
+                        if not waits[after]:
+                            pending.add(start(after))
+                if failure is not None:
+                    for task in pending:
+                        if names[task] not in in_pool:
+                            task.cancel()
+        except asyncio.CancelledError:
+            for task in pending:
+                task.cancel()
+            pool.shutdown(wait=False)
+            raise
+
+        pool.shutdown()
+
+        if failure is not None:
+            # noinspection PyProtectedMember
+            skipped = [
+                x for x in order if x not in self._context._stages_results
+            ]
+            log.warning("Stages %s were not completed", skipped)
+            raise failure
 
         # noinspection PyProtectedMember
-        return copy.deepcopy(self._context._stages_results)  # noqa: W0212
+        return dict(self._context._stages_results)  # noqa: W0212
@@ -6,6 +6,7 @@ from functools import (
     wraps,
 )
 from typing import (
+    Any,
     Callable,
     FrozenSet,
     Iterable,
@@ -31,7 +32,8 @@ class Stage(Protocol):
     #  on which the stage is based
     depends_on: FrozenSet[str]
 
-    # all stage must be callable
+    # all stage must be callable,
+    #  coroutine functions (`async def`) are supported too
     def __call__(self, *args, **kwargs):
         ...  # fmt: skip
 
@@ -42,18 +44,33 @@ T = TypeVar("T")
 U = TypeVar("U")
 
 
-def stage(name: StageName, depends_on: Optional[Iterable[StageName]] = None):
+# stage cache option: flag, or function of the stage
+#  parameters, that returns additional fingerprint
+CacheOption = Union[bool, Callable[..., Any]]
+
+
+def stage(
+    name: StageName,
+    depends_on: Optional[Iterable[StageName]] = None,
+    cache: CacheOption = False,
+):
     """
     Decorator to set stage trait to the object.
 
     Set next attributes to the decorated object:
         - name: name of the stage
         - depends_on: a list of the stages, or their names
+        - cache: cache option of the stage
 
     Args:
         name: stage name
         depends_on: a list of the stages, or their names,
             on which the stage is based
+        cache: memoize result of the stage by its parameters
+            and results of the stages it depends on (see `Pipeline`).
+            If the stage also depends on something else (e.g. files),
+            pass function, that takes parameters of the stage
+            and returns fingerprint of that state.
 
     Returns:
         Object with `Stage` trait.
@@ -82,6 +99,7 @@ def stage(name: StageName, depends_on: Optional[Iterable[StageName]] = None):
                     super().__init__(*args, **kwargs)
                     self.name = stage_name
                     self.depends_on = frozenset(depends_on or [])
+                    self.cache = cache
 
             return StageClass
 
@@ -108,6 +126,7 @@ def stage(name: StageName, depends_on: Optional[Iterable[StageName]] = None):
         # set up the stage protocol traits
         stage_func.name = name  # type: ignore
         stage_func.depends_on = frozenset(depends_on or [])  # type: ignore
+        stage_func.cache = cache  # type: ignore
 
         return stage_func
 
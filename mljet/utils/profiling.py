@@ -0,0 +1,278 @@
+"""Instrumentation of the build steps."""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from mljet.utils.types import PathLike
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+__all__ = ["Span", "Profiler", "span", "profiled"]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_MB = 1024 * 1024
+
+# the profiler, spans are recorded to
+_active: Optional["Profiler"] = None
+
+# count of the enclosing spans, it is tracked by the context,
+#  so the concurrent coroutines and threads do not interfere
+_depth: "contextvars.ContextVar[int]" = contextvars.ContextVar(
+    "mljet_span_depth", default=0
+)
+
+
+def _peak_rss() -> int:
+    """Returns peak RSS of the process in bytes, 0 if it is unknown."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _traced() -> Optional[int]:
+    """Returns size of the traced memory blocks, if tracemalloc is on."""
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[0]
+
+
+@dataclass
+class Span:
+    """
+    Measurements of the step.
+
+    Attributes:
+        name: name of the step
+        category: category of the step, e.g. ``stage``
+        start: start time (in seconds) since the profiler start
+        wall: wall time (in seconds)
+        cpu: CPU time (in seconds) of the thread, that ran the step
+        rss: growth of the process peak RSS (in bytes)
+        traced: change of the memory, traced by :mod:`tracemalloc`
+            (in bytes), None if tracemalloc is not tracing
+        thread: identifier of the thread, that ran the step
+        depth: count of the enclosing steps in the same thread
+            (or coroutine)
+    """
+
+    name: str
+    category: str
+    start: float
+    wall: float
+    cpu: float
+    rss: int
+    traced: Optional[int]
+    thread: int
+    depth: int
+
+
+class Profiler:
+    """
+    Records wall time, CPU time and memory growth of the steps.
+
+    Steps are recorded by :func:`span` and :func:`profiled`,
+    while the profiler is active (entered). Steps of the other
+    threads are recorded too, but not the ones of the child processes.
+
+    Memory of the Python objects is measured, only if
+    :mod:`tracemalloc` is tracing (e.g. ``PYTHONTRACEMALLOC=1``).
+
+    Example:
+
+        >>> with Profiler() as profiler:
+        ...     with span("step"):
+        ...         pass
+        >>> [x.name for x in profiler.spans]
+        ['step']
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._cpu = time.process_time()
+        self._rss = _peak_rss()
+        self._total: Optional[Span] = None
+
+    def __enter__(self) -> "Profiler":
+        global _active  # pylint: disable=global-statement
+        self._origin = time.perf_counter()
+        self._cpu = time.process_time()
+        self._rss = _peak_rss()
+        self._total = None
+        _active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active  # pylint: disable=global-statement
+        self._total = self.total()
+        if _active is self:
+            _active = None
+
+    def total(self) -> Span:
+        """Returns measurements of the process since the profiler start."""
+        if self._total is not None:
+            return self._total
+        return Span(
+            name="total",
+            category="total",
+            start=0.0,
+            wall=time.perf_counter() - self._origin,
+            cpu=time.process_time() - self._cpu,
+            rss=_peak_rss() - self._rss,
+            traced=None,
+            thread=threading.get_ident(),
+            depth=0,
+        )
+
+    @contextmanager
+    def span(self, name: str, category: str = "step") -> Iterator[None]:
+        """Records the wrapped block as the step."""
+
+        depth = _depth.get()
+        token = _depth.set(depth + 1)
+
+        rss = _peak_rss()
+        traced = _traced()
+        cpu = time.thread_time()
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - cpu
+            traced_after = _traced()
+            _depth.reset(token)
+
+            record = Span(
+                name=name,
+                category=category,
+                start=started - self._origin,
+                wall=wall,
+                cpu=cpu,
+                rss=_peak_rss() - rss,
+                traced=(
+                    traced_after - traced
+                    if traced is not None and traced_after is not None
+                    else None
+                ),
+                thread=threading.get_ident(),
+                depth=depth,
+            )
+            with self._lock:
+                self.spans.append(record)
+
+    def trace_events(self) -> Dict[str, Any]:
+        """
+        Returns spans in the Chrome trace event format.
+
+        The result could be opened in ``chrome://tracing``
+        or https://ui.perfetto.dev.
+        """
+
+        pid = os.getpid()
+        events = []
+        for record in sorted(self.spans, key=lambda x: x.start):
+            args = {
+                "cpu_ms": round(record.cpu * 1000, 3),
+                "rss_growth_mb": round(record.rss / _MB, 3),
+            }
+            if record.traced is not None:
+                args["traced_mb"] = round(record.traced / _MB, 3)
+            events.append(
+                {
+                    "name": record.name,
+                    "cat": record.category,
+                    "ph": "X",
+                    "ts": round(record.start * 1e6, 3),
+                    "dur": round(record.wall * 1e6, 3),
+                    "pid": pid,
+                    "tid": record.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_trace(self, path: PathLike) -> None:
+        """Writes spans in the Chrome trace event format to path."""
+        with open(path, "w", encoding="utf-8") as fout:
+            json.dump(self.trace_events(), fout)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Returns the steps table ordered by start time.
+
+        Names of the nested steps are prefixed by their depth,
+        the last row is the total of the process (CPU time
+        of all threads). Traced memory is included, only
+        if it was measured.
+        """
+
+        spans = sorted(self.spans, key=lambda x: (x.start, x.depth))
+        with_traced = any(x.traced is not None for x in spans)
+
+        rows = []
+        for record in [*spans, self.total()]:
+            row: Dict[str, Any] = {
+                "step": "· " * record.depth + record.name,
+                "wall_s": round(record.wall, 3),
+                "cpu_s": round(record.cpu, 3),
+                "rss_growth_mb": round(record.rss / _MB, 1),
+            }
+            if with_traced:
+                row["traced_mb"] = (
+                    round(record.traced / _MB, 1)
+                    if record.traced is not None
+                    else None
+                )
+            rows.append(row)
+        return rows
+
+
+@contextmanager
+def span(name: str, category: str = "step") -> Iterator[None]:
+    """Records the wrapped block to the active profiler, if any."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name, category):
+        yield
+
+
+def profiled(name: str, category: str = "step") -> Callable[[F], F]:
+    """Decorator to record calls of the function as the steps."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -4,15 +4,20 @@ import ast
 import functools
 import json
 import logging
+import os
 import pathlib
 import re
-from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
 from typing import (
+    IO,
+    Any,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
-    Union,
+    Sequence,
+    Set,
 )
 
 import importlib_metadata
@@ -22,7 +27,16 @@ from packaging.version import (
 )
 from pkg_resources import Requirement
 
-from mljet.utils.nb import get_code_from_ipynb
+from mljet.utils.cache import (
+    FileCache,
+    digest,
+)
+from mljet.utils.nb import iter_code_from_ipynb
+from mljet.utils.profiling import profiled
+from mljet.utils.serializers import (
+    collect_globals,
+    scan_globals,
+)
 from mljet.utils.types import PathLike
 
 log = logging.getLogger(__name__)
@@ -49,6 +63,15 @@ template = (
 )
 pinned_version_requirement = re.compile(template)
 
+# minimal count of the changed files to parse them in a process pool
+_PARALLEL_SCAN_THRESHOLD = 32
+
+# maximum size (in bytes) of the cache of the files imports
+IMPORTS_CACHE_SIZE = 64 * 1024 * 1024
+
+# names of the files and dirs, that are not scanned by default
+_IGNORE_NAMES = ["venv", ".venv", "node_modules"]
+
 
 def validate(req):
     if not pinned_version_requirement.match(req):
@@ -201,12 +224,10 @@ def get_source_from_notebook(path: PathLike) -> str:
         The source code as a string
 
     Raises:
-        RuntimeError: If the notebook is not valid JSON
+        ValueError: If the notebook is not valid
     """
 
-    code_cells = get_code_from_ipynb(path)
-
-    return "\n".join(code_cells)
+    return "\n".join(iter_code_from_ipynb(path))
 
 
 @functools.lru_cache(None)
@@ -239,17 +260,19 @@ def get_pkgs_distributions() -> dict:
     }
 
 
-def extract_modules(
-    node: Union[ast.Import, ast.ImportFrom],
+def resolve_modules(
+    modules: Iterable[str],
     ignore_mods: Optional[List[str]] = None,
-) -> dict:
+) -> Dict[str, str]:
     """
-    Extract the modules from an import node
+    Resolve modules to the installed distributions
 
     Args:
-        node: The import node
+        modules: Names of the modules, e.g. `sklearn.linear_model`
         ignore_mods: List of modules to ignore
 
+    Returns:
+        A dict of requirements and their versions
     """
 
     packages = freeze()
@@ -259,17 +282,8 @@ def extract_modules(
 
     pool = {}
 
-    if isinstance(node, ast.Import):
-
-        for pkg_name in filter(lambda x: x.name in package2module, node.names):
-            mod = package2module.get(pkg_name.name)
-
-            if mod not in ignore_mods and mod in packages:
-                pool[mod] = packages[mod]
-
-    if isinstance(node, ast.ImportFrom) and node.module:
-        base_mod, *_ = node.module.partition(".")
-
+    for module in modules:
+        base_mod, *_ = module.partition(".")
         mod = package2module.get(base_mod)
 
         if mod not in ignore_mods and mod and mod in packages:
@@ -278,20 +292,199 @@ def extract_modules(
     return pool
 
 
+def scan_pickle_requirements(
+    stream: IO[bytes],
+    ignore_mods: Optional[List[str]] = None,
+) -> Dict[str, str]:
+    """
+    Scan a pickle stream for requirements.
+
+    Modules of the globals, referenced by the stream, are resolved
+    to the installed distributions. Nothing is unpickled.
+
+    Args:
+        stream: Binary stream of the pickle
+        ignore_mods: List of modules to ignore
+
+    Returns:
+        A dict of requirements and their versions
+
+    Raises:
+        ValueError: If the stream is not a valid pickle
+    """
+
+    modules = {module for module, _ in scan_globals(stream)}
+    return resolve_modules(sorted(modules), ignore_mods=ignore_mods)
+
+
+@profiled("scan-model-requirements")
+def scan_model_requirements(
+    models: Sequence[Any],
+    ignore_mods: Optional[List[str]] = None,
+) -> Dict[str, str]:
+    """
+    Scan models for requirements.
+
+    Models are pickled into a sink, that drops the data,
+    only modules of the referenced globals are kept.
+
+    Args:
+        models: List of models
+        ignore_mods: List of modules to ignore
+
+    Returns:
+        A dict of requirements and their versions
+    """
+
+    modules = {
+        module for model in models for module, _ in collect_globals(model)
+    }
+    return resolve_modules(sorted(modules), ignore_mods=ignore_mods)
+
+
+def extract_imports(source_code: str) -> List[str]:
+    """
+    Extract top-level modules imported by the source code
+
+    Args:
+        source_code: Python source code
+
+    Returns:
+        Sorted list of the top-level modules names
+
+    Raises:
+        SyntaxError: If the source code is not valid
+    """
+
+    tree = ast.parse(source_code)
+    modules: Set[str] = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.partition(".")[0] for alias in node.names)
+        elif (
+            isinstance(node, ast.ImportFrom) and node.module and not node.level
+        ):
+            modules.add(node.module.partition(".")[0])
+
+    return sorted(modules)
+
+
+def _scan_file(script: pathlib.Path) -> Optional[List[str]]:
+    """Returns imports of the file, None if it is not valid Python code."""
+
+    if script.suffix == ".ipynb":
+        source_code = get_source_from_notebook(script)
+    else:
+        with open(script, encoding="utf-8") as fin:
+            source_code = fin.read()
+
+    try:
+        return extract_imports(source_code)
+    except SyntaxError:
+        return None
+
+
+def _iter_scripts(
+    base: pathlib.Path,
+    extensions: List[str],
+    ignore_names: List[str],
+    recursive: bool,
+    exclude: Optional[Sequence[PathLike]] = None,
+) -> Iterator[pathlib.Path]:
+    """
+    Yields files to scan, ignored directories are not walked.
+
+    Hidden directories (e.g. ``.git``), ``__pycache__``
+    and `exclude` paths (e.g. the built project) are skipped.
+    """
+
+    if not base.is_dir():
+        yield base
+        return
+
+    suffixes = {f".{ext}" for ext in extensions}
+    excluded = {pathlib.Path(path).resolve() for path in exclude or []}
+
+    def walked(root: str, name: str) -> bool:
+        return not (
+            name in ignore_names
+            or name.startswith(".")
+            or name == "__pycache__"
+            or (excluded and pathlib.Path(root, name).resolve() in excluded)
+        )
+
+    for root, dirs, files in os.walk(base):
+        dirs[:] = sorted(d for d in dirs if recursive and walked(root, d))
+        for name in sorted(files):
+            script = pathlib.Path(root, name)
+            if script.suffix in suffixes and name not in ignore_names:
+                yield script
+
+
+def _file_key(script: pathlib.Path) -> str:
+    stat = script.stat()
+    return digest(
+        str(script.resolve()), str(stat.st_mtime_ns), str(stat.st_size)
+    )
+
+
+def sources_digest(
+    path: PathLike,
+    extensions: Optional[List[str]] = None,
+    ignore_names: Optional[List[str]] = None,
+    recursive: bool = False,
+    exclude: Optional[Sequence[PathLike]] = None,
+) -> str:
+    """
+    Returns fingerprint of the files, scanned by :func:`scan_requirements`.
+
+    Files are fingerprinted by their paths, mtimes and sizes.
+
+    Raises:
+        OSError: If the path does not exist
+    """
+
+    base = pathlib.Path(path)
+    extensions = extensions or ["py", "ipynb"]
+    ignore_names = ignore_names or _IGNORE_NAMES
+
+    return digest(
+        *(
+            _file_key(script)
+            for script in _iter_scripts(
+                base, extensions, ignore_names, recursive, exclude
+            )
+        )
+    )
+
+
+@profiled("scan-requirements")
 def scan_requirements(
     path: PathLike,
     extensions: Optional[List[str]] = None,
     ignore_mods: Optional[List[str]] = None,
     ignore_names: Optional[List[str]] = None,
+    recursive: bool = False,
+    n_jobs: Optional[int] = None,
+    exclude: Optional[Sequence[PathLike]] = None,
 ) -> Dict[str, str]:
     """
     Scan a directory of file for requirements.
 
+    Imports of every file are cached by its path, mtime and size,
+    so a rescan parses only changed files. Changed files are parsed
+    in a process pool, if there are many of them.
+
     Args:
         path: Path to the directory
         extensions: List of file extensions to scan. Defaults to ['py', 'ipynb']
         ignore_mods: List of modules to ignore
         ignore_names: List of file/dirs names to ignore
+        recursive: Scan subdirectories too, except the hidden ones
+            and ``__pycache__``
+        n_jobs: Count of the parsing processes, defaults to count of CPUs
+        exclude: Paths of the files/dirs to skip, e.g. the built project
 
     Returns:
         A dict of requirements and their versions
@@ -305,44 +498,46 @@ def scan_requirements(
     extensions = extensions or ["py", "ipynb"]
 
     ignore_mods = ignore_mods or []
-    ignore_names = ignore_names or ["venv", ".venv"]
-
-    pool = {}
+    ignore_names = ignore_names or _IGNORE_NAMES
+
+    cache = FileCache("imports", max_size=IMPORTS_CACHE_SIZE)
+    modules: Set[str] = set()
+    missed = []
+
+    for script in _iter_scripts(
+        base, extensions, ignore_names, recursive, exclude
+    ):
+        key = _file_key(script)
+        cached = cache.get(key)
+        if cached is not None:
+            modules.update(json.loads(cached))
+        else:
+            missed.append((script, key))
 
-    gen: Iterable = (base,)
+    log.debug("Scanning %s files for requirements", len(missed))
 
-    if base.is_dir():
-        gen = filter(
-            lambda x: all(name not in x.parts for name in ignore_names),  # type: ignore
-            chain(*[base.glob(f"*.{ext}") for ext in extensions]),
-        )
+    scripts = [script for script, _ in missed]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(scripts))
 
-    for script in gen:
-
-        if script.suffix == ".ipynb":
-            source_code = get_source_from_notebook(script)
-        else:
-            with open(script, encoding="utf-8") as fin:
-                source_code = fin.read()
+    if n_jobs > 1 and len(scripts) >= _PARALLEL_SCAN_THRESHOLD:
+        with ProcessPoolExecutor(n_jobs) as pool:
+            results = list(
+                pool.map(_scan_file, scripts, chunksize=len(scripts) // n_jobs)
+            )
+    else:
+        results = [_scan_file(script) for script in scripts]
 
-        try:
-            tree = ast.parse(source_code)
-        except SyntaxError:
+    for (script, key), imports in zip(missed, results):
+        if imports is None:
             log.info(
                 f"File `{script}` skipped, because it is"
                 f" not containing valid Python code."
             )
             continue
+        cache.put(key, json.dumps(imports).encode())
+        modules.update(imports)
 
-        for node in filter(
-            lambda x: isinstance(x, (ast.Import, ast.ImportFrom)),
-            ast.walk(tree),
-        ):
-            # noinspection PyTypeChecker
-            mods = extract_modules(node, ignore_mods=ignore_mods)  # type: ignore
-            pool.update(mods)
-
-    return pool
+    return resolve_modules(sorted(modules), ignore_mods=ignore_mods)
 
 
 def make_requirements_txt(
@@ -351,6 +546,8 @@ def make_requirements_txt(
     strict: Optional[bool] = True,
     extensions: Optional[List[str]] = None,
     ignore_mods: Optional[List[str]] = None,
+    recursive: bool = False,
+    exclude: Optional[Sequence[PathLike]] = None,
 ) -> Dict[str, str]:
     """
     Make a requirements.txt file from a directory of files.
@@ -361,6 +558,8 @@ def make_requirements_txt(
         extensions: List of file extensions to scan. Defaults to ['py', 'ipynb']
         strict: Set only the exact version of the packages
         ignore_mods: List of modules to ignore
+        recursive: Scan subdirectories too
+        exclude: Paths of the files/dirs to skip, e.g. the built project
 
     Returns:
         A dict of requirements and their versions
@@ -370,13 +569,34 @@ def make_requirements_txt(
     """
 
     requirements = scan_requirements(
-        path, extensions, ignore_mods=ignore_mods or []
+        path,
+        extensions,
+        ignore_mods=ignore_mods or [],
+        recursive=recursive,
+        exclude=exclude,
     )
 
+    write_requirements_txt(requirements, out_path, strict)
+
+    return requirements
+
+
+def write_requirements_txt(
+    requirements: Dict[str, str],
+    out_path: PathLike = "requirements.txt",  # type: ignore
+    strict: Optional[bool] = True,
+) -> None:
+    """
+    Write requirements to a requirements.txt file.
+
+    Args:
+        requirements: A dict of requirements and their versions
+        out_path: Path to the output file
+        strict: Set only the exact version of the packages
+    """
+
     specifier = "==" if strict else ">="
 
     with open(out_path, "w", encoding="utf-8") as fin:
         for pkg, version in requirements.items():
             fin.write(f"{pkg}{specifier}{version}\n")
-
-    return requirements
@@ -1,33 +1,253 @@
+"""Model serializers detection and loading."""
+
+import bz2
+import gzip
+import io
+import lzma
 import pickle
-from typing import Literal
+import pickletools
+import struct
+import types
+import zlib
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 import dill
 import joblib
-from returns.converters import flatten
-from returns.result import (
-    Success,
-    safe,
-)
+from joblib.compressor import BinaryZlibFile
 
 from mljet.utils.types import PathLike
 
+__all__ = [
+    "UnknownSerializer",
+    "SerializerType",
+    "scan_globals",
+    "collect_globals",
+    "detect_model_serializer",
+    "load_model",
+]
+
 UnknownSerializer = "unknown"
 SerializerType = Literal["pickle", "dill", "joblib", "unknown"]
 
+Decompressor = Optional[Callable[[IO[bytes]], IO[bytes]]]
+
+# prefixes of the files, compressed by joblib,
+# lz4 is not decompressed, it is an optional dependency
+_COMPRESSED: List[Tuple[bytes, Decompressor]] = [
+    (b"\x1f\x8b", lambda f: cast(IO[bytes], gzip.GzipFile(fileobj=f))),
+    (b"BZ", lambda f: bz2.BZ2File(f)),
+    (b"]\x00", lambda f: lzma.LZMAFile(f)),
+    (b"\xfd7zXZ", lambda f: lzma.LZMAFile(f)),
+    (b"x", lambda f: BinaryZlibFile(f, "rb")),
+    (b'\x04"M\x18', None),
+]
+
+_OPCODES = {opcode.code: opcode for opcode in pickletools.opcodes}
+
+# length prefixes of the opcode arguments
+_LENGTH_FORMATS = {
+    pickletools.TAKEN_FROM_ARGUMENT1: "<B",
+    pickletools.TAKEN_FROM_ARGUMENT4: "<i",
+    pickletools.TAKEN_FROM_ARGUMENT4U: "<I",
+    pickletools.TAKEN_FROM_ARGUMENT8U: "<Q",
+}
+
+_STRING_OPCODES = {
+    "SHORT_BINUNICODE",
+    "BINUNICODE",
+    "BINUNICODE8",
+    "SHORT_BINSTRING",
+    "BINSTRING",
+    "UNICODE",
+    "STRING",
+}
+_PUT_OPCODES = {"PUT", "BINPUT", "LONG_BINPUT"}
+_GET_OPCODES = {"GET", "BINGET", "LONG_BINGET"}
+# opcodes, that don't change the top of the stack
+_NEUTRAL_OPCODES = {"PROTO", "FRAME", "MEMOIZE", *_PUT_OPCODES}
+
+# longer strings can't be names of the globals, they are skipped
+_MAX_NAME_LENGTH = 1024
+
+# objects, pickled by reference (as GLOBAL opcodes)
+_GLOBAL_TYPES = (type, types.FunctionType, types.BuiltinFunctionType)
+
+
+def _read_arg(stream: IO[bytes], arg: pickletools.ArgumentDescriptor) -> Any:
+    """
+    Reads opcode argument.
+
+    Length-prefixed arguments longer than ``_MAX_NAME_LENGTH``
+    (e.g. bytes of the arrays) are skipped without reading.
+    """
+    fmt = _LENGTH_FORMATS.get(arg.n)
+    if fmt is None:
+        return arg.reader(stream)
+    size = struct.calcsize(fmt)
+    header = stream.read(size)
+    if len(header) != size:
+        raise ValueError("Unexpected end of the pickle stream")
+    (length,) = struct.unpack(fmt, header)
+    if length < 0:
+        raise ValueError("Negative length of the pickle argument")
+    if length > _MAX_NAME_LENGTH:
+        stream.seek(length, io.SEEK_CUR)
+        return None
+    data = stream.read(length)
+    if len(data) != length:
+        raise ValueError("Unexpected end of the pickle stream")
+    return data
+
+
+def _as_name(value: Any) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value if isinstance(value, str) else None
+
+
+def _as_index(value: Any) -> int:
+    if not isinstance(value, int):
+        raise ValueError(f"Malformed memo index {value!r}")
+    return value
+
+
+def scan_globals(stream: IO[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Yields globals referenced by the pickle stream.
+
+    Opcodes are scanned without building the objects,
+    so the memory usage doesn't depend on the model size.
+
+    Args:
+        stream: binary stream of the pickle.
+
+    Yields:
+        Module and name of the global.
+
+    Raises:
+        ValueError: if stream is not a valid pickle.
+    """
+
+    # only strings are memoized, they could be names of the globals
+    memo: Dict[int, str] = {}
+    memo_size = 0
+    # values of the last pushed items, None if not a string
+    top: List[Optional[str]] = [None, None]
+
+    while True:
+        code = stream.read(1)
+        if not code:
+            raise ValueError("Pickle stream has no STOP opcode")
+        try:
+            opcode = _OPCODES[code.decode("latin-1")]
+        except KeyError as exc:
+            raise ValueError(f"Unknown pickle opcode {code!r}") from exc
+
+        arg = None if opcode.arg is None else _read_arg(stream, opcode.arg)
+        name = opcode.name
+
+        if name == "STOP":
+            return
+        if name in ("GLOBAL", "INST"):
+            if not isinstance(arg, str):
+                raise ValueError(f"Malformed argument of {name}")
+            module, qualname = arg.split(" ", 1)
+            yield module, qualname
+        elif name == "STACK_GLOBAL":
+            if top[0] is not None and top[1] is not None:
+                yield top[0], top[1]
+
+        if name == "MEMOIZE" or name in _PUT_OPCODES:
+            index = memo_size if name == "MEMOIZE" else _as_index(arg)
+            if top[1] is not None:
+                memo[index] = top[1]
+            memo_size = max(memo_size, index + 1)
+
+        if name in _NEUTRAL_OPCODES:
+            continue
+        if name in _STRING_OPCODES:
+            pushed = _as_name(arg)
+        elif name in _GET_OPCODES:
+            pushed = memo.get(_as_index(arg))
+        else:
+            pushed = None
+        top = [top[1], pushed]
 
-def _serializer_load(serializer, stream):
-    """Helper function for detecting model serializer."""
-    serializer.load(stream)
-    return serializer.__name__
 
+class _NullWriter:
+    """Binary sink, that drops everything written."""
 
-_safe_serializer_load = safe(_serializer_load)
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+class _GlobalsCollector(pickle.Pickler):
+    """Pickler, that records globals, referenced by the pickle."""
+
+    def __init__(self) -> None:
+        super().__init__(_NullWriter(), protocol=pickle.HIGHEST_PROTOCOL)
+        self.found: Set[Tuple[str, str]] = set()
+
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, _GLOBAL_TYPES):
+            name = getattr(obj, "__qualname__", None) or obj.__name__
+            self.found.add((pickle.whichmodule(obj, name), name))  # type: ignore
+        return NotImplemented
+
+
+def collect_globals(obj: Any) -> Set[Tuple[str, str]]:
+    """
+    Collects globals, that the pickle of the object references.
+
+    The object is pickled into a sink, that drops the data,
+    so neither memory nor disk usage depends on the object size.
+
+    Args:
+        obj: object to pickle.
+
+    Returns:
+        Module and name of each global.
+
+    Raises:
+        pickle.PicklingError: if object can't be pickled.
+    """
+
+    collector = _GlobalsCollector()
+    collector.dump(obj)
+    return collector.found
+
+
+def _detect_pickle(stream: IO[bytes]) -> SerializerType:
+    """Detects serializer of the (uncompressed) pickle stream."""
+    for module, _ in scan_globals(stream):
+        # joblib writes arrays data right after the wrapper,
+        # so the rest of the stream is not a pickle
+        if module.split(".")[0] == "joblib":
+            return "joblib"
+        if module.split(".")[0] == "dill":
+            return "dill"
+    return "pickle"
 
 
 def detect_model_serializer(path: PathLike) -> SerializerType:
     """
     Detects model serializer.
 
+    The serializer is detected by the file header and the
+    pickle opcodes, the model is not deserialized.
+
     Args:
         path: Path to the model.
 
@@ -37,10 +257,49 @@ def detect_model_serializer(path: PathLike) -> SerializerType:
     """
 
     with open(path, "rb") as stream:
-        serializer = flatten(
-            _safe_serializer_load(pickle, stream)
-            .lash(lambda x: _safe_serializer_load(dill, stream))
-            .lash(lambda x: _safe_serializer_load(joblib, stream))
-            .lash(lambda x: Success("unknown"))
-        )
-    return serializer
+        header = stream.read(8)
+        stream.seek(0)
+
+        try:
+            for prefix, decompressor in _COMPRESSED:
+                if not header.startswith(prefix):
+                    continue
+                if decompressor is None:
+                    return "joblib"
+                with decompressor(stream) as decompressed:
+                    _detect_pickle(decompressed)
+                # only joblib loads compressed pickles
+                return "joblib"
+            return _detect_pickle(stream)
+        except (ValueError, EOFError, OSError, lzma.LZMAError, zlib.error):
+            return "unknown"
+
+
+_LOADERS: Dict[str, Callable[[IO[bytes]], Any]] = {
+    "pickle": pickle.load,
+    "dill": dill.load,
+    "joblib": joblib.load,
+}
+
+
+def load_model(path: PathLike, serializer: Optional[str] = None) -> Any:
+    """
+    Loads the model with the matching serializer.
+
+    Args:
+        path: Path to the model.
+        serializer: Serializer type, detected if None.
+
+    Returns:
+        Loaded model.
+
+    Raises:
+        ValueError: if serializer is unknown.
+    """
+
+    if serializer is None:
+        serializer = detect_model_serializer(path)
+    if serializer not in _LOADERS:
+        raise ValueError(f"Unsupported serializer: {serializer}")
+    with open(path, "rb") as stream:
+        return _LOADERS[serializer](stream)
@@ -0,0 +1,95 @@
+import json
+import pickle
+from unittest.mock import patch
+
+from click.testing import CliRunner
+from sklearn.linear_model import LogisticRegression
+
+from mljet.cli.commands.bench import bench
+
+_RESULTS = [{"concurrency": 1, "batch_size": 1, "rps": 100.0}]
+
+
+def test_bench_url():
+    runner = CliRunner()
+
+    with patch(
+        "mljet.cli.commands.bench.benchmark", return_value=_RESULTS
+    ) as mock:
+        result = runner.invoke(
+            bench,
+            [
+                "--url",
+                "http://service",
+                "--n-features",
+                "4",
+                "-c",
+                "2",
+                "--json",
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {"bench": _RESULTS}
+    assert mock.call_args.args == ("http://service", 4)
+    assert mock.call_args.kwargs["concurrency"] == (2,)
+
+
+def test_bench_features_from_model(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    model = LogisticRegression().fit([[0, 1, 2], [2, 1, 0]], [0, 1])
+    model_path.write_bytes(pickle.dumps(model))
+    runner = CliRunner()
+
+    with patch(
+        "mljet.cli.commands.bench.benchmark", return_value=_RESULTS
+    ) as mock:
+        result = runner.invoke(
+            bench, ["--url", "http://service", "--model", str(model_path)]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert mock.call_args.args == ("http://service", 3)
+
+
+def test_bench_launches_project(tmp_path):
+    runner = CliRunner()
+
+    with patch(
+        "mljet.cli.commands.bench.benchmark", return_value=_RESULTS
+    ), patch("mljet.cli.commands.bench.launch_project") as launch:
+        result = runner.invoke(
+            bench,
+            ["-p", str(tmp_path), "--n-features", "4", "-e", "MLJET_N_WORKERS=2"],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert launch.call_args.args[0] == str(tmp_path)
+    assert launch.call_args.args[2] == {"MLJET_N_WORKERS": "2"}
+
+
+def test_bench_launches_replicas(tmp_path):
+    runner = CliRunner()
+
+    with patch(
+        "mljet.cli.commands.bench.benchmark", return_value=_RESULTS
+    ), patch("mljet.cli.commands.bench.launch_replicas") as launch:
+        result = runner.invoke(
+            bench,
+            ["-p", str(tmp_path), "--n-features", "4", "--replicas", "3"],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert launch.call_args.args[0] == str(tmp_path)
+    assert launch.call_args.args[2] == 3
+
+
+def test_bench_bad_parameters(tmp_path):
+    runner = CliRunner()
+    assert runner.invoke(bench, ["--url", "http://service"]).exit_code != 0
+    assert (
+        runner.invoke(
+            bench, ["-p", str(tmp_path), "--n-features", "4", "-e", "X"]
+        ).exit_code
+        != 0
+    )
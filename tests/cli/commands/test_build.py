@@ -1,8 +1,10 @@
+import json
 import os
 import pickle
 from pathlib import Path
 from unittest.mock import patch
 
+import joblib
 from sklearn.linear_model import LogisticRegression
 
 from mljet.cli.commands.build import build
@@ -26,3 +28,36 @@ def test_build():
         )
 
     os.remove(model_path)
+
+
+def test_build_joblib_model(tmp_path):
+    model_path = tmp_path.joinpath("model.joblib")
+    joblib.dump(LogisticRegression(), model_path, compress=3)
+
+    with patch(
+        "mljet.cli.commands.build.project_build", return_value=True
+    ) as mock_local:
+        ctx = build.make_context("build", ["--model", str(model_path)])
+        build.invoke(ctx)
+        assert isinstance(
+            mock_local.mock_calls[0].kwargs["model"], LogisticRegression
+        )
+
+
+def test_build_profile(tmp_path, capsys):
+    model_path = tmp_path.joinpath("model.pkl")
+    trace_path = tmp_path.joinpath("trace.json")
+
+    with open(model_path, "wb") as f:
+        pickle.dump(LogisticRegression(), f)
+
+    with patch("mljet.cli.commands.build.project_build", return_value=True):
+        ctx = build.make_context(
+            "build",
+            ["--model", str(model_path), "--profile", str(trace_path)],
+        )
+        build.invoke(ctx)
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert [x["name"] for x in events] == ["load-model", "project-build"]
+    assert "total" in capsys.readouterr().out
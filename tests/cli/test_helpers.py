@@ -1,12 +1,16 @@
 import json
 
+import click
 import pytest
 from hypothesis import (
     given,
     strategies as st,
 )
 
-from mljet.cli.helpers import format_info
+from mljet.cli.helpers import (
+    format_info,
+    parse_env,
+)
 
 
 @pytest.mark.parametrize(
@@ -59,3 +63,35 @@ def test_format_info_plain(data, expected):
 )
 def test_format_info_json(name, data):
     assert format_info(name, data, "json") == json.dumps({name: data}, indent=4)
+
+
+def test_format_info_records():
+    data = [{"a": 1, "b": 0.5}, {"a": 2, "b": 1.5}]
+    assert format_info("woo", data, "markdown") == (
+        """|   a |   b |
+|----:|----:|
+|   1 | 0.5 |
+|   2 | 1.5 |"""
+    )
+    assert format_info("woo", data, "plain") == (
+        """ a   b
+ 1 0.5
+ 2 1.5"""
+    )
+    assert format_info("woo", data, "json") == json.dumps(
+        {"woo": data}, indent=4
+    )
+
+
+def test_parse_env():
+    assert parse_env(None, None, ("A=1", "B=x=y", "C=")) == {
+        "A": "1",
+        "B": "x=y",
+        "C": "",
+    }
+
+
+@pytest.mark.parametrize("value", ["A", "=1"])
+def test_parse_env_malformed(value):
+    with pytest.raises(click.BadParameter):
+        parse_env(None, None, (value,))
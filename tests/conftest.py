@@ -1,3 +1,6 @@
+import pytest
+
+from mljet.utils.cache import CACHE_DIR_ENV
 from mljet.utils.logging_ import init
 
 
@@ -7,3 +10,11 @@ def pytest_sessionstart(session):
     before performing collection and entering the run test loop.
     """
     init(verbose=True)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache_dir(tmp_path_factory):
+    """Keeps the build cache of the tests out of the user cache."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("cache")))
+        yield
@@ -0,0 +1,49 @@
+import pytest
+
+from mljet.contrib.manifest import BuildManifest
+from mljet.contrib.project_builder import build_dockerfile
+from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
+
+
+@pytest.mark.parametrize("backend", sorted(SUPPORTED_BACKENDS))
+def test_build_multistage_dockerfile(tmp_path, backend):
+    backend_path = SUPPORTED_BACKENDS[backend]
+    build_dockerfile(tmp_path, backend_path, dockerfile="multistage")
+
+    dockerfile = tmp_path.joinpath("Dockerfile").read_text()
+    backend_cmd = [
+        line
+        for line in backend_path.joinpath("Dockerfile").read_text().splitlines()
+        if line.startswith("CMD")
+    ]
+    assert dockerfile.splitlines()[-1] == backend_cmd[-1]
+    assert "FROM $BASE_IMAGE AS builder" in dockerfile
+    assert "FROM $RUNTIME_IMAGE" in dockerfile
+    assert "COPY . ." not in dockerfile
+    # models are copied after the code
+    assert dockerfile.index(
+        "COPY server.py service.json ./"
+    ) < dockerfile.index("COPY models models")
+    assert ".mljet-manifest.json" in (
+        tmp_path.joinpath(".dockerignore").read_text().splitlines()
+    )
+
+
+def test_build_backend_dockerfile(tmp_path):
+    backend_path = SUPPORTED_BACKENDS["flask"]
+    manifest = BuildManifest(tmp_path)
+    build_dockerfile(tmp_path, backend_path, manifest=manifest)
+
+    assert (
+        tmp_path.joinpath("Dockerfile").read_text()
+        == backend_path.joinpath("Dockerfile").read_text()
+    )
+    assert tmp_path.joinpath(".dockerignore").is_file()
+    assert manifest.report()["rebuilt"] == [".dockerignore", "Dockerfile"]
+
+
+def test_build_dockerfile_unknown_mode(tmp_path):
+    with pytest.raises(ValueError, match="Unknown Dockerfile mode"):
+        build_dockerfile(
+            tmp_path, SUPPORTED_BACKENDS["flask"], dockerfile="unknown"
+        )
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from mljet.contrib.project_builder import build_requirements_txt
+from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
+
+
+def _names(path):
+    return {
+        line.split("==")[0]
+        for line in path.joinpath("requirements.txt").read_text().split()
+    }
+
+
+def test_build_requirements_txt_from_model(tmp_path):
+    with patch(
+        "mljet.contrib.project_builder.make_requirements_txt",
+        side_effect=AssertionError,
+    ):
+        build_requirements_txt(
+            tmp_path,
+            SUPPORTED_BACKENDS["flask"],
+            tmp_path,
+            models=[LogisticRegression()],
+            requirements_from="model",
+        )
+    names = _names(tmp_path)
+    assert "scikit-learn" in names
+    assert "flask" in {name.lower() for name in names}
+
+
+def test_build_requirements_txt_from_both(tmp_path):
+    scan_path = tmp_path.joinpath("src")
+    scan_path.mkdir()
+    scan_path.joinpath("train.py").write_text("import pandas\n")
+
+    build_requirements_txt(
+        tmp_path,
+        SUPPORTED_BACKENDS["flask"],
+        scan_path,
+        models=[LogisticRegression()],
+        requirements_from="both",
+    )
+    assert {"scikit-learn", "pandas"} <= _names(tmp_path)
+
+
+def test_build_requirements_txt_unknown_source(tmp_path):
+    with pytest.raises(ValueError, match="requirements source"):
+        build_requirements_txt(
+            tmp_path,
+            SUPPORTED_BACKENDS["flask"],
+            tmp_path,
+            requirements_from="pickle",
+        )
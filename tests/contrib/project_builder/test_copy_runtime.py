@@ -0,0 +1,24 @@
+import json
+
+from mljet.contrib.project_builder import (
+    RUNTIME_PACKAGE,
+    RUNTIME_PATH,
+    copy_runtime,
+    write_service_settings,
+)
+from mljet.cookie.templates.runtime import (
+    SETTINGS_FILENAME,
+    ServiceSettings,
+)
+
+
+def test_copy_runtime(tmp_path):
+    copy_runtime(tmp_path)
+    copied = {x.name for x in tmp_path.joinpath(RUNTIME_PACKAGE).iterdir()}
+    assert copied == {x.name for x in RUNTIME_PATH.glob("*.py")}
+
+
+def test_write_service_settings(tmp_path):
+    write_service_settings(tmp_path, ServiceSettings(max_batch_size=16))
+    with open(tmp_path / SETTINGS_FILENAME) as f:
+        assert json.load(f)["max_batch_size"] == 16
@@ -73,8 +73,10 @@ sanic==20.12.2"""
 
     expected = f"""
 |                ├── {project_path}
+|                    ├── .mljet-manifest.json
 |                    ├── {filename}
 |                    ├── data
+|                    ├── mljet_runtime
 |                    ├── models
 |                        ├── lr.{ext}
 |                        ├── rf.{ext}
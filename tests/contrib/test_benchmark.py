@@ -0,0 +1,180 @@
+import io
+import json
+import threading
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+
+import numpy as np
+import pytest
+
+from mljet.contrib.benchmark import (
+    benchmark,
+    compare_runs,
+    encode_payload,
+    launch_project,
+    synthesize_batch,
+)
+from mljet.utils.conn import find_free_port
+
+_SERVER = """
+import os
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+HTTPServer(
+    (os.environ["SERVICE_HOST"], int(os.environ["SERVICE_PORT"])), Handler
+).serve_forever()
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = 200 if self.path == "/predict" and body else 404
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def service_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_synthesize_batch():
+    batch = synthesize_batch(4, 3)
+    assert batch.shape == (3, 4)
+    np.testing.assert_array_equal(batch, synthesize_batch(4, 3))
+
+
+def test_encode_payload():
+    batch = synthesize_batch(2, 2)
+    assert json.loads(encode_payload(batch, "json")) == {"data": batch.tolist()}
+    np.testing.assert_array_equal(
+        np.load(io.BytesIO(encode_payload(batch, "npy"))), batch
+    )
+    with pytest.raises(ValueError):
+        encode_payload(batch, "csv")
+
+
+@pytest.mark.parametrize("payload", ["json", "npy"])
+def test_benchmark(service_url, payload):
+    results = benchmark(
+        service_url,
+        4,
+        concurrency=(1, 4),
+        batch_sizes=(1, 8),
+        n_requests=20,
+        warmup=2,
+        payload=payload,
+    )
+
+    assert [(r["batch_size"], r["concurrency"]) for r in results] == [
+        (1, 1),
+        (1, 4),
+        (8, 1),
+        (8, 4),
+    ]
+    for result in results:
+        assert result["requests"] == 20
+        assert result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["rows_per_s"] == pytest.approx(
+            result["rps"] * result["batch_size"], abs=0.01
+        )
+
+
+def test_benchmark_counts_errors(service_url):
+    (result,) = benchmark(
+        service_url,
+        4,
+        concurrency=(2,),
+        batch_sizes=(1,),
+        n_requests=10,
+        warmup=0,
+        method="predict_proba",
+    )
+    assert result["errors"] == 10
+    assert result["p50_ms"] is None
+
+
+def test_launch_project(tmp_path):
+    tmp_path.joinpath("server.py").write_text(_SERVER)
+
+    with launch_project(tmp_path, find_free_port()) as url:
+        (result,) = benchmark(
+            url, 2, concurrency=(1,), batch_sizes=(1,), n_requests=5
+        )
+        assert result["errors"] == 0
+
+
+def test_launch_project_failed(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        with launch_project(tmp_path, find_free_port()):
+            pass
+
+    tmp_path.joinpath("server.py").write_text("raise SystemExit('boom')")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        with launch_project(tmp_path, find_free_port()):
+            pass
+
+
+def test_compare_runs():
+    baseline = [
+        {"concurrency": 1, "batch_size": 1, "rps": 100.0, "p99_ms": 10.0},
+        {"concurrency": 8, "batch_size": 1, "rps": 400.0, "p99_ms": 20.0},
+        {"concurrency": 8, "batch_size": 32, "rps": 50.0, "p99_ms": 90.0},
+    ]
+    current = [
+        {"concurrency": 1, "batch_size": 1, "rps": 105.0, "p99_ms": 10.5},
+        {"concurrency": 8, "batch_size": 1, "rps": 300.0, "p99_ms": 20.0},
+        {"concurrency": 8, "batch_size": 32, "rps": 50.0, "p99_ms": None},
+        {"concurrency": 16, "batch_size": 1, "rps": 500.0, "p99_ms": 30.0},
+    ]
+
+    changes = compare_runs(baseline, current)
+
+    assert changes == [
+        {
+            "concurrency": 1,
+            "batch_size": 1,
+            "rps_change": 0.05,
+            "p99_change": 0.05,
+            "regressed": False,
+        },
+        {
+            "concurrency": 8,
+            "batch_size": 1,
+            "rps_change": -0.25,
+            "p99_change": 0.0,
+            "regressed": True,
+        },
+        {
+            "concurrency": 8,
+            "batch_size": 32,
+            "rps_change": 0.0,
+            "p99_change": None,
+            "regressed": False,
+        },
+    ]
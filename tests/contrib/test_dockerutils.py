@@ -0,0 +1,423 @@
+import json
+import os
+import threading
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+
+import docker.errors
+import numpy as np
+import pytest
+import requests
+from sklearn.linear_model import LogisticRegression
+
+from mljet.contrib import (
+    dockerutils,
+    proxy,
+    validator,
+)
+from mljet.contrib.actions.docker_build import docker_build
+from mljet.contrib.benchmark import _stop
+from mljet.contrib.dockerutils import (
+    CONTEXT_DIGEST_LABEL,
+    ServiceStartupError,
+    build_image,
+    context_digest,
+    is_ignored,
+    run_image,
+    run_replicas,
+    sample_payload,
+    slim_image,
+    wait_until_ready,
+)
+from mljet.utils.conn import find_free_port
+
+
+class FakeImage:
+    def __init__(self, tag, labels):
+        self.tags = [tag]
+        self.labels = labels
+        self.short_id = "sha256:fake"
+
+    def tag(self, repository):
+        self.tags.append(repository)
+
+
+class FakeImages:
+    def __init__(self):
+        self.images = []
+        self.builds = []
+
+    def build(self, **kwargs):
+        self.builds.append(kwargs)
+        image = FakeImage(kwargs["tag"], kwargs["labels"])
+        self.images.append(image)
+        return image, iter([])
+
+    def list(self, filters):
+        key, value = filters["label"].split("=", 1)
+        return [im for im in self.images if im.labels.get(key) == value]
+
+
+class FakeContainer:
+    def __init__(self, status="running"):
+        self.status = status
+        self.removed = False
+
+    def reload(self):
+        pass
+
+    def logs(self, tail=None, stream=False):
+        return b"Loading model\n"
+
+    def remove(self, force=False):
+        self.removed = True
+
+
+class FakeContainers:
+    def __init__(self):
+        self.container = FakeContainer()
+
+    def run(self, **kwargs):
+        return self.container
+
+
+class FakeClient:
+    def __init__(self):
+        self.images = FakeImages()
+        self.containers = FakeContainers()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(dockerutils, "_get_docker_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def project(tmp_path):
+    tmp_path.joinpath("app").mkdir()
+    tmp_path.joinpath("app", "server.py").write_text("print('hi')\n")
+    tmp_path.joinpath("Dockerfile").write_text("FROM python\n")
+    return tmp_path
+
+
+def test_context_digest(project):
+    base = context_digest(project, {"BASE_IMAGE": "python:3.10"})
+    assert base == context_digest(project, {"BASE_IMAGE": "python:3.10"})
+    assert base != context_digest(project, {"BASE_IMAGE": "python:3.11"})
+
+    project.joinpath("app", "server.py").write_text("print('bye')\n")
+    changed = context_digest(project, {"BASE_IMAGE": "python:3.10"})
+    assert changed != base
+
+    os.chmod(project.joinpath("app", "server.py"), 0o755)
+    assert changed != context_digest(project, {"BASE_IMAGE": "python:3.10"})
+
+    # file moved to another directory
+    project.joinpath("app", "server.py").rename(project.joinpath("server.py"))
+    assert changed != context_digest(project, {"BASE_IMAGE": "python:3.10"})
+
+
+def test_build_image_reuses_identical_image(client, project):
+    built = build_image(project, "first", "python:3.10")
+    assert len(client.images.builds) == 1
+    build = client.images.builds[0]
+    assert build["labels"] == {
+        CONTEXT_DIGEST_LABEL: context_digest(project, build["buildargs"])
+    }
+
+    reused = build_image(project, "second", "python:3.10")
+    assert reused is built
+    assert len(client.images.builds) == 1
+    assert reused.tags == ["first", "second"]
+
+    build_image(project, "third", "python:3.10", force=True)
+    assert len(client.images.builds) == 2
+
+
+def test_build_image_rebuilds_changed_context(client, project):
+    build_image(project, "image", "python:3.10")
+    build_image(project, "image", "python:3.11")
+    project.joinpath("Dockerfile").write_text("FROM python:slim\n")
+    build_image(project, "image", "python:3.11")
+    assert len(client.images.builds) == 3
+
+
+def test_context_digest_skips_dockerignored_files(project):
+    project.joinpath(".dockerignore").write_text(
+        "# comment\n**/__pycache__\n*.log\n!keep.log\n"
+    )
+    base = context_digest(project)
+
+    project.joinpath("app", "__pycache__").mkdir()
+    project.joinpath("app", "__pycache__", "server.pyc").write_bytes(b"\0")
+    project.joinpath("build.log").write_text("log")
+    assert context_digest(project) == base
+
+    project.joinpath("keep.log").write_text("log")
+    assert context_digest(project) != base
+
+
+@pytest.mark.parametrize(
+    "relpath, patterns, expected",
+    [
+        ("models/model.pkl", ["models"], True),
+        ("models/model.pkl", ["*.pkl"], False),
+        ("models/model.pkl", ["**/*.pkl"], True),
+        ("models/model.pkl", ["models", "!models/model.pkl"], False),
+        ("a/b/__pycache__/c.pyc", ["**/__pycache__"], True),
+        ("server.py", ["**/*.py[cod]"], False),
+        ("server.pyc", ["**/*.py[cod]"], True),
+    ],
+)
+def test_is_ignored(relpath, patterns, expected):
+    assert is_ignored(relpath, patterns) is expected
+
+
+@pytest.mark.parametrize(
+    "base_image, expected",
+    [
+        ("python:3.10", "python:3.10-slim"),
+        ("docker.io/library/python:3.9", "docker.io/library/python:3.9-slim"),
+        ("python:3.10-alpine", "python:3.10-alpine"),
+        ("ubuntu:22.04", "ubuntu:22.04"),
+    ],
+)
+def test_slim_image(base_image, expected):
+    assert slim_image(base_image) == expected
+
+
+def test_build_image_passes_runtime_image(client, project):
+    build_image(project, "image", "python:3.10")
+    assert client.images.builds[0]["buildargs"] == {
+        "BASE_IMAGE": "python:3.10",
+        "RUNTIME_IMAGE": "python:3.10-slim",
+    }
+
+
+def _serve(statuses):
+    """Service, that responds with the statuses, then with 200."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def respond(self, body):
+            received.append((self.command, self.path, body))
+            index = len(received) - 1
+            self.send_response(
+                statuses[index] if index < len(statuses) else 200
+            )
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def do_GET(self):  # noqa: N802
+            self.respond(None)
+
+        def do_POST(self):  # noqa: N802
+            self.respond(self.rfile.read(int(self.headers["Content-Length"])))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1], received
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def service():
+    """Service, that is overloaded for the first two requests."""
+    yield from _serve([503, 503])
+
+
+def test_sample_payload():
+    model = LogisticRegression().fit(np.eye(3), [0, 1, 1])
+    assert json.loads(sample_payload(model)) == {"data": [[0.0, 0.0, 0.0]]}
+    assert sample_payload(object()) is None
+
+
+def test_wait_until_ready_retries_overloaded_service(service):
+    port, received = service
+    elapsed = wait_until_ready(
+        FakeContainer(),
+        f"http://127.0.0.1:{port}/health",
+        initial_delay=0.01,
+    )
+    assert elapsed > 0
+    assert received == [("GET", "/health", None)] * 3
+
+
+def test_wait_until_ready_accepts_server_without_route():
+    for port, received in _serve([404]):
+        wait_until_ready(FakeContainer(), f"http://127.0.0.1:{port}/health")
+        assert len(received) == 1
+
+
+def test_wait_until_ready_fails_if_service_is_not_healthy():
+    for port, _ in _serve([500] * 1000):
+        with pytest.raises(ServiceStartupError, match="status 500"):
+            wait_until_ready(
+                FakeContainer(),
+                f"http://127.0.0.1:{port}/health",
+                timeout=0.3,
+                initial_delay=0.01,
+            )
+
+
+def test_run_image_waits_for_service(client, service):
+    port, received = service
+    payload = b'{"data": [[0.0]]}'
+    assert run_image("image", "sklearn", 1, "name", port=port) > 0
+    assert len(received) == 3
+
+    run_image("image", "sklearn", 1, "name", port=port, probe_payload=payload)
+    assert received[-2:] == [
+        ("GET", "/health", None),
+        ("POST", "/predict", payload),
+    ]
+    assert not client.containers.container.removed
+
+
+def test_run_image_ignores_failed_sample_prediction(client):
+    # the model rejects the sample row
+    for port, received in _serve([200, 400]):
+        run_image(
+            "image",
+            "sklearn",
+            1,
+            "name",
+            port=port,
+            probe_payload=b'{"data": [[0.0]]}',
+        )
+        assert [method for method, *_ in received] == ["GET", "POST"]
+    assert not client.containers.container.removed
+
+
+def test_run_image_fails_if_service_is_not_ready(client):
+    with pytest.raises(ServiceStartupError, match="Loading model"):
+        run_image(
+            "image",
+            "sklearn",
+            1,
+            "name",
+            port=find_free_port(),
+            startup_timeout=0.3,
+        )
+    assert client.containers.container.removed
+
+
+def test_wait_until_ready_fails_if_container_exited():
+    with pytest.raises(ServiceStartupError, match="exited"):
+        wait_until_ready(
+            FakeContainer(status="exited"),
+            f"http://127.0.0.1:{find_free_port()}/health",
+        )
+
+
+class ReplicaContainer(FakeContainer):
+    """Container, that serves its name on the published port."""
+
+    def __init__(self, name, port):
+        super().__init__()
+        self.name = name
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # noqa: N802
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):  # noqa: N802
+                self.rfile.read(int(self.headers["Content-Length"]))
+                body = json.dumps({"name": name}).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def remove(self, force=False):
+        super().remove(force)
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ReplicaContainers:
+    def __init__(self):
+        self.started = []
+
+    def run(self, name, ports, **kwargs):
+        self.started.append(ReplicaContainer(name, ports["5000"]))
+        return self.started[-1]
+
+    def get(self, name):
+        raise docker.errors.NotFound(name)
+
+
+def test_docker_build_runs_replicas(client, monkeypatch, tmp_path):
+    client.containers = ReplicaContainers()
+    monkeypatch.setattr(validator, "_get_docker_client", lambda: client)
+    proxies = []
+
+    def launch_proxy(*args, **kwargs):
+        proxies.append(proxy.launch_proxy(*args, **kwargs))
+        return proxies[-1]
+
+    monkeypatch.setattr(dockerutils, "launch_proxy", launch_proxy)
+    monkeypatch.setattr(dockerutils, "PROXY_ORPHAN_TIMEOUT", 0.5)
+    monkeypatch.chdir(tmp_path)
+    tmp_path.joinpath("build").mkdir()
+    tmp_path.joinpath("build", "Dockerfile").write_text("FROM python\n")
+
+    port = find_free_port()
+    model = LogisticRegression().fit(np.eye(3), [0, 1, 1])
+    try:
+        names = docker_build(model, container_name="svc", port=port, replicas=3)
+        with requests.Session() as session:
+            served = {
+                session.post(
+                    f"http://127.0.0.1:{port}/predict", data="{}"
+                ).json()["name"]
+                for _ in range(6)
+            }
+        for container in client.containers.started:
+            container.remove()
+        # the proxy exits after its replicas are gone
+        assert proxies[0].wait(timeout=10) == 0
+    finally:
+        for process in proxies:
+            _stop(process)
+        for container in client.containers.started:
+            if not container.removed:
+                container.remove()
+
+    assert names == ["svc-1", "svc-2", "svc-3"]
+    assert served == set(names)
+    assert [c.name for c in client.containers.started] == names
+
+
+def test_run_replicas_removes_containers_if_not_ready(client):
+    started = []
+    client.containers.run = (
+        lambda **kwargs: started.append(FakeContainer(status="exited"))
+        or started[-1]
+    )
+
+    with pytest.raises(ServiceStartupError):
+        run_replicas("image", "sklearn", 1, ["a", "b"], port=find_free_port())
+    assert len(started) == 2
+    assert all(container.removed for container in started)
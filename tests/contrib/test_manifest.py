@@ -0,0 +1,119 @@
+import json
+import pickle
+
+from sklearn.linear_model import LogisticRegression
+
+from mljet.contrib.manifest import (
+    MANIFEST_FILENAME,
+    BuildManifest,
+)
+from mljet.contrib.project_builder import full_build
+from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
+
+
+def test_write_only_changed(tmp_path):
+    manifest = BuildManifest(tmp_path)
+    target = manifest.write_text("a.txt", "a")
+    manifest.save()
+    mtime = target.stat().st_mtime_ns
+
+    manifest = BuildManifest(tmp_path)
+    manifest.write_text("a.txt", "a")
+    manifest.write_text("b/c.txt", "c")
+    manifest.save()
+
+    assert target.stat().st_mtime_ns == mtime
+    assert manifest.report() == {
+        "reused": ["a.txt"],
+        "rebuilt": ["b/c.txt"],
+        "removed": [],
+    }
+
+
+def test_dump_model_by_fingerprint(tmp_path):
+    manifest = BuildManifest(tmp_path)
+    manifest.dump_model("model.pkl", {"w": [1, 2]}, pickle)
+    manifest.save()
+
+    manifest = BuildManifest(tmp_path)
+    manifest.dump_model("model.pkl", {"w": [1, 2]}, pickle)
+    assert manifest.reused == ["model.pkl"]
+
+    manifest = BuildManifest(tmp_path)
+    manifest.dump_model("model.pkl", {"w": [1, 3]}, pickle)
+    assert manifest.rebuilt == ["model.pkl"]
+    with open(tmp_path.joinpath("model.pkl"), "rb") as f:
+        assert pickle.load(f) == {"w": [1, 3]}
+
+
+def test_save_removes_stale(tmp_path):
+    manifest = BuildManifest(tmp_path)
+    stale = manifest.write_text("stale.txt", "x")
+    manifest.save()
+
+    manifest = BuildManifest(tmp_path)
+    manifest.save()
+    assert not stale.exists()
+    assert manifest.removed == ["stale.txt"]
+
+
+def test_save_keeps_files_outside_of_project(tmp_path):
+    outside = tmp_path.joinpath("outside.txt")
+    outside.write_text("x")
+    project = tmp_path.joinpath("project")
+    project.mkdir()
+    project.joinpath(MANIFEST_FILENAME).write_text(
+        json.dumps({"artifacts": {"../outside.txt": "0"}})
+    )
+    BuildManifest(project).save()
+    assert outside.exists()
+
+
+def test_full_build_incremental(tmp_path):
+    backend_path = SUPPORTED_BACKENDS["flask"]
+    project_path = tmp_path.joinpath("build")
+    model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+
+    def build(models, names):
+        manifest = BuildManifest(project_path)
+        full_build(
+            project_path,
+            backend_path,
+            backend_path.joinpath("server.py"),
+            tmp_path,
+            models,
+            names,
+            manifest=manifest,
+        )
+        return manifest.report()
+
+    first = build([model], ["model"])
+    assert not first["reused"]
+    mtimes = {p: p.stat().st_mtime_ns for p in project_path.rglob("*")}
+
+    second = build([model], ["model"])
+    assert not second["rebuilt"]
+    assert set(second["reused"]) == set(first["rebuilt"])
+    assert mtimes == {p: p.stat().st_mtime_ns for p in project_path.rglob("*")}
+
+    changed = LogisticRegression(C=0.5).fit([[0.0], [1.0]], [0, 1])
+    third = build([changed], ["other"])
+    assert third["rebuilt"] == ["models/other.pkl"]
+    assert third["removed"] == ["models/model.pkl"]
+
+
+def test_fingerprint(tmp_path):
+    manifest = BuildManifest(tmp_path)
+    target = manifest.write_text("a.txt", "a")
+    manifest.write_text("b.txt", "b")
+    manifest.save()
+
+    fingerprint = BuildManifest(tmp_path).fingerprint()
+    assert BuildManifest(tmp_path).fingerprint() == fingerprint
+
+    target.write_text("c")
+    changed = BuildManifest(tmp_path).fingerprint()
+    assert changed != fingerprint
+
+    target.unlink()
+    assert BuildManifest(tmp_path).fingerprint() not in (fingerprint, changed)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import socket
+import threading
+from contextlib import contextmanager
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+
+import pytest
+import requests
+
+from mljet.contrib.benchmark import _stop
+from mljet.contrib.proxy import (
+    ReverseProxy,
+    launch_proxy,
+)
+from mljet.utils.conn import find_free_port
+
+
+@contextmanager
+def upstream(chunked=False):
+    """Keep-alive service, that records ports of the clients."""
+    clients = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):  # noqa: N802
+            clients.append(self.client_address[1])
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            payload = json.dumps(
+                {"port": self.server.server_address[1], "echo": body.decode()}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for part in (payload[:5], payload[5:]):
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1], clients
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def running_proxy(ports):
+    proxy = ReverseProxy([("127.0.0.1", port) for port in ports], timeout=5)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(proxy.serve("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.sockets[0].getsockname()[1], proxy
+    finally:
+
+        async def shutdown():
+            server.close()
+            # handlers of the kept alive connections
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_pick_least_outstanding():
+    proxy = ReverseProxy([("127.0.0.1", 1), ("127.0.0.1", 2)])
+    first, second = proxy.upstreams
+
+    # ties are broken round-robin
+    assert [proxy.pick() for _ in range(4)] == [first, second] * 2
+
+    first.outstanding = 2
+    second.outstanding = 1
+    assert {proxy.pick() for _ in range(4)} == {second}
+
+
+def test_pick_requires_upstreams():
+    with pytest.raises(ValueError):
+        ReverseProxy([])
+
+
+def test_proxy_balances_and_reuses_connections():
+    with upstream() as (first, first_clients), upstream() as (
+        second,
+        second_clients,
+    ), running_proxy([first, second]) as (port, _):
+        with requests.Session() as session:
+            ports = [
+                session.post(
+                    f"http://127.0.0.1:{port}/predict", data=str(i)
+                ).json()["port"]
+                for i in range(10)
+            ]
+
+    assert ports == [first, second] * 5
+    assert len(first_clients) == len(second_clients) == 5
+    # connections to the replicas are kept alive
+    assert len(set(first_clients)) == len(set(second_clients)) == 1
+
+
+def test_proxy_decodes_chunked_response():
+    with upstream(chunked=True) as (first, _), running_proxy([first]) as (
+        port,
+        _,
+    ):
+        response = requests.post(
+            f"http://127.0.0.1:{port}/predict",
+            data=iter([b"a", b"bc"]),
+            headers={"Connection": "close"},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"port": first, "echo": "abc"}
+    assert response.headers["Content-Length"] == str(len(response.content))
+
+
+def test_proxy_bad_gateway():
+    with running_proxy([find_free_port()]) as (port, proxy):
+        response = requests.post(f"http://127.0.0.1:{port}/predict", data="{}")
+        assert response.status_code == 502
+        assert proxy.upstreams[0].outstanding == 0
+
+
+def test_proxy_bad_request():
+    with running_proxy([find_free_port()]) as (port, _):
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            sock.sendall(b"GARBAGE\r\n\r\n")
+            assert sock.recv(1024).startswith(b"HTTP/1.1 400")
+
+
+def test_launch_proxy():
+    with upstream() as (first, _):
+        port = find_free_port()
+        process = launch_proxy(port, [("127.0.0.1", first)], host="127.0.0.1")
+        try:
+            response = requests.post(
+                f"http://127.0.0.1:{port}/predict", data="1"
+            )
+            assert response.json()["port"] == first
+        finally:
+            _stop(process)
+
+
+def test_launch_proxy_exits_without_replicas():
+    port = find_free_port()
+    with upstream() as (first, _):
+        process = launch_proxy(
+            port, [("127.0.0.1", first)], host="127.0.0.1", orphan_timeout=0.5
+        )
+        try:
+            assert requests.post(
+                f"http://127.0.0.1:{port}/predict", data="1"
+            ).ok
+            assert process.poll() is None
+        except BaseException:
+            _stop(process)
+            raise
+    try:
+        assert process.wait(timeout=10) == 0
+    finally:
+        _stop(process)
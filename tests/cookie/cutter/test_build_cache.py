@@ -0,0 +1,94 @@
+import os
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mljet.cookie.cutter import (
+    build_backend,
+    build_key,
+)
+
+FLASK_TEMPLATE_PATH = Path(__file__).parent.parent.parent.parent.joinpath(
+    "mljet", "cookie", "templates", "backends", "_flask", "server.py"
+)
+
+
+def predict(model, data):
+    return model.predict(data)
+
+
+def predict_proba(model, data):
+    return model.predict_proba(data)
+
+
+def other_predict(model, data):
+    return model.predict(data) + 0
+
+
+@pytest.fixture
+def cache_dir():
+    # mypy cache of the session is kept, so checks stay warm
+    path = Path(os.environ["MLJET_CACHE_DIR"])
+    shutil.rmtree(path.joinpath("backends"), ignore_errors=True)
+    return path.joinpath("backends")
+
+
+def test_build_key():
+    text = FLASK_TEMPLATE_PATH.read_text()
+    args = (["predict"], [predict], [], False)
+    assert build_key(text, *args) == build_key(text, *args)
+    assert build_key(text, *args) != build_key(text + "\n", *args)
+    assert build_key(text, *args) != build_key(
+        text, ["predict"], [other_predict], [], False
+    )
+    assert build_key(text, *args) != build_key(
+        text, ["predict"], [predict], ["numpy"], False
+    )
+    assert build_key(text, *args) != build_key(
+        text, ["predict"], [predict], [], True
+    )
+    # source of the builtin can't be obtained
+    assert build_key(text, ["predict"], [len], [], False) is None
+
+
+def test_build_backend_warm_build_skips_tools(cache_dir):
+    methods = (["predict", "predict_proba"], [predict, predict_proba])
+    cold = build_backend(FLASK_TEMPLATE_PATH, *methods)
+
+    with patch(
+        "mljet.cookie.cutter._mypy_run", side_effect=AssertionError
+    ), patch(
+        "mljet.cookie.cutter.process_black", side_effect=AssertionError
+    ), patch(
+        "mljet.cookie.cutter.sort_code_string", side_effect=AssertionError
+    ):
+        warm = build_backend(FLASK_TEMPLATE_PATH, *methods)
+
+    assert warm == cold
+    assert len(list(cache_dir.rglob("*"))) == 2
+
+
+def test_build_backend_cache_miss_on_changed_method(cache_dir):
+    build_backend(
+        FLASK_TEMPLATE_PATH,
+        ["predict", "predict_proba"],
+        [predict, predict_proba],
+    )
+    built = build_backend(
+        FLASK_TEMPLATE_PATH,
+        ["predict", "predict_proba"],
+        [other_predict, predict_proba],
+    )
+    assert "model.predict(data) + 0" in built
+
+
+def test_build_backend_without_cache(cache_dir, monkeypatch):
+    monkeypatch.setenv("MLJET_NO_CACHE", "1")
+    build_backend(
+        FLASK_TEMPLATE_PATH,
+        ["predict", "predict_proba"],
+        [predict, predict_proba],
+    )
+    assert not cache_dir.exists()
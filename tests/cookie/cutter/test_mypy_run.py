@@ -1,7 +1,10 @@
+import os
+
 import pytest
 
 from mljet.cookie.cutter import (
     MypyValidationError,
+    get_mypy_cache_dir,
     mypy_run,
 )
 
@@ -18,3 +21,14 @@ def foo() -> int:
     return 1
 """
     assert mypy_run(text) == "Success: no issues found in 1 source file\n"
+
+
+def test_mypy_run_uses_persistent_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("MLJET_CACHE_DIR", str(tmp_path))
+    assert get_mypy_cache_dir() == str(tmp_path.joinpath("mypy"))
+
+    mypy_run("x: int = 1\n")
+    assert any(tmp_path.joinpath("mypy").iterdir())
+
+    monkeypatch.setenv("MLJET_NO_CACHE", "1")
+    assert get_mypy_cache_dir() == os.devnull
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from mljet.cookie.templates.runtime.batching import MicroBatcher
+
+
+class _Model:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        with self.lock:
+            self.calls.append(len(rows))
+        return [sum(row) for row in rows]
+
+
+def test_batcher_disabled():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=1, max_wait_us=1000)
+    assert not batcher.enabled
+    assert batcher([[1, 2], [3, 4]]) == [3, 7]
+    assert model.calls == [2]
+
+
+def test_batcher_merges_concurrent_calls():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=64, max_wait_us=200_000)
+    requests = [[[i, i]] * (1 + i % 3) for i in range(16)]
+
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(batcher, requests))
+
+    assert results == [[2 * i] * (1 + i % 3) for i in range(16)]
+    # rows of the concurrent requests were merged
+    assert len(model.calls) < len(requests)
+    assert sum(model.calls) == sum(len(r) for r in requests)
+
+
+def test_batcher_respects_max_batch_size():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_us=200_000)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(batcher, [[[1, 1]]] * 8))
+
+    assert all(size <= 4 for size in model.calls)
+
+
+def test_batcher_propagates_errors():
+    def failing(rows):
+        raise ValueError("bad rows")
+
+    batcher = MicroBatcher(failing, max_batch_size=8, max_wait_us=100)
+    with pytest.raises(ValueError):
+        batcher([[1]])
+
+
+def test_batcher_async():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait_us=100_000)
+
+    async def main():
+        return await asyncio.gather(*(batcher.acall([[i]]) for i in range(4)))
+
+    assert asyncio.run(main()) == [[0], [1], [2], [3]]
+    assert model.calls == [4]
+
+
+def test_batcher_merges_arrays():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=64, max_wait_us=200_000)
+    requests = [np.full((1 + i % 3, 2), i) for i in range(8)]
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(batcher, requests))
+
+    assert [list(r) for r in results] == [
+        [2 * i] * (1 + i % 3) for i in range(8)
+    ]
+
+
+def test_batcher_survives_cancelled_calls():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait_us=100_000)
+
+    async def main():
+        cancelled = asyncio.ensure_future(batcher.acall([[1]]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await asyncio.gather(
+            batcher.acall([[2]]), return_exceptions=True
+        )
+
+    assert asyncio.run(main()) == [[2]]
+    # the collecting thread is still alive
+    assert batcher([[3]]) == [3]
+
+
+def test_batcher_fails_malformed_request_alone():
+    def model(rows):
+        if any(len(row) != 2 for row in rows):
+            raise ValueError("expected 2 features")
+        return [sum(row) for row in rows]
+
+    batcher = MicroBatcher(model, max_batch_size=64, max_wait_us=200_000)
+    requests = [[[1, 1]], [[1, 2, 3]], [[1], [1, 1]], [[2, 2]]]
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(batcher, rows) for rows in requests]
+
+    assert futures[0].result() == [2]
+    assert futures[3].result() == [4]
+    for future in futures[1:3]:
+        with pytest.raises(ValueError):
+            future.result()
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from mljet.cookie.templates.runtime.encoders import (
+    JsonEncoder,
+    OrjsonEncoder,
+    ResponseEncoder,
+    get_encoder,
+)
+
+
+def test_get_encoder_auto():
+    pytest.importorskip("orjson")
+    assert isinstance(get_encoder(), OrjsonEncoder)
+    assert isinstance(get_encoder("json"), JsonEncoder)
+
+
+def test_get_encoder_unknown():
+    with pytest.raises(ValueError):
+        get_encoder("yaml")
+
+
+def test_response_encoder_is_abstract():
+    with pytest.raises(TypeError):
+        ResponseEncoder()
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+@pytest.mark.parametrize(
+    "output",
+    [
+        np.array([0, 1, 2]),
+        np.array([[0.25, 0.75], [0.5, 0.5]]),
+        np.array(["setosa", "virginica"]),
+        np.array([True, False]),
+        np.arange(12.0).reshape(3, 4)[:, ::2],
+        [1, 2, 3],
+    ],
+)
+def test_encoders_roundtrip(name, output):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    encoded = get_encoder(name).encode(output)
+    assert json.loads(encoded) == np.asarray(output).tolist()
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_encoders_float_precision(name):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    encoder = get_encoder(name, float_precision=2)
+    assert json.loads(encoder.encode(np.array([[1 / 3, 2 / 3]]))) == [
+        [0.33, 0.67]
+    ]
+    # integer output is left as is
+    assert json.loads(encoder.encode(np.array([1, 2]))) == [1, 2]
+
+
+def test_orjson_encoder_float32_shrinks_payload():
+    pytest.importorskip("orjson")
+    output = np.random.default_rng(0).random((64, 3))
+    full = get_encoder("orjson").encode(output)
+    short = get_encoder("orjson", float32=True).encode(output)
+    assert len(short) < len(full)
+    np.testing.assert_allclose(json.loads(short), output, rtol=1e-6)
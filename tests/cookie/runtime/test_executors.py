@@ -0,0 +1,107 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mljet.cookie.templates.runtime.batching import MicroBatcher
+from mljet.cookie.templates.runtime.executors import (
+    InferenceExecutor,
+    Overloaded,
+)
+
+
+def _sums(rows):
+    return [sum(row) for row in rows]
+
+
+def _pid(rows):
+    return [os.getpid()] * len(rows)
+
+
+def test_executor_unknown_kind():
+    with pytest.raises(ValueError):
+        InferenceExecutor(_sums, kind="gpu")
+
+
+@pytest.mark.parametrize("kind", ["inline", "thread", "process"])
+def test_executor_kinds(kind):
+    executor = InferenceExecutor(_sums, kind=kind, max_workers=2)
+    assert executor([[1, 2], [3, 4]]) == [3, 7]
+    assert executor.pending == 0
+
+
+def test_executor_runs_off_caller_thread():
+    executor = InferenceExecutor(
+        lambda rows: threading.current_thread().name, kind="thread"
+    )
+    assert executor([[1]]).startswith("mljet-inference")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is required")
+def test_executor_process_kind_runs_in_other_process():
+    executor = InferenceExecutor(_pid, kind="process", max_workers=1)
+    assert executor([[1]]) != [os.getpid()]
+
+
+def test_executor_rejects_overload():
+    release = threading.Event()
+
+    def blocking(rows):
+        release.wait()
+        return rows
+
+    executor = InferenceExecutor(blocking, kind="thread", max_pending=2)
+    futures = [executor.submit([[1]]), executor.submit([[2]])]
+
+    with pytest.raises(Overloaded):
+        executor.submit([[3]])
+
+    release.set()
+    assert [f.result() for f in futures] == [[[1]], [[2]]]
+    assert executor.pending == 0
+    # the capacity is released
+    assert executor([[4]]) == [[4]]
+
+
+def test_executor_propagates_errors():
+    def failing(rows):
+        raise RuntimeError("boom")
+
+    executor = InferenceExecutor(failing, kind="thread")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        executor([[1]])
+    assert executor.pending == 0
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 64])
+def test_batcher_dispatches_to_executor(max_batch_size):
+    executor = InferenceExecutor(_sums, kind="thread", max_workers=2)
+    batcher = MicroBatcher(executor.submit, max_batch_size, 50_000)
+    requests = [[[i, i]] * (1 + i % 3) for i in range(16)]
+
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(batcher, requests))
+
+    assert results == [[2 * i] * (1 + i % 3) for i in range(16)]
+
+
+def test_batcher_async_overload():
+    release = threading.Event()
+
+    def blocking(rows):
+        release.wait()
+        return _sums(rows)
+
+    executor = InferenceExecutor(blocking, kind="thread", max_pending=1)
+    batcher = MicroBatcher(executor.submit, 8, 100)
+    busy = executor.submit([[0]])
+
+    with pytest.raises(Overloaded):
+        asyncio.run(batcher.acall([[1, 2]]))
+
+    release.set()
+    assert busy.result() == [0]
+    assert asyncio.run(batcher.acall([[1, 2]])) == [3]
@@ -0,0 +1,93 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from mljet.cookie.templates.runtime.payloads import (
+    ARROW_STREAM,
+    NPY,
+    PayloadError,
+    decode_npy,
+    decode_payload,
+)
+
+
+def _parse_json(raw):
+    return json.loads(raw)["data"]
+
+
+def _npy(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def test_decode_payload_json_by_default():
+    body = json.dumps({"data": [[1, 2]]}).encode()
+    assert decode_payload(None, body, _parse_json) == [[1, 2]]
+    assert decode_payload(
+        "application/json; charset=utf-8", body, _parse_json
+    ) == [[1, 2]]
+
+
+def test_decode_payload_invalid_json():
+    with pytest.raises(PayloadError) as exc_info:
+        decode_payload("application/json", b"{", _parse_json)
+    assert exc_info.value.status == 400
+
+
+def test_decode_payload_unsupported_content_type():
+    with pytest.raises(PayloadError) as exc_info:
+        decode_payload("text/csv", b"1,2", _parse_json)
+    assert exc_info.value.status == 415
+
+
+def test_decode_npy_zero_copy():
+    array = np.arange(12, dtype=np.float32).reshape(3, 4)
+    body = _npy(array)
+
+    decoded = decode_payload(NPY, body, _parse_json)
+
+    np.testing.assert_array_equal(decoded, array)
+    assert decoded.dtype == np.float32
+    assert decoded.flags.c_contiguous
+    # decoded array is a view on the payload
+    assert not decoded.flags.owndata
+
+
+def test_decode_npy_fortran_order():
+    array = np.asfortranarray(np.arange(6.0).reshape(2, 3))
+    decoded = decode_npy(_npy(array))
+    np.testing.assert_array_equal(decoded, array)
+    assert decoded.flags.c_contiguous
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not a npy",
+        _npy(np.arange(3)),
+        _npy(np.array([[1, "a"]], dtype=object)),
+        _npy(np.zeros((2, 2)))[:-8],
+    ],
+)
+def test_decode_npy_invalid(body):
+    with pytest.raises(PayloadError) as exc_info:
+        decode_npy(body)
+    assert exc_info.value.status == 400
+
+
+def test_decode_arrow_stream():
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.table({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    decoded = decode_payload(
+        ARROW_STREAM, sink.getvalue().to_pybytes(), _parse_json
+    )
+
+    np.testing.assert_array_equal(decoded, [[1.0, 3.0], [2.0, 4.0]])
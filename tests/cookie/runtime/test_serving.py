@@ -0,0 +1,70 @@
+import gc
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+import requests
+
+from mljet.cookie.templates.runtime.serving import freeze_heap
+from mljet.utils.conn import find_free_port
+
+_SERVER = textwrap.dedent(
+    """
+    import os
+    import sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from mljet.cookie.templates.runtime.serving import serve
+
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(str(os.getpid()).encode())
+
+
+    def run_worker(sock):
+        server = HTTPServer(sock.getsockname(), Handler, False)
+        server.socket = sock
+        server.serve_forever()
+
+
+    serve(run_worker, "127.0.0.1", int(sys.argv[1]), int(sys.argv[2]))
+    """
+)
+
+
+def test_freeze_heap():
+    freeze_heap()
+    if hasattr(gc, "get_freeze_count"):
+        assert gc.get_freeze_count() > 0
+        gc.unfreeze()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_serve_prefork():
+    port = find_free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", _SERVER, str(port), "3"],
+    )
+    try:
+        pids = set()
+        deadline = time.monotonic() + 30
+        while len(pids) < 2 and time.monotonic() < deadline:
+            try:
+                pids.add(
+                    requests.get(f"http://127.0.0.1:{port}", timeout=1).text
+                )
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        # requests are served by forked workers, not by the parent
+        assert len(pids) >= 2
+        assert str(proc.pid) not in pids
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
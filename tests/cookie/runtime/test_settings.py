@@ -0,0 +1,43 @@
+import pytest
+
+from mljet.cookie.templates.runtime.settings import ServiceSettings
+
+
+def test_settings_defaults(tmp_path):
+    settings = ServiceSettings.load(tmp_path / "not_exists.json")
+    assert settings == ServiceSettings()
+
+
+def test_settings_dump_load(tmp_path):
+    path = tmp_path / "service.json"
+    ServiceSettings(max_batch_size=32, max_batch_wait_us=10).dump(path)
+    assert ServiceSettings.load(path) == ServiceSettings(
+        max_batch_size=32, max_batch_wait_us=10
+    )
+
+
+def test_settings_env_override(tmp_path, monkeypatch):
+    path = tmp_path / "service.json"
+    ServiceSettings(max_batch_size=32).dump(path)
+    monkeypatch.setenv("MLJET_MAX_BATCH_SIZE", "8")
+    monkeypatch.setenv("MLJET_FLOAT_PRECISION", "null")
+    monkeypatch.setenv("MLJET_EXECUTOR", "process")
+    settings = ServiceSettings.load(path)
+    assert settings.max_batch_size == 8
+    assert settings.float_precision is None
+    assert settings.executor == "process"
+
+
+def test_settings_env_requires_prefix(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAX_BATCH_SIZE", "8")
+    assert ServiceSettings.load(tmp_path / "service.json").max_batch_size == 1
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [("N_WORKERS", "four"), ("FLOAT32", "1"), ("FLOAT_PRECISION", "2.5")],
+)
+def test_settings_env_wrong_type(tmp_path, monkeypatch, name, value):
+    monkeypatch.setenv(f"MLJET_{name}", value)
+    with pytest.raises(ValueError, match=f"MLJET_{name}"):
+        ServiceSettings.load(tmp_path / "service.json")
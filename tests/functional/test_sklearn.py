@@ -86,7 +86,7 @@ def test_cook_classification_docker(model, backend):
         scan_path=__file__,
     )
 
-    container_name = runresult["docker-build"]
+    (container_name,) = runresult["docker-build"]
     assert container_name == name
 
     client = docker.from_env()
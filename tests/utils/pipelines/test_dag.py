@@ -1,3 +1,5 @@
+from collections import Counter
+
 import pytest
 from hypothesis import (
     given,
@@ -85,3 +87,83 @@ def test_dag():
 
     assert dag.edges_to("Python") == {"C", "C++", "Haskell", "Guido"}
     assert dag.edges_from("Python") == set()
+
+
+@given(
+    st.lists(st.tuples(st.integers(0, 8), st.integers(0, 8)), max_size=40),
+)
+@settings(deadline=None)
+def test_dag_incremental_add(edges):
+    dag = DirectedAcyclicGraph()
+    accepted = {}
+    for from_, to in edges:
+        candidate = {k: set(v) for k, v in accepted.items()}
+        candidate.setdefault(from_, set()).add(to)
+        candidate.setdefault(to, set())
+        if is_cyclic(candidate):
+            with pytest.raises(CycleExistsError):
+                dag.add(from_, to)
+        else:
+            dag.add(from_, to)
+            accepted = candidate
+        assert {k: set(v) for k, v in dag._graph.items()} == accepted
+        assert dag.relationscountmap() == Counter(
+            x for targets in accepted.values() for x in targets
+        )
+        # topological indices are kept valid
+        assert all(
+            dag._index[x] < dag._index[y]
+            for x, targets in dag._graph.items()
+            for y in targets
+        )
+    assert is_topsorted(dag._graph, dag.ordered)
+
+
+@given(
+    dirgraphs(st.integers(), acyclic=True),
+)
+@settings(deadline=None)
+def test_dag_add_many_same_order(graph):
+    dag = DirectedAcyclicGraph()
+    for item, to in graph.items():
+        dag.add(item, *to)
+    assert DirectedAcyclicGraph.from_dict(graph).ordered == dag.ordered
+
+
+def test_dag_add_many_atomic():
+    dag = DirectedAcyclicGraph.from_dict({1: [2], 2: [3]})
+    with pytest.raises(CycleExistsError):
+        dag.add_many({4: [1], 3: [5, 1]})
+    assert dag._graph == {1: {2: None}, 2: {3: None}, 3: {}}
+    assert dag.ordered == [1, 2, 3]
+    assert dag.edges_to(1) == set()
+    dag.add(3, 4)
+    assert dag.ordered == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_dag_long_chain(reverse):
+    n = 5000
+    dag = DirectedAcyclicGraph()
+    for i in reversed(range(n)) if reverse else range(n):
+        dag.add(i)
+        dag.add(i, i + 1)
+    assert dag.ordered == list(range(n + 1))
+    with pytest.raises(CycleExistsError):
+        dag.add(n, 0)
+    assert len(dag) == n + 1
+
+
+def test_dag_degrees():
+    dag = DirectedAcyclicGraph.from_dict({"a": ["b", "c"], "b": ["c"]})
+    dag.add("a", "b")
+    dag.add("d")
+    assert dag.in_degree("c") == 2
+    assert dag.in_degree("b") == 1
+    assert dag.in_degree("e") == 0
+    assert dag.relationscountmap() == Counter({"b": 1, "c": 2})
+    assert dag.isolated == ["a", "d"]
+    assert dag.edges_to("c") == {"a", "b"}
+    assert repr(dag) == (
+        "DirectedAcyclicGraph({'a': ['b', 'c'], 'b': ['c'], 'c': [], 'd': []})"
+    )
@@ -1,7 +1,14 @@
+import asyncio
+import pickle
+import threading
+import time
+
 import pytest
 
+from mljet.utils.cache import FileCache
 from mljet.utils.pipelines.pipeline import (
     Context,
+    FrozenContext,
     IncorrectDependsError,
     Pipeline,
 )
@@ -70,3 +77,334 @@ def test_pipeline_incorrect_depends():
     pipeline.add(foo)
     with pytest.raises(IncorrectDependsError):
         pipeline()
+
+
+@stage("square")
+def square(x):
+    return x**2
+
+
+@stage("negate", depends_on=["square"])
+def negate(ctx):
+    return -ctx.get_result("square")
+
+
+def diamond(left, right):
+    pipeline = Pipeline(Context({"x": 3}, {}))
+    pipeline.add(stage("root")(lambda x: x))
+    pipeline.add(stage("left", depends_on=["root"])(left))
+    pipeline.add(stage("right", depends_on=["root"])(right))
+    pipeline.add(
+        stage("join", depends_on=["left", "right"])(
+            lambda ctx: ctx.get_result("left") + ctx.get_result("right")
+        )
+    )
+    return pipeline
+
+
+def test_pipeline_runs_branches_concurrently():
+    # both branches must wait for each other
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(ctx):
+        barrier.wait()
+        return ctx.get_result("root")
+
+    results = diamond(branch, branch)(executor="thread")
+
+    assert results == {"root": 3, "left": 3, "right": 3, "join": 6}
+
+
+def test_pipeline_bounds_concurrency():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def branch(x):
+        with lock:
+            running.append(x)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return x
+
+    diamond(branch, branch)(executor="thread", max_workers=1)
+
+    assert max(peak) == 1
+
+
+def test_pipeline_fail_fast():
+    calls = []
+
+    def left(x):
+        raise ValueError("left failed")
+
+    def right(x):
+        calls.append("right")
+        return x
+
+    pipeline = diamond(left, right)
+
+    with pytest.raises(ValueError, match="left failed"):
+        pipeline(executor="thread", max_workers=1)
+
+    # `right` was not dispatched after the failure
+    assert calls == []
+    assert "join" not in pipeline._context._stages_results
+
+
+def test_pipeline_process_executor():
+    pipeline = Pipeline(Context({"x": 3}, {}))
+    pipeline.add(negate)
+    pipeline.add(square)
+
+    assert pipeline(executor="process") == {"square": 9, "negate": -9}
+
+
+def test_pipeline_unknown_executor():
+    with pytest.raises(ValueError):
+        Pipeline(Context({}, {}))(executor="fiber")
+
+
+def test_frozen_context_is_view():
+    model = object()
+    context = Context({"model": model}, {})
+    frozen = FrozenContext.from_context(context)
+
+    context.set_result("fun1", [1])
+
+    assert frozen.get("model") is model
+    assert frozen.get_result("fun1") is context.get_result("fun1")
+    with pytest.raises(RuntimeError):
+        frozen.set_result("fun2", 1)
+    with pytest.raises(TypeError):
+        frozen._parameters["model"] = None
+
+
+def test_frozen_context_deep_copy():
+    context = Context({"x": [1]}, {"fun1": [2]})
+    frozen = FrozenContext.from_context(context, deep=True)
+    context.get("x").append(3)
+
+    assert frozen.get("x") == [1]
+    assert frozen.get_result("fun1") is not context.get_result("fun1")
+
+
+def test_frozen_context_pickle():
+    frozen = FrozenContext.from_context(Context({"x": 1}, {"fun1": 2}))
+    restored = pickle.loads(pickle.dumps(frozen))
+
+    assert isinstance(restored, FrozenContext)
+    assert restored.get("x") == 1
+    assert restored.get_result("fun1") == 2
+
+
+def test_pipeline_does_not_copy_model():
+    model = [0]
+    pipeline = Pipeline(Context({"model": model}, {}))
+    pipeline.add(stage("fit")(lambda ctx: ctx.get("model")))
+
+    assert pipeline()["fit"] is model
+
+
+@pytest.mark.parametrize("executor", ["inline", "thread"])
+def test_pipeline_resumes_from_cached_stage(tmp_path, executor):
+    calls = []
+    fail = True
+
+    def prepare(x):
+        calls.append("prepare")
+        return x * 2
+
+    def build(ctx):
+        calls.append("build")
+        if fail:
+            raise RuntimeError("network blip")
+        return ctx.get_result("prepare") + 1
+
+    def run(x):
+        pipeline = Pipeline(
+            Context({"x": x}, {}), cache=FileCache("stages", root=tmp_path)
+        )
+        pipeline.add(stage("prepare", cache=True)(prepare))
+        pipeline.add(stage("build", depends_on=["prepare"], cache=True)(build))
+        return pipeline(executor=executor)
+
+    with pytest.raises(RuntimeError):
+        run(1)
+    assert calls == ["prepare", "build"]
+
+    fail = False
+    assert run(1) == {"prepare": 2, "build": 3}
+    assert calls == ["prepare", "build", "build"]
+
+    # all stages are restored
+    assert run(1) == {"prepare": 2, "build": 3}
+    assert calls == ["prepare", "build", "build"]
+
+    # changed parameter invalidates the stage and its dependants
+    assert run(2) == {"prepare": 4, "build": 5}
+    assert calls[3:] == ["prepare", "build"]
+
+
+class _Model:
+    """Model, that counts how many times it was hashed."""
+
+    hashed = 0
+
+    def __reduce__(self):
+        _Model.hashed += 1
+        return _Model, ()
+
+
+@pytest.mark.parametrize("executor", ["inline", "thread"])
+def test_pipeline_hashes_inputs_once(tmp_path, executor):
+    _Model.hashed = 0
+    pipeline = Pipeline(
+        Context({"model": _Model()}, {}),
+        cache=FileCache("stages", root=tmp_path),
+    )
+    pipeline.add(stage("fit", cache=lambda: "state")(lambda model: 1))
+
+    assert pipeline(executor=executor) == {"fit": 1}
+    assert _Model.hashed == 1
+
+
+def test_pipeline_cache_state(tmp_path):
+    calls = []
+    state = {"version": 1}
+
+    def fetch():
+        calls.append("fetch")
+        return "data"
+
+    def plain():
+        calls.append("plain")
+
+    def run():
+        pipeline = Pipeline(
+            Context({}, {}), cache=FileCache("stages", root=tmp_path)
+        )
+        pipeline.add(stage("fetch", cache=lambda: state["version"])(fetch))
+        pipeline.add(stage("plain")(plain))
+        return pipeline()
+
+    run()
+    run()
+    assert calls == ["fetch", "plain", "plain"]
+
+    state["version"] = 2
+    run()
+    assert calls[3:] == ["fetch", "plain"]
+
+
+def test_pipeline_run_async_overlaps_coroutine_stages():
+    async def main():
+        left_started = asyncio.Event()
+        right_started = asyncio.Event()
+
+        async def left(x):
+            left_started.set()
+            # fails, if stages are not run concurrently
+            await asyncio.wait_for(right_started.wait(), 5)
+            return x
+
+        async def right(x):
+            right_started.set()
+            await asyncio.wait_for(left_started.wait(), 5)
+            return x * 2
+
+        return await diamond(left, right).run_async()
+
+    assert asyncio.run(main()) == {"root": 3, "left": 3, "right": 6, "join": 9}
+
+
+def test_pipeline_run_async_dispatches_sync_stages():
+    main_thread = threading.get_ident()
+    threads = {}
+
+    def blocking(x):
+        threads["blocking"] = threading.get_ident()
+        return x
+
+    async def awaited(x):
+        threads["awaited"] = threading.get_ident()
+        return x
+
+    results = asyncio.run(diamond(blocking, awaited).run_async())
+
+    assert results["join"] == 6
+    assert threads["blocking"] != main_thread
+    assert threads["awaited"] == main_thread
+
+
+def test_pipeline_run_async_fail_fast():
+    cancelled = []
+
+    def left(x):
+        raise ValueError("left failed")
+
+    async def right(x):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("right")
+            raise
+
+    pipeline = diamond(left, right)
+
+    with pytest.raises(ValueError, match="left failed"):
+        asyncio.run(pipeline.run_async())
+
+    assert cancelled == ["right"]
+    assert "join" not in pipeline._context._stages_results
+
+
+def test_pipeline_runs_coroutine_stage_synchronously():
+    async def double(x):
+        await asyncio.sleep(0)
+        return x * 2
+
+    pipeline = Pipeline(Context({"x": 2}, {}))
+    pipeline.add(stage("double")(double))
+
+    assert pipeline() == {"double": 4}
+    assert asyncio.run(pipeline.run_async()) == {"double": 4}
+
+
+def test_pipeline_coroutine_stage_inside_running_loop():
+    async def double(x):
+        return x * 2
+
+    pipeline = Pipeline(Context({"x": 2}, {}))
+    pipeline.add(stage("double")(double))
+
+    async def main():
+        return pipeline()
+
+    with pytest.raises(RuntimeError, match="run_async"):
+        asyncio.run(main())
+
+
+def test_pipeline_run_async_restores_off_the_loop(tmp_path, monkeypatch):
+    def run():
+        pipeline = Pipeline(
+            Context({"x": 2}, {}), cache=FileCache("stages", root=tmp_path)
+        )
+        pipeline.add(stage("double", cache=True)(lambda x: x * 2))
+        return asyncio.run(pipeline.run_async())
+
+    threads = []
+    restore = Pipeline._restore
+
+    def recording_restore(self, *args):
+        threads.append(threading.current_thread())
+        return restore(self, *args)
+
+    monkeypatch.setattr(Pipeline, "_restore", recording_restore)
+    assert run() == {"double": 4}
+    assert run() == {"double": 4}
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
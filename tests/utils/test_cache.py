@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from mljet.utils.cache import (
+    CACHE_DIR_ENV,
+    NO_CACHE_ENV,
+    FileCache,
+    digest,
+    get_cache_dir,
+)
+
+
+def test_get_cache_dir(monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, "/tmp/mljet-cache")
+    assert get_cache_dir() == Path("/tmp/mljet-cache")
+
+    monkeypatch.delenv(CACHE_DIR_ENV)
+    monkeypatch.setenv("XDG_CACHE_HOME", "/tmp/xdg")
+    assert get_cache_dir() == Path("/tmp/xdg/mljet")
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    assert get_cache_dir() == Path.home().joinpath(".cache", "mljet")
+
+
+def test_digest():
+    assert digest("ab", "c") == digest("ab", b"c")
+    assert digest("ab", "c") != digest("a", "bc")
+    assert len(digest()) == 64
+
+
+def test_file_cache(tmp_path):
+    cache = FileCache("artifacts", root=tmp_path)
+    key = digest("key")
+
+    assert cache.get(key) is None
+    cache.put(key, b"data")
+    assert cache.get(key) == b"data"
+    cache.put(key, b"other")
+    assert cache.get(key) == b"other"
+    # no temporary files are left
+    assert len(list(cache.path.rglob("*"))) == 2
+
+
+def test_file_cache_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv(NO_CACHE_ENV, "1")
+    cache = FileCache("artifacts", root=tmp_path)
+    cache.put("key", b"data")
+    assert cache.get("key") is None
+    assert not cache.path.exists()
+
+
+def test_file_cache_is_best_effort(tmp_path):
+    root = tmp_path.joinpath("file")
+    root.write_text("not a directory")
+    cache = FileCache("artifacts", root=root)
+    cache.put(digest("key"), b"data")
+    assert cache.get(digest("key")) is None
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    cache = FileCache("artifacts", root=tmp_path, max_size=10)
+    first, second, third = digest("1"), digest("2"), digest("3")
+
+    cache.put(first, b"1234")
+    cache.put(second, b"1234")
+    # mark `first` as the oldest one, then read it
+    os.utime(cache._entry(first), ns=(0, 0))
+    os.utime(cache._entry(second), ns=(1, 1))
+    assert cache.get(first) == b"1234"
+
+    cache.put(third, b"1234")
+
+    assert cache.get(second) is None
+    assert cache.get(first) == b"1234"
+    assert cache.get(third) == b"1234"
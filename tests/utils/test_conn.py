@@ -5,6 +5,7 @@ from unittest.mock import patch
 from mljet.utils.conn import (
     find_free_port,
     is_port_in_use,
+    wait_for_port,
 )
 
 
@@ -22,3 +23,13 @@ def test_port_in_use():
         s.listen(1)
         port = s.getsockname()[1]
         assert is_port_in_use(port)
+
+
+def test_wait_for_port():
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+        s.bind(("", 0))
+        s.listen(1)
+        port = s.getsockname()[1]
+        assert wait_for_port(port, timeout=1.0)
+
+    assert not wait_for_port(find_free_port(), timeout=0.2, interval=0.05)
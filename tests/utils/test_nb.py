@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import jsonschema
@@ -10,10 +11,12 @@ from hypothesis import (
 )
 from hypothesis_jsonschema import from_schema
 
+import mljet.utils.nb
 from mljet.utils.nb import (
     _Notebook,
     get_code_cells_sources_from_notebook,
     get_code_from_ipynb,
+    iter_code_from_ipynb,
 )
 
 NOTEBOOKS_EXAMPLES_FOLDER = Path(__file__).parent.joinpath("notebooks-examples")
@@ -62,25 +65,87 @@ def test_get_code_cells_sources_from_notebook(notebook: _Notebook):
     assert len(sources) == count_of_code_cells
 
 
-def test_correct_notebook():
+@pytest.mark.parametrize("validate", [False, True])
+def test_correct_notebook(validate):
     path = NOTEBOOKS_EXAMPLES_FOLDER.joinpath("correct_notebook.ipynb")
-    sources = get_code_from_ipynb(path)
+    sources = get_code_from_ipynb(path, validate=validate)
     assert sources == ["import numpy", "import sklearn", "import plotly"]
 
 
-def test_not_json():
+@pytest.mark.parametrize("validate", [False, True])
+def test_not_json(validate):
     path = NOTEBOOKS_EXAMPLES_FOLDER.joinpath("not_json.ipynb")
     with pytest.raises(nbformat.reader.NotJSONError):
-        get_code_from_ipynb(path)
+        get_code_from_ipynb(path, validate=validate)
 
 
 def test_not_notebook():
     path = NOTEBOOKS_EXAMPLES_FOLDER.joinpath("not_notebook.ipynb")
     with pytest.raises(jsonschema.exceptions.ValidationError):
+        get_code_from_ipynb(path, validate=True)
+    with pytest.raises(nbformat.NBFormatError):
         get_code_from_ipynb(path)
 
 
-def test_not_correct_version():
+@pytest.mark.parametrize("validate", [False, True])
+def test_not_correct_version(validate):
     path = NOTEBOOKS_EXAMPLES_FOLDER.joinpath("not_correct_version.ipynb")
     with pytest.raises(nbformat.NBFormatError):
-        get_code_from_ipynb(path)
+        get_code_from_ipynb(path, validate=validate)
+
+
+def test_iter_code_skips_outputs(tmp_path, monkeypatch):
+    # tiny chunks check values, cut by the end of the buffer
+    monkeypatch.setattr(mljet.utils.nb, "_CHUNK_SIZE", 7)
+    tricky = 'x = "\\"{[\\\\]}"'
+    notebook = nbformat.v4.new_notebook(
+        cells=[
+            nbformat.v4.new_code_cell(
+                "import numpy\nx = 1",
+                outputs=[
+                    nbformat.v4.new_output(
+                        "display_data", data={"image/png": "QUJD" * 1000}
+                    )
+                ],
+            ),
+            nbformat.v4.new_markdown_cell(
+                "import pandas", attachments={"a.png": {"image/png": "QQ=="}}
+            ),
+            nbformat.v4.new_code_cell("   "),
+            nbformat.v4.new_code_cell(tricky),
+        ]
+    )
+    path = tmp_path.joinpath("nb.ipynb")
+    nbformat.write(notebook, str(path))
+
+    sources = iter_code_from_ipynb(path)
+    assert next(sources) == "import numpy\nx = 1"
+    assert list(sources) == [tricky]
+
+
+def test_iter_code_nbformat_v3(tmp_path):
+    path = tmp_path.joinpath("nb.ipynb")
+    path.write_text(
+        json.dumps(
+            {
+                "metadata": {},
+                "nbformat": 3,
+                "nbformat_minor": 0,
+                "worksheets": [
+                    {
+                        "cells": [
+                            {
+                                "cell_type": "code",
+                                "input": ["import numpy"],
+                                "outputs": [],
+                                "language": "python",
+                            },
+                            {"cell_type": "markdown", "source": ["text"]},
+                        ],
+                        "metadata": {},
+                    }
+                ],
+            }
+        )
+    )
+    assert list(iter_code_from_ipynb(path)) == ["import numpy"]
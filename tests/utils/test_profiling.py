@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import tracemalloc
+
+from sklearn.linear_model import LogisticRegression
+
+from mljet.contrib.project_builder import full_build
+from mljet.cookie.templates.backends.dispatcher import SUPPORTED_BACKENDS
+from mljet.utils.pipelines.pipeline import (
+    Context,
+    Pipeline,
+)
+from mljet.utils.pipelines.stage import stage
+from mljet.utils.profiling import (
+    Profiler,
+    profiled,
+    span,
+)
+
+
+@profiled("decorated")
+def decorated(x):
+    return x + 1
+
+
+def test_span_without_profiler():
+    with span("step"):
+        pass
+    assert decorated(1) == 2
+
+
+def test_profiler_records_nested_spans():
+    with Profiler() as profiler:
+        with span("outer", "stage"):
+            with span("inner"):
+                sum(range(10000))
+            decorated(1)
+    # spans are not recorded, when profiler is not active
+    with span("ignored"):
+        pass
+
+    spans = {x.name: x for x in profiler.spans}
+    assert set(spans) == {"outer", "inner", "decorated"}
+    assert spans["outer"].category == "stage"
+    assert spans["outer"].depth == 0
+    assert spans["inner"].depth == spans["decorated"].depth == 1
+    assert spans["outer"].wall >= spans["inner"].wall
+    assert spans["inner"].cpu >= 0
+    assert spans["inner"].traced is None
+
+    summary = profiler.summary()
+    assert [x["step"] for x in summary] == [
+        "outer",
+        "· inner",
+        "· decorated",
+        "total",
+    ]
+    assert summary[-1]["wall_s"] >= summary[0]["wall_s"]
+    assert "traced_mb" not in summary[0]
+
+
+def test_profiler_traced_memory():
+    tracemalloc.start()
+    try:
+        with Profiler() as profiler:
+            with span("allocate"):
+                data = [object() for _ in range(10000)]
+    finally:
+        tracemalloc.stop()
+
+    assert len(data) == 10000
+    (record,) = profiler.spans
+    assert record.traced > 0
+    assert profiler.summary()[0]["traced_mb"] >= 0
+
+
+def test_profiler_threads():
+    with Profiler() as profiler:
+        threads = [
+            threading.Thread(target=decorated, args=(i,)) for i in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len({x.thread for x in profiler.spans}) == 2
+    assert all(x.depth == 0 for x in profiler.spans)
+
+
+def test_dump_trace(tmp_path):
+    with Profiler() as profiler:
+        with span("step"):
+            pass
+
+    path = tmp_path.joinpath("trace.json")
+    profiler.dump_trace(path)
+
+    (event,) = json.loads(path.read_text())["traceEvents"]
+    assert event["name"] == "step"
+    assert event["ph"] == "X"
+    assert event["ts"] >= 0
+    assert event["dur"] >= 0
+    assert set(event["args"]) == {"cpu_ms", "rss_growth_mb"}
+
+
+def test_pipeline_stages_are_profiled():
+    pipeline = Pipeline(Context({"x": 1}, {}))
+    pipeline.add(stage("first")(lambda x: x))
+    pipeline.add(stage("second", depends_on=["first"])(lambda x: x))
+
+    with Profiler() as profiler:
+        pipeline(executor="thread")
+
+    assert [(x.name, x.category) for x in profiler.spans] == [
+        ("first", "stage"),
+        ("second", "stage"),
+    ]
+
+
+def test_full_build_steps_are_profiled(tmp_path):
+    backend_path = SUPPORTED_BACKENDS["flask"]
+    model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+
+    with Profiler() as profiler:
+        full_build(
+            tmp_path.joinpath("build"),
+            backend_path,
+            backend_path.joinpath("server.py"),
+            tmp_path,
+            [model],
+            ["model"],
+        )
+
+    steps = {x.name for x in profiler.spans}
+    assert {
+        "init-project-directory",
+        "build-backend",
+        "build-requirements",
+        "scan-requirements",
+        "dump-models",
+        "save-manifest",
+    } <= steps
+
+
+def test_profiler_concurrent_coroutines():
+    async def step(name, delay):
+        with span(name):
+            await asyncio.sleep(delay)
+            with span(f"{name}-inner"):
+                await asyncio.sleep(delay)
+
+    async def main():
+        await asyncio.gather(step("first", 0.01), step("second", 0.02))
+
+    with Profiler() as profiler:
+        asyncio.run(main())
+
+    depths = {x.name: x.depth for x in profiler.spans}
+    assert depths == {
+        "first": 0,
+        "first-inner": 1,
+        "second": 0,
+        "second-inner": 1,
+    }
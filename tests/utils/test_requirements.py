@@ -1,14 +1,23 @@
+import io
 import os
+import pickle
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
+from sklearn.linear_model import LogisticRegression
 
 from mljet.utils.requirements import (
+    extract_imports,
     freeze,
     get_pkgs_distributions,
     get_source_from_notebook,
     make_requirements_txt,
+    resolve_modules,
+    scan_model_requirements,
+    scan_pickle_requirements,
     scan_requirements,
+    sources_digest,
 )
 
 
@@ -70,3 +79,111 @@ def test_make_requirements_txt(strict, specifier, inv_specifier):
     assert specifier in content and inv_specifier not in content
 
     os.remove("requirements.txt")
+
+
+def test_resolve_modules():
+    reqs = resolve_modules(
+        ["sklearn.linear_model._logistic", "numpy.core", "builtins"]
+    )
+    assert set(reqs) == {"scikit-learn", "numpy"}
+    assert reqs["numpy"] == freeze()["numpy"]
+    assert resolve_modules(["numpy"], ignore_mods=["numpy"]) == {}
+
+
+def test_scan_pickle_requirements():
+    stream = io.BytesIO(pickle.dumps({"model": LogisticRegression}))
+    assert set(scan_pickle_requirements(stream)) == {"scikit-learn"}
+
+
+def test_scan_model_requirements():
+    X, y = [[0.0], [1.0]], [0, 1]
+    model = LogisticRegression().fit(X, y)
+    with patch("pickle.load", side_effect=AssertionError):
+        reqs = scan_model_requirements([model])
+    assert set(reqs) == {"scikit-learn", "numpy"}
+
+
+def test_extract_imports():
+    source = (
+        "import sklearn.linear_model, os\n"
+        "from numpy import array\n"
+        "from . import local\n"
+    )
+    assert extract_imports(source) == ["numpy", "os", "sklearn"]
+
+
+def test_scan_requirements_recursive(tmp_path):
+    tmp_path.joinpath("top.py").write_text("import numpy\n")
+    tmp_path.joinpath("pkg", "sub").mkdir(parents=True)
+    tmp_path.joinpath("pkg", "sub", "deep.py").write_text("import pandas\n")
+    tmp_path.joinpath("venv").mkdir()
+    tmp_path.joinpath("venv", "ignored.py").write_text("import scipy\n")
+
+    assert set(scan_requirements(tmp_path)) == {"numpy"}
+    assert set(scan_requirements(tmp_path, recursive=True)) == {
+        "numpy",
+        "pandas",
+    }
+
+
+def test_scan_requirements_skips_hidden_and_excluded(tmp_path):
+    tmp_path.joinpath("top.py").write_text("import numpy\n")
+    for parts in [(".git", "hook.py"), ("__pycache__", "top.py")]:
+        tmp_path.joinpath(parts[0]).mkdir()
+        tmp_path.joinpath(*parts).write_text("import scipy\n")
+    # sources of the previous build
+    tmp_path.joinpath("build", "mljet_runtime").mkdir(parents=True)
+    tmp_path.joinpath("build", "server.py").write_text("import flask\n")
+    tmp_path.joinpath("build", "mljet_runtime", "a.py").write_text(
+        "import pandas\n"
+    )
+
+    assert set(scan_requirements(tmp_path, recursive=True)) == {
+        "Flask",
+        "numpy",
+        "pandas",
+    }
+    assert set(
+        scan_requirements(
+            tmp_path, recursive=True, exclude=[tmp_path.joinpath("build")]
+        )
+    ) == {"numpy"}
+
+
+def test_scan_requirements_cached(tmp_path):
+    script = tmp_path.joinpath("train.py")
+    script.write_text("import numpy\n")
+    assert set(scan_requirements(tmp_path)) == {"numpy"}
+
+    with patch(
+        "mljet.utils.requirements.ast.parse", side_effect=AssertionError
+    ):
+        assert set(scan_requirements(tmp_path)) == {"numpy"}
+
+    # changed file is parsed again
+    script.write_text("import pandas\n")
+    os.utime(script, ns=(0, 0))
+    assert set(scan_requirements(tmp_path)) == {"pandas"}
+
+
+def test_scan_requirements_parallel(tmp_path):
+    for i in range(40):
+        module = "numpy" if i % 2 else "pandas"
+        tmp_path.joinpath(f"f{i}.py").write_text(f"import {module}\n")
+    tmp_path.joinpath("broken.py").write_text("import (\n")
+
+    assert set(scan_requirements(tmp_path, n_jobs=2)) == {"numpy", "pandas"}
+
+
+def test_sources_digest(tmp_path):
+    script = tmp_path.joinpath("train.py")
+    script.write_text("import numpy\n")
+    tmp_path.joinpath("notes.txt").write_text("notes")
+    fingerprint = sources_digest(tmp_path)
+
+    tmp_path.joinpath("notes.txt").write_text("other notes")
+    assert sources_digest(tmp_path) == fingerprint
+
+    script.write_text("import pandas\n")
+    os.utime(script, ns=(0, 0))
+    assert sources_digest(tmp_path) != fingerprint
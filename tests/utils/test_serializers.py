@@ -0,0 +1,101 @@
+import io
+import pickle
+from unittest.mock import patch
+
+import dill
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from mljet.utils.serializers import (
+    collect_globals,
+    detect_model_serializer,
+    load_model,
+    scan_globals,
+)
+
+
+@pytest.fixture(scope="module")
+def model():
+    X = np.arange(20, dtype=float).reshape(10, 2)
+    return LinearRegression().fit(X, X.sum(axis=1))
+
+
+def _dump(path, serializer, model, **kwargs):
+    if serializer is joblib:
+        joblib.dump(model, path, **kwargs)
+    else:
+        with open(path, "wb") as f:
+            serializer.dump(model, f, **kwargs)
+    return path
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_scan_globals(protocol):
+    data = pickle.dumps(
+        [LinearRegression, np.float64(1.0), "x" * 2000], protocol=protocol
+    )
+    found = set(scan_globals(io.BytesIO(data)))
+    assert ("sklearn.linear_model._base", "LinearRegression") in found
+
+
+def test_collect_globals(model):
+    data = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    assert collect_globals(model) == set(scan_globals(io.BytesIO(data)))
+    assert collect_globals([1, "x"]) == set()
+
+
+def test_scan_globals_invalid():
+    with pytest.raises(ValueError):
+        list(scan_globals(io.BytesIO(b"\xff\xfe")))
+    with pytest.raises(ValueError):
+        list(scan_globals(io.BytesIO(pickle.dumps([1, 2])[:-1])))
+
+
+@pytest.mark.parametrize(
+    "serializer, kwargs, expected",
+    [
+        (pickle, {}, "pickle"),
+        (pickle, {"protocol": 0}, "pickle"),
+        (joblib, {}, "joblib"),
+        (joblib, {"compress": 3}, "joblib"),
+        (joblib, {"compress": ("gzip", 3)}, "joblib"),
+        (joblib, {"compress": ("bz2", 3)}, "joblib"),
+        (joblib, {"compress": ("lzma", 3)}, "joblib"),
+        (joblib, {"compress": ("xz", 3)}, "joblib"),
+    ],
+)
+def test_detect_model_serializer(tmp_path, model, serializer, kwargs, expected):
+    path = _dump(tmp_path.joinpath("model"), serializer, model, **kwargs)
+    with patch("pickle.load") as load, patch("joblib.load") as jload:
+        assert detect_model_serializer(path) == expected
+    load.assert_not_called()
+    jload.assert_not_called()
+
+
+def test_detect_model_serializer_dill(tmp_path):
+    path = _dump(tmp_path.joinpath("model"), dill, lambda x: x + 1)
+    assert detect_model_serializer(path) == "dill"
+
+
+def test_detect_model_serializer_unknown(tmp_path):
+    path = tmp_path.joinpath("model")
+    path.write_bytes(b"not a model")
+    assert detect_model_serializer(path) == "unknown"
+    path.write_bytes(b"\x1f\x8bbroken gzip")
+    assert detect_model_serializer(path) == "unknown"
+
+
+@pytest.mark.parametrize("serializer", [pickle, dill, joblib])
+def test_load_model(tmp_path, model, serializer):
+    path = _dump(tmp_path.joinpath("model"), serializer, model)
+    loaded = load_model(path)
+    np.testing.assert_allclose(loaded.coef_, model.coef_)
+
+
+def test_load_model_unknown(tmp_path):
+    path = tmp_path.joinpath("model")
+    path.write_bytes(b"not a model")
+    with pytest.raises(ValueError, match="Unsupported serializer"):
+        load_model(path)